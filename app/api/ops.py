@@ -0,0 +1,30 @@
+# app/api/ops.py
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.config.settings import settings
+from app.libs import metrics
+from app.utils.CLIPScore import clip_loader
+from app.utils.clip_client import sidecar_client
+
+router = APIRouter(tags=["Ops"])
+
+
+@router.get("/metrics", summary="프로세스 내부 지표 (워커 풀 · 캐시 등)")
+async def get_metrics():
+    return metrics.snapshot()
+
+
+@router.get("/ready", summary="트래픽 수신 준비 여부 (CLIP 워밍업 포함)")
+async def get_ready():
+    if settings.CLIP_SCORER == "sidecar":
+        clip = await sidecar_client.ping()
+        ready = bool(clip.get("ready"))
+    else:
+        # 워밍업을 켠 경우에만 CLIP 로딩 완료를 준비 조건으로 본다 (끈 경우는 첫 요청 때 지연 로딩)
+        clip = clip_loader.status()
+        ready = clip_loader.ready or not settings.CLIP_WARMUP_ON_STARTUP
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "clip": clip},
+    )
@@ -1,10 +1,13 @@
 # app/api/prompt.py
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel, Field, conlist
+from typing import Any
+
+from fastapi import APIRouter, Body, Depends
+from pydantic import BaseModel, Field, ValidationError, conlist
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.services.prompt_service import build_prompt
+from app.config.settings import settings
+from app.db.session import get_read_db
+from app.services.prompt_service import PromptSpec, build_prompt, build_prompts_batch
 from app.models.enums import Equilibrium
 
 router = APIRouter(prefix="/prompts", tags=["Prompt"])
@@ -21,7 +24,7 @@ class PromptReq(BaseModel):
 
 
 @router.post("/compose")
-async def compose_prompt(req: PromptReq, db: AsyncSession = Depends(get_db)):
+async def compose_prompt(req: PromptReq, db: AsyncSession = Depends(get_read_db)):
     prompt = await build_prompt(
         db=db,
         floor_plan_id=req.floorPlanId,
@@ -29,4 +32,53 @@ async def compose_prompt(req: PromptReq, db: AsyncSession = Depends(get_db)):
         tag_id=req.tagId,
         furniture_tag_ids=req.promptFurnitureListDTO.furnitureIds,
     )
-    return {"prompt": prompt}
\ No newline at end of file
+    return {"prompt": prompt}
+
+
+class PromptBatchItem(BaseModel):
+    index: int
+    prompt: str | None = None
+    error: str | None = None
+
+
+class PromptBatchRes(BaseModel):
+    results: list[PromptBatchItem]
+
+
+@router.post("/compose:batch", response_model=PromptBatchRes)
+async def compose_prompt_batch(
+    items: list[dict[str, Any]] = Body(
+        ...,
+        min_length=1,
+        max_length=settings.PROMPT_BATCH_MAX_ITEMS,
+        description="PromptReq 목록 – 항목별로 검증하므로 잘못된 항목이 있어도 나머지는 합성됨",
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # ① 항목별 검증 (실패 항목은 error 로 기록)
+    results: list[PromptBatchItem | None] = [None] * len(items)
+    valid: list[tuple[int, PromptReq]] = []
+    for i, raw in enumerate(items):
+        try:
+            valid.append((i, PromptReq.model_validate(raw)))
+        except ValidationError as e:
+            results[i] = PromptBatchItem(index=i, error=f"invalid request: {e.errors(include_url=False)}")
+
+    # ② 유효 항목만 테이블당 1 쿼리로 합성
+    composed = await build_prompts_batch(
+        db,
+        [
+            PromptSpec(
+                floor_plan_id=req.floorPlanId,
+                equilibrium=req.equilibrium,
+                tag_id=req.tagId,
+                furniture_tag_ids=req.promptFurnitureListDTO.furnitureIds,
+            )
+            for _, req in valid
+        ],
+    ) if valid else []
+
+    for (i, _), (prompt, error) in zip(valid, composed):
+        results[i] = PromptBatchItem(index=i, prompt=prompt, error=error)
+
+    return PromptBatchRes(results=results)
@@ -1,36 +1,128 @@
 # app/api/routers/image_router.py
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import json
+import logging
+from typing import AsyncIterator, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, conlist
+from pydantic import BaseModel, Field, conint, conlist
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
 
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.models.enums import Equilibrium
-from app.services.image_service import build_image_chain
+from app.services.image_jobs import JobQueueFull, image_jobs
+from app.services.image_service import build_image_chain, stream_image_chain
+from app.services.renditions import RenditionSpec, default_rendition_spec, make_rendition_spec
 
 router = APIRouter(prefix="/images", tags=["Image"])   # ← 중복 import 제거
+logger = logging.getLogger(__name__)
 
 class PromptFurnitureListDTO(BaseModel):
     furnitureTagIds: conlist(int, min_length=1)  # ← 변경됨
 
+class RenditionOptions(BaseModel):
+    """파생 이미지 구성 – 생략한 항목은 settings 기본값 (formats·thumbnailSizes 를 모두 비우면 생성 안 함)"""
+    formats: list[Literal["webp", "avif"]] | None = None
+    thumbnailSizes: list[conint(ge=16, le=4096)] | None = None  # 긴 변 px
+    quality: int | None = Field(default=None, ge=1, le=100)
+
 class ImageRequest(BaseModel):
     floorPlanId: int
     tagId: int                                   # ← tasteId → tagId
     equilibrium: Equilibrium
     promptFurnitureListDTO: PromptFurnitureListDTO
+    useCache: bool = True                        # False: 캐시·중복 합치기 없이 새로 생성
+    renditions: RenditionOptions | None = None   # 없으면 IMAGE_RENDITIONS_DEFAULT 에 따름
+
+    def rendition_spec(self) -> RenditionSpec | None:
+        if self.renditions is None:
+            return default_rendition_spec()
+        return make_rendition_spec(self.renditions.formats, self.renditions.thumbnailSizes, self.renditions.quality)
 
 @router.post("", response_class=JSONResponse)
 async def create_image(
     body: ImageRequest,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),  # 프롬프트 합성(읽기)만 함
 ):
     return await build_image_chain(
         db=db,
         floor_plan_id=body.floorPlanId,
         equilibrium=body.equilibrium,
         tag_id=body.tagId,  # ← taste_id → tag_id
-        furniture_tag_ids=body.promptFurnitureListDTO.furnitureTagIds  # ←
+        furniture_tag_ids=body.promptFurnitureListDTO.furnitureTagIds,  # ←
+        use_cache=body.useCache,
+        renditions=body.rendition_spec(),
     )
+
+
+# ──────────────────────────
+# 스트리밍 모드 (SSE) – 단계별 진행 상황 + 중간 이미지를 바로 전송
+#   event: prompt | generation_started | partial_image | uploaded | scored | renditions | done | error
+#   done 의 data 는 POST /images 응답과 같은 형태
+# ──────────────────────────
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _image_events(body: ImageRequest) -> AsyncIterator[str]:
+    try:
+        async for event, data in stream_image_chain(
+            floor_plan_id=body.floorPlanId,
+            equilibrium=body.equilibrium,
+            tag_id=body.tagId,
+            furniture_tag_ids=body.promptFurnitureListDTO.furnitureTagIds,
+            use_cache=body.useCache,
+            renditions=body.rendition_spec(),
+        ):
+            yield _sse(event, data)
+    except Exception as e:  # 헤더(200)는 이미 나갔으므로 오류도 이벤트로 전달
+        logger.exception("이미지 스트림 실패")
+        yield _sse("error", {"detail": str(e) or type(e).__name__})
+
+@router.post("/stream", response_class=StreamingResponse)
+async def create_image_stream(body: ImageRequest):
+    return StreamingResponse(
+        _image_events(body),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # 프록시 버퍼링 방지
+    )
+
+# ──────────────────────────
+# 비동기 작업 모드 – 즉시 jobId 반환, 결과는 GET /images/jobs/{jobId} 로 조회
+#   (생성 시간이 길어 프록시·클라이언트 타임아웃이 나는 경우 사용)
+# ──────────────────────────
+class ImageJobAccepted(BaseModel):
+    jobId: str
+    status: str
+    statusUrl: str
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED, response_model=ImageJobAccepted)
+async def create_image_job(body: ImageRequest):
+    try:
+        job_id = await image_jobs.submit(
+            request=body.model_dump(mode="json"),
+            params={
+                "floor_plan_id": body.floorPlanId,
+                "equilibrium": body.equilibrium,
+                "tag_id": body.tagId,
+                "furniture_tag_ids": body.promptFurnitureListDTO.furnitureTagIds,
+                "use_cache": body.useCache,
+                "renditions": body.rendition_spec(),
+            },
+        )
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": "10"},
+        ) from e
+    return ImageJobAccepted(jobId=job_id, status="queued", statusUrl=f"{router.prefix}/jobs/{job_id}")
+
+@router.get("/jobs/{job_id}")
+async def get_image_job(job_id: str):
+    job = await image_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="작업을 찾을 수 없습니다")
+    return job
@@ -0,0 +1,120 @@
+# app/api/users.py
+"""
+사용자 조회 (keyset 페이지네이션 · NDJSON 스트리밍)
+──────────────────────────────
+- GET /users, /user-ids : id > after_id 순으로 limit 개 – ORM 객체 없이 컬럼만 select
+  다음 페이지는 응답의 nextAfterId 로 요청 (OFFSET 없이 PK 인덱스 범위 조회 → 뒤 페이지도 같은 비용)
+- GET /users/export, /user-ids/export : 전체(또는 after_id 이후)를 NDJSON 으로 스트리밍
+  서버 측 커서(stream / stream_scalars)로 USERS_EXPORT_BATCH 행씩 읽어 바로 내보냄 → 테이블 크기와 무관한 메모리
+- 행 직렬화는 orjson (datetime · UUID · numpy 배열 그대로 지원)
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, AsyncIterator
+
+import orjson
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Column, Select, Table, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.db.automap import AutomapBase
+from app.db.session import ReadSessionLocal, get_read_db
+
+router = APIRouter(tags=["User"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(value: Any) -> Any:
+    """orjson 이 직접 못 쓰는 타입"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, memoryview)):
+        return bytes(value).hex()
+    raise TypeError
+
+
+def _dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _users_table() -> Table:
+    return AutomapBase.classes.User.__table__
+
+
+def _keyset(stmt: Select, id_col: Column, after_id: int | None) -> Select:
+    if after_id is not None:
+        stmt = stmt.where(id_col > after_id)
+    return stmt.order_by(id_col)
+
+
+def _page(items: list[Any], next_after_id: Any) -> Response:
+    return Response(_dumps({"items": items, "nextAfterId": next_after_id}), media_type="application/json")
+
+
+def _ndjson(lines: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE, headers={"X-Accel-Buffering": "no"})
+
+
+# ── 페이지 ────────────────────────────────────────
+@router.get("/users", summary="사용자 목록 (keyset 페이지)")
+async def get_users(
+    after_id: int | None = Query(None, description="이전 페이지의 nextAfterId (생략하면 처음부터)"),
+    limit: int = Query(settings.USERS_PAGE_SIZE, ge=1, le=settings.USERS_PAGE_MAX),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """users 행을 id 순으로 limit 개 반환 – 더 있으면 nextAfterId 로 이어서 조회"""
+    table = _users_table()
+    stmt = _keyset(select(*table.c), table.c.id, after_id).limit(limit + 1)  # 1 행 더 읽어 다음 페이지 여부 확인
+    rows = (await db.execute(stmt)).mappings().all()
+    items = [dict(row) for row in rows[:limit]]
+    return _page(items, items[-1]["id"] if len(rows) > limit else None)
+
+
+@router.get("/user-ids", summary="사용자 PK 목록 (keyset 페이지)")
+async def list_user_ids(
+    after_id: int | None = Query(None, description="이전 페이지의 nextAfterId (생략하면 처음부터)"),
+    limit: int = Query(settings.USERS_PAGE_SIZE, ge=1, le=settings.USERS_PAGE_MAX),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """users PK(id) 만 id 순으로 limit 개 반환"""
+    id_col = _users_table().c.id
+    ids = (await db.scalars(_keyset(select(id_col), id_col, after_id).limit(limit + 1))).all()
+    return _page(list(ids[:limit]), ids[limit - 1] if len(ids) > limit else None)
+
+
+# ── NDJSON export (서버 측 커서) ─────────────────────
+#   StreamingResponse 는 Depends 세션이 닫힌 뒤에도 이어지므로 스트림 안에서 세션을 직접 엶
+async def _user_lines(after_id: int | None) -> AsyncIterator[bytes]:
+    table = _users_table()
+    stmt = _keyset(select(*table.c), table.c.id, after_id).execution_options(
+        yield_per=settings.USERS_EXPORT_BATCH
+    )
+    async with ReadSessionLocal() as session:
+        result = await session.stream(stmt)
+        async for rows in result.mappings().partitions():
+            yield b"".join(_dumps(dict(row)) + b"\n" for row in rows)
+
+
+async def _user_id_lines(after_id: int | None) -> AsyncIterator[bytes]:
+    id_col = _users_table().c.id
+    stmt = _keyset(select(id_col), id_col, after_id).execution_options(yield_per=settings.USERS_EXPORT_BATCH)
+    async with ReadSessionLocal() as session:
+        result = await session.stream_scalars(stmt)
+        async for ids in result.partitions():
+            yield b"".join(_dumps(i) + b"\n" for i in ids)
+
+
+@router.get("/users/export", summary="사용자 전체 NDJSON 스트리밍")
+async def export_users(after_id: int | None = Query(None, description="이 id 다음부터 (이어받기용)")):
+    """한 줄에 사용자 1 명 (application/x-ndjson)"""
+    return _ndjson(_user_lines(after_id))
+
+
+@router.get("/user-ids/export", summary="사용자 PK 전체 NDJSON 스트리밍")
+async def export_user_ids(after_id: int | None = Query(None, description="이 id 다음부터 (이어받기용)")):
+    """한 줄에 id 1 개 (application/x-ndjson)"""
+    return _ndjson(_user_id_lines(after_id))
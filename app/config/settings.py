@@ -56,6 +56,7 @@
 
 # app/config/settings.py
 
+from typing import Literal
 from urllib.parse import urlparse
 
 from dotenv import load_dotenv
@@ -83,21 +84,44 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int | None = 5432
     POSTGRES_DB: str | None = "houme"
 
-    def _extract_from_jdbc(self) -> tuple[str, int | None, str | None]:
+    # ── 커넥션 풀 · 읽기 전용 레플리카 ──
+    DB_POOL_SIZE: int = 10                     # 상시 유지 커넥션 수
+    DB_MAX_OVERFLOW: int = 10                  # 풀이 비었을 때 추가로 열 수 있는 수 (최대 = SIZE + OVERFLOW)
+    DB_POOL_TIMEOUT: float = 30.0              # 커넥션 대기 한도(초) – 넘으면 TimeoutError
+    DB_POOL_RECYCLE: int = 1800                # 이 시간(초)보다 오래된 커넥션은 재연결 (-1 이면 끔)
+    DB_POOL_PRE_PING: bool = True              # checkout 마다 SELECT 1 (끊긴 커넥션 감지) – False 면 왕복 1 회 절약, 끊긴 연결은 요청 실패로 드러남
+    DB_STATEMENT_CACHE_SIZE: int = 100         # asyncpg prepared statement 캐시 (커넥션당, PgBouncer transaction 모드면 0)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # SQLAlchemy asyncpg 방언 쪽 캐시 (PgBouncer transaction 모드면 0)
+    DB_STATEMENT_CACHE_LIFETIME: int = 300     # 캐시된 statement 최대 수명(초), 0 이면 무제한
+    DB_SLOW_STATEMENT_MS: float = 500.0        # 이보다 오래 걸린 SQL 은 WARNING 로그 (0 이하면 끔)
+    DB_READ_REPLICA_HOST: str | None = None    # 설정 시 프롬프트 합성 · 사용자 조회를 레플리카로 (계정 · DB 이름은 기본과 동일)
+    DB_READ_REPLICA_PORT: int | None = None    # 생략하면 POSTGRES_PORT
+
+    def _extract_from_jdbc(self, raw_host: str | None = None) -> tuple[str, int | None, str | None]:
         """jdbc:postgresql://host:port/db 형식이면 파싱, 아니면 그대로 반환"""
+        raw_host = raw_host or self.POSTGRES_HOST
         jdbc_prefix = "jdbc:"
-        if self.POSTGRES_HOST.startswith(jdbc_prefix):
-            parsed = urlparse(self.POSTGRES_HOST[len(jdbc_prefix):])
-            host = parsed.hostname or self.POSTGRES_HOST
+        if raw_host.startswith(jdbc_prefix):
+            parsed = urlparse(raw_host[len(jdbc_prefix):])
+            host = parsed.hostname or raw_host
             port = parsed.port or self.POSTGRES_PORT
             db   = parsed.path.lstrip("/") or self.POSTGRES_DB
             return host, port, db
-        return self.POSTGRES_HOST, self.POSTGRES_PORT, self.POSTGRES_DB
+        return raw_host, self.POSTGRES_PORT, self.POSTGRES_DB
 
     @property
     def database_url_async(self) -> str:
-        host, port, db = self._extract_from_jdbc()
+        return self._async_url(*self._extract_from_jdbc())
+
+    @property
+    def database_url_read_async(self) -> str | None:
+        """레플리카 URL – DB_READ_REPLICA_HOST 가 없으면 None (기본 엔진으로 읽음)"""
+        if not self.DB_READ_REPLICA_HOST:
+            return None
+        host, port, db = self._extract_from_jdbc(self.DB_READ_REPLICA_HOST)
+        return self._async_url(host, self.DB_READ_REPLICA_PORT or port, db)
 
+    def _async_url(self, host: str, port: int | None, db: str | None) -> str:
         auth = (
             f"{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@"
             if self.POSTGRES_PASSWORD
@@ -121,11 +145,153 @@ class Settings(BaseSettings):
     OPENAI_IMAGE_QUALITY: str
     OPENAI_IMAGE_BACKGROUND: str
     OPENAI_IMAGE_OUTPUT_FORMAT: str
+    IMAGE_CHAIN_TRACING: bool = False   # True: 이미지 파이프라인을 LangChain Runnable 로 실행 (LangSmith 추적)
+    OPENAI_IMAGE_PARTIAL_IMAGES: int = 2  # POST /images/stream 에서 받을 중간 이미지 수 (0~3)
+
+    # ── /images 결과 캐시 (프롬프트+설정 해시 키, 동시 동일 요청은 1 회만 생성) ──
+    IMAGE_CACHE_BACKEND: str = "memory"   # "memory" | "postgres" | "none"
+    IMAGE_CACHE_TTL: float = 86400.0
+    IMAGE_CACHE_MAX_ITEMS: int = 1024     # memory 백엔드 LRU 용량
+    IMAGE_CACHE_PURGE_INTERVAL: float = 3600.0  # postgres – 만료 행 삭제 주기(초, 0 이면 끔 → 외부 작업으로 정리)
+
+    # ── 프롬프트 정교화 (참고 문서 검색 + LLM) · 2 단계 캐시 ──
+    PROMPT_REFINE_ENABLED: bool = False
+    PROMPT_REFINE_MODEL: str = "gpt-4o-mini"
+    PROMPT_REFINE_TEMPERATURE: float = 0.2
+    PROMPT_REFINE_TOP_K: int = 4                       # 참고 문서 청크 수
+    PROMPT_REFINE_CACHE_TTL: float = 86400.0
+    PROMPT_REFINE_CACHE_MAX_ITEMS: int = 1024          # 정확 일치 캐시 LRU 용량
+
+    # ── 파생 이미지 (WebP/AVIF · 썸네일) – 요청의 renditions 로 개별 지정 가능 ──
+    IMAGE_RENDITIONS_DEFAULT: bool = False           # 요청에 renditions 가 없을 때 생성 여부
+    IMAGE_RENDITION_FORMATS: list[Literal["webp", "avif"]] = ["webp"]  # 환경변수는 JSON 배열, 그 밖의 형식은 기동 시 검증 오류
+    IMAGE_THUMBNAIL_SIZES: list[int] = [256, 512]    # 긴 변 기준 px, 썸네일은 WebP
+    IMAGE_RENDITION_QUALITY: int = 80
+
+    # ── /images/jobs 비동기 작업 (프로세스 내부 워커 풀 + 대기열) ──
+    IMAGE_JOB_STORE: str = "memory"       # "memory" | "postgres"
+    IMAGE_JOB_WORKERS: int = 4            # 동시에 실행하는 build_image_chain 수
+    IMAGE_JOB_QUEUE_SIZE: int = 64        # 대기열이 가득 차면 429
+    IMAGE_JOB_RETENTION: float = 3600.0   # memory 저장소에서 끝난 작업을 보관하는 시간(초)
+    IMAGE_JOB_LEASE: float = 90.0         # postgres – 작업 소유 lease(초), 연장이 끊기면 만료 후 failed 로 회수
+    IMAGE_JOB_HEARTBEAT: float = 20.0     # postgres – lease 연장 · 만료 작업 회수 주기(초, LEASE 보다 충분히 짧게)
+
+    # ── OpenAI HTTP 클라이언트 (공유 커넥션 풀) ──
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"  # 로컬 스텁 사용 시 교체
+    OPENAI_HTTP2: bool = False
+    OPENAI_HTTP_MAX_CONNECTIONS: int = 20
+    OPENAI_HTTP_MAX_KEEPALIVE: int = 10
+    OPENAI_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_READ_TIMEOUT: float = 120.0
+    OPENAI_WRITE_TIMEOUT: float = 10.0
+    OPENAI_POOL_TIMEOUT: float = 10.0
+    OPENAI_MAX_RETRIES: int = 2
+    OPENAI_RETRY_BACKOFF_BASE: float = 0.5
+    OPENAI_RETRY_BACKOFF_MAX: float = 20.0
+
+    # ── 후처리 워커 풀 (S3 업로드 / CLIP 스코어링) ──
+    UPLOAD_POOL_WORKERS: int = 8
+    CLIP_POOL_WORKERS: int = 2
+    RENDITION_POOL_WORKERS: int = 2          # WebP/AVIF · 썸네일 인코딩 프로세스 수
+
+    # ── S3 업로더 (지연 생성 클라이언트 + multipart + 재시도) ──
+    S3_ENDPOINT_URL: str | None = None      # MinIO 등 S3 호환 스텁 (예: http://127.0.0.1:9000)
+    S3_MAX_POOL_CONNECTIONS: int = 32       # ≥ UPLOAD_POOL_WORKERS × S3_MULTIPART_CONCURRENCY 권장
+    S3_CONNECT_TIMEOUT: float = 5.0
+    S3_READ_TIMEOUT: float = 30.0
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024
+    S3_MULTIPART_CHUNKSIZE: int = 8 * 1024 * 1024
+    S3_MULTIPART_CONCURRENCY: int = 4       # 업로드 1 건당 파트 동시 전송 수
+    S3_MAX_RETRIES: int = 3
+    S3_RETRY_BACKOFF_BASE: float = 0.2
+    S3_RETRY_BACKOFF_MAX: float = 5.0
+    S3_KEY_PREFIX: str = "fastapi"          # 생성 이미지 키 = {prefix}/{sha256}.png
+    S3_DEDUP_CHECK: bool = True             # head_object 로 같은 이미지면 업로드 생략
+    S3_KNOWN_KEYS_CACHE: int = 4096         # 존재 확인된 키 LRU (head_object 생략)
+
+    # ── CLIP 모델 로딩 (지연 로딩 + 기동 시 백그라운드 워밍업) ──
+    CLIP_MODEL_NAME: str = "ViT-B-32"
+    CLIP_PRETRAINED: str = "laion2b_s34b_b79k"
+    CLIP_WEIGHTS_PATH: str | None = None   # 로컬 체크포인트 경로 – 지정 시 네트워크 접근 없음
+    CLIP_WARMUP_ON_STARTUP: bool = True
+
+    # ── CLIP 추론 백엔드 (CPU 최적화) ──
+    CLIP_INFERENCE_BACKEND: str = "eager"   # "eager" | "int8" | "torchscript"
+    CLIP_INFERENCE_MODE: bool = True        # True: torch.inference_mode / False: torch.no_grad
+    CLIP_NUM_THREADS: int | None = None     # torch intra-op 스레드 수 (None: torch 기본값)
+    CLIP_NUM_INTEROP_THREADS: int | None = None
+
+    # ── CLIP 채점 위치 ──
+    #   local   : 각 워커 프로세스가 모델을 직접 로딩 (기본)
+    #   sidecar : app.utils.clip_server 프로세스 1 개가 모델을 들고, 워커는 Unix 소켓으로 요청
+    CLIP_SCORER: str = "local"
+    CLIP_SIDECAR_SOCKET: str = "/tmp/houme-clip.sock"
+    CLIP_SIDECAR_CONNECTIONS: int = 4       # 워커당 재사용 연결 수
+    CLIP_SIDECAR_TIMEOUT: float = 30.0
+
+    # ── CLIP 동적 배칭 (N 개 또는 T ms 중 먼저 도달 시 flush) ──
+    CLIP_BATCH_ENABLED: bool = True
+    CLIP_BATCH_MAX_SIZE: int = 8
+    CLIP_BATCH_MAX_WAIT_MS: float = 10.0
+
+    # ── CLIP 텍스트 feature LRU 캐시 ──
+    CLIP_TEXT_CACHE_SIZE: int = 4096
+    CLIP_TEXT_CACHE_WARMUP: bool = False          # 기동 시 DB 프롬프트 조합 미리 인코딩 (PROMPT_REFINE_ENABLED 면 생략)
+    CLIP_TEXT_CACHE_WARMUP_MAX_FURNITURE: int = 1  # 워밍업 시 가구태그 조합 최대 개수
+
+    # ── Automap reflection (기동 시) ──
+    AUTOMAP_TABLES: list[str] = ["floor_plans", "tags", "furniture_tags", "users"]  # 비우면 DB 전체
+    AUTOMAP_SNAPSHOT_ENABLED: bool = True        # 스키마 지문이 같으면 reflection 대신 로컬 스냅샷 사용
+    AUTOMAP_SNAPSHOT_PATH: str = "db/.schema_snapshot.pickle"  # app/ 기준
+
+    # ── 사용자 조회 (GET /users, /user-ids) ──
+    USERS_PAGE_SIZE: int = 100                 # limit 생략 시 한 페이지 행 수
+    USERS_PAGE_MAX: int = 1000                 # limit 상한
+    USERS_EXPORT_BATCH: int = 1000             # NDJSON export – 서버 측 커서에서 한 번에 가져오는 행 수
+
+    # ── 프롬프트 카탈로그 캐시 (floor_plans / tags / furniture_tags) ──
+    PROMPT_CATALOG_ENABLED: bool = True
+    PROMPT_CATALOG_TTL: float = 300.0          # 0 이하면 TTL 없음 (무효화로만 갱신)
+    PROMPT_CATALOG_LISTEN: bool = True         # Postgres LISTEN/NOTIFY 로 즉시 무효화
+    PROMPT_CATALOG_CHANNEL: str = "prompt_catalog_changed"
+    PROMPT_BATCH_MAX_ITEMS: int = 500          # POST /prompts/compose:batch 최대 항목 수
 
     EMBED_DIM: int
 
     VECTOR_DOC_PATH: str
 
+    # ── FAISS 벡터 스토어 (프로세스당 1 벌, mmap + 파일 변경 감지) ──
+    VECTOR_STORE_MMAP: bool = True              # 인덱스를 mmap 으로 읽어 워커 간 페이지 공유
+    VECTOR_STORE_WATCH: bool = True             # index.faiss / index.pkl 변경 시 새 버전으로 교체
+    VECTOR_STORE_POLL_INTERVAL: float = 5.0     # 변경 감지 주기(초)
+
+    # ── 벡터 인덱스 증분 갱신 · 임베딩 ──
+    VECTOR_EMBEDDER: str = "openai"                  # openai | hash (네트워크 없는 결정적 로컬 임베더)
+    VECTOR_EMBED_MODEL: str = "text-embedding-ada-002"
+    VECTOR_EMBED_BATCH_SIZE: int = 64                # 임베딩 요청 1 회당 청크 수
+    VECTOR_EMBED_CONCURRENCY: int = 4                # 동시 임베딩 요청 수
+    VECTOR_EMBED_CACHE_PATH: str = "vector_store/embedding_cache.sqlite3"  # app/ 기준
+    VECTOR_CHUNK_SIZE: int = 500
+    VECTOR_CHUNK_OVERLAP: int = 50
+
+    # ── 참고 문서 검색 (BM25 · 벡터 · 하이브리드) ──
+    DOC_RETRIEVAL_MODE: str = "hybrid"               # vector | lexical | hybrid
+    LEXICAL_INDEX_PATH: str = "vector_store/bm25_index.npz"  # app/ 기준 (faiss_index 옆)
+    DOC_HYBRID_MIN_SCORE: float = 2.0                # BM25 1 위 점수가 이 이상이고
+    DOC_HYBRID_MIN_COVERAGE: float = 0.6             # 질의 단어를 이 비율 이상 포함하면 임베딩 생략
+    DOC_HYBRID_RRF_K: int = 60                       # RRF 상수
+
+    # ── pgvector 검색 (embedding_chunks ANN 인덱스) ──
+    PGVECTOR_INDEX: str = "hnsw"                 # hnsw | ivfflat | none
+    PGVECTOR_DISTANCE: str = "cosine"            # cosine | l2 | ip
+    PGVECTOR_HNSW_M: int = 16
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    PGVECTOR_HNSW_EF_SEARCH: int = 40            # 클수록 recall ↑ · 지연 ↑
+    PGVECTOR_IVFFLAT_LISTS: int = 0              # 0 이면 행 수로 자동 (rows/1000, 100만 행 초과는 sqrt(rows))
+    PGVECTOR_IVFFLAT_PROBES: int = 10            # 클수록 recall ↑ · 지연 ↑
+    PGVECTOR_COPY_BATCH: int = 5000              # COPY 1 회당 행 수
+
     # ── AWS ──────────────────────────────
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
@@ -1,18 +1,215 @@
 # app/db/automap.py
+"""
+Automap reflection (기동 시 1 회)
+──────────────────────────────
+- AUTOMAP_TABLES 에 적은 테이블만 reflection (비우면 DB 전체) – 외래키로 참조하는 테이블은 함께 읽힘
+- 결과 MetaData 는 실제로 읽힌 테이블 목록(외래키로 딸려 온 테이블 포함) · 그 목록의 스키마 지문과 함께
+  로컬 스냅샷 파일(pickle)에 저장하고, 다음 기동 때 저장된 목록의 지문(카탈로그 쿼리 1 회)이 같으면
+  reflection 없이 스냅샷을 사용 → 워커 · 레플리카마다 반복되던 reflection 비용 제거
+- 지정한 테이블이 없거나(reflection 실패) 스냅샷을 못 읽으면 DB 전체 reflection 으로 대체 (이 경우 스냅샷은 저장하지 않음)
+- 단계별 소요 시간은 /metrics 의 db.automap 으로 노출
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any
+
+import sqlalchemy
+from sqlalchemy import MetaData, text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
 from sqlalchemy.ext.automap import automap_base
-from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.settings import settings
+from app.libs import metrics
+
+logger = logging.getLogger(__name__)
 
 AutomapBase = automap_base()
 
+SNAPSHOT_PATH = (Path(__file__).resolve().parent.parent / settings.AUTOMAP_SNAPSHOT_PATH).resolve()
+
+# 대상 테이블의 컬럼 · 제약 · 인덱스 정의를 한 줄씩 모아 md5 (tables 가 NULL 이면 현재 스키마 전체)
+FINGERPRINT_SQL = text("""
+WITH rels AS (
+    SELECT c.oid, c.relname
+    FROM pg_class c
+    WHERE c.relnamespace = to_regnamespace(current_schema())
+      AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+      AND (CAST(:tables AS text[]) IS NULL OR c.relname = ANY(CAST(:tables AS text[])))
+), items AS (
+    SELECT format('rel:%s', relname) AS item FROM rels
+    UNION ALL
+    SELECT format('col:%s.%s:%s:%s:%s', r.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+                  a.attnotnull, pg_get_expr(d.adbin, d.adrelid))
+    FROM rels r
+    JOIN pg_attribute a ON a.attrelid = r.oid AND a.attnum > 0 AND NOT a.attisdropped
+    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    UNION ALL
+    SELECT format('con:%s.%s:%s', r.relname, con.conname, pg_get_constraintdef(con.oid))
+    FROM rels r JOIN pg_constraint con ON con.conrelid = r.oid
+    UNION ALL
+    SELECT format('idx:%s', pg_get_indexdef(i.indexrelid))
+    FROM rels r JOIN pg_index i ON i.indrelid = r.oid
+)
+SELECT md5(coalesce(string_agg(item, '|' ORDER BY item), '')) FROM items
+""")
+
+
 def snake_to_camel(s: str) -> str:
     """floor_plans → FloorPlan"""
     parts = s.rstrip("s").split("_")
     return "".join(word.capitalize() for word in parts)
 
-async def init_automap(engine: AsyncEngine) -> None:
-    async with engine.begin() as conn:
-        await conn.run_sync(
-            AutomapBase.prepare,
-            reflect=True,
-            classname_for_table=lambda base, tbl_name, tbl_obj: snake_to_camel(tbl_name),
-        )
+
+def _register_vector_type() -> None:
+    """PostgreSQL vector 타입을 reflection 이 인식하도록 등록"""
+    from pgvector.sqlalchemy import Vector
+    from sqlalchemy.dialects.postgresql.base import ischema_names
+
+    ischema_names["vector"] = Vector
+
+
+class AutomapStats:
+    def __init__(self) -> None:
+        self.source: str | None = None  # snapshot | reflect | full
+        self.tables: list[str] = []
+        self.fingerprint_ms = 0.0
+        self.load_ms = 0.0
+        self.total_ms = 0.0
+        self.error: str | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "source": self.source,
+            "tables": self.tables,
+            "fingerprint_ms": round(self.fingerprint_ms, 1),
+            "load_ms": round(self.load_ms, 1),
+            "total_ms": round(self.total_ms, 1),
+            "error": self.error,
+        }
+
+
+automap_stats = AutomapStats()
+metrics.register("db.automap", automap_stats.snapshot)
+
+
+# ── 스키마 지문 · 스냅샷 ─────────────────────────────
+async def schema_fingerprint(conn: AsyncConnection, tables: list[str] | None) -> str:
+    db_hash = await conn.scalar(FINGERPRINT_SQL, {"tables": tables})
+    # 스냅샷(pickle)은 SQLAlchemy · pgvector 버전에도 묶여 있음
+    from importlib.metadata import version
+
+    material = f"{db_hash}|{sorted(tables or [])}|sqlalchemy={sqlalchemy.__version__}|pgvector={version('pgvector')}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def read_snapshot(path: Path, requested: list[str]) -> dict[str, Any] | None:
+    """
+    같은 AUTOMAP_TABLES 로 만든 스냅샷이면 {"tables", "fingerprint", "metadata"} 반환 (없거나 손상 · 불일치면 None)
+    지문 비교는 호출 측에서 저장된 tables 로 다시 계산해 수행
+    """
+    try:
+        with open(path, "rb") as f:
+            saved = pickle.load(f)  # 이 프로세스가 직접 쓴 로컬 파일만 사용
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # noqa: BLE001  – 손상 · 버전 불일치 → reflection 으로
+        logger.warning("[Automap] 스냅샷 읽기 실패 – reflection 으로 대체: %s", e)
+        return None
+    if not isinstance(saved, dict) or saved.get("requested") != requested or not saved.get("tables"):
+        logger.info("[Automap] AUTOMAP_TABLES 변경 – 스냅샷 무시")
+        return None
+    return saved
+
+
+def save_snapshot(path: Path, requested: list[str], tables: list[str], fingerprint: str, metadata: MetaData) -> None:
+    """requested : AUTOMAP_TABLES, tables : reflection 으로 실제 읽힌 테이블 (지문 대상)"""
+    payload = {"requested": requested, "tables": tables, "fingerprint": fingerprint, "metadata": metadata}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")  # 워커 여럿이 동시에 써도 안전
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as e:  # 읽기 전용 파일시스템 등 – 다음 기동도 reflection
+        logger.warning("[Automap] 스냅샷 저장 실패: %s", e)
+
+
+# ── reflection ────────────────────────────────────
+async def _reflect(conn: AsyncConnection, tables: list[str] | None) -> tuple[MetaData, str]:
+    metadata = MetaData()
+    if tables:
+        try:
+            await conn.run_sync(lambda sync_conn: metadata.reflect(sync_conn, only=tables, views=True))
+            return metadata, "reflect"
+        except InvalidRequestError as e:  # 지정한 테이블이 DB 에 없음
+            automap_stats.error = str(e)
+            logger.warning("[Automap] 범위 reflection 실패 – 전체 reflection 으로 대체: %s", e)
+            metadata = MetaData()
+    await conn.run_sync(lambda sync_conn: metadata.reflect(sync_conn, views=True))
+    return metadata, "full"
+
+
+def _prepare(metadata: MetaData) -> None:
+    for table in metadata.sorted_tables:
+        if table.key not in AutomapBase.metadata.tables:
+            table.to_metadata(AutomapBase.metadata)
+    AutomapBase.prepare(classname_for_table=lambda base, tbl_name, tbl_obj: snake_to_camel(tbl_name))
+
+
+async def init_automap(engine: AsyncEngine, *, use_snapshot: bool | None = None) -> dict[str, Any]:
+    """
+    AUTOMAP_TABLES 범위로 AutomapBase 준비. 단계별 소요 시간(dict) 반환
+    use_snapshot : None 이면 AUTOMAP_SNAPSHOT_ENABLED
+    """
+    started = time.perf_counter()
+    _register_vector_type()
+    tables = list(settings.AUTOMAP_TABLES) or None
+    use_snapshot = settings.AUTOMAP_SNAPSHOT_ENABLED if use_snapshot is None else use_snapshot
+
+    async with engine.connect() as conn:
+        metadata = None
+        automap_stats.fingerprint_ms = 0.0
+        # 스냅샷은 범위 reflection 결과만 사용 – 지문은 저장된 (외래키로 딸려 온 테이블까지 포함한) 목록으로 다시 계산
+        t = time.perf_counter()
+        saved = read_snapshot(SNAPSHOT_PATH, tables) if use_snapshot and tables else None
+        read_ms = (time.perf_counter() - t) * 1000
+        if saved is not None:
+            t = time.perf_counter()
+            fingerprint = await schema_fingerprint(conn, saved["tables"])
+            automap_stats.fingerprint_ms = (time.perf_counter() - t) * 1000
+            if fingerprint == saved["fingerprint"]:
+                metadata = saved["metadata"]
+            else:
+                logger.info("[Automap] 스키마 지문 변경 – 스냅샷 무시")
+
+        t = time.perf_counter()
+        if metadata is not None:
+            source = "snapshot"
+            automap_stats.load_ms = read_ms
+        else:
+            metadata, source = await _reflect(conn, tables)
+            automap_stats.load_ms = (time.perf_counter() - t) * 1000
+            # 전체 reflection(대체 경로)은 저장하지 않음 – 다음 기동도 범위 reflection 부터 다시 시도
+            if use_snapshot and source == "reflect":
+                reflected = sorted(metadata.tables)
+                f = time.perf_counter()
+                fingerprint = await schema_fingerprint(conn, reflected)
+                automap_stats.fingerprint_ms += (time.perf_counter() - f) * 1000
+                save_snapshot(SNAPSHOT_PATH, tables, reflected, fingerprint, metadata)
+
+    _prepare(metadata)
+    automap_stats.source = source
+    automap_stats.tables = sorted(metadata.tables)
+    automap_stats.total_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        "[Automap] %s – %d tables, fingerprint %.1f ms, load %.1f ms, total %.1f ms",
+        source, len(metadata.tables), automap_stats.fingerprint_ms, automap_stats.load_ms, automap_stats.total_ms,
+    )
+    return automap_stats.snapshot()
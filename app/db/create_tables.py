@@ -10,13 +10,47 @@ load_dotenv(PROJECT_ROOT / ".env")
 
 # ── (B) 나머지 import ──
 from sqlalchemy import text
-from app.db.session import engine, Base
+from app.config.settings import settings
+from app.db.session import engine, Base, AsyncSessionLocal
 from app.entity.embedding_chunk import EmbeddingChunk
+from app.entity.image_job import ImageJob
+from app.entity.image_result_cache import ImageResultCache
+from app.services.vector_retrieval import pgvector_retriever
+
+# ── (C) 프롬프트 카탈로그 변경 알림 트리거 ──
+#   floor_plans / tags / furniture_tags 변경 시 NOTIFY → API 프로세스의 카탈로그 캐시 무효화
+CATALOG_TABLES = ("floor_plans", "tags", "furniture_tags")
+
+async def install_catalog_notify_triggers(conn) -> None:
+    channel = settings.PROMPT_CATALOG_CHANNEL
+    await conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION notify_prompt_catalog() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{channel}', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """))
+    for table in CATALOG_TABLES:
+        exists = await conn.scalar(text("SELECT to_regclass(:t) IS NOT NULL"), {"t": table})
+        if not exists:  # 테이블은 메인 백엔드가 관리 – 아직 없으면 건너뜀
+            continue
+        await conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_prompt_catalog_notify ON {table};"))
+        await conn.execute(text(f"""
+            CREATE TRIGGER {table}_prompt_catalog_notify
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_prompt_catalog();
+        """))
 
 async def init_models():
     async with engine.begin() as conn:
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
         await conn.run_sync(Base.metadata.create_all)
+        await install_catalog_notify_triggers(conn)
+
+    # embedding_chunks ANN 인덱스 (PGVECTOR_INDEX · 파라미터가 바뀌었으면 다시 생성)
+    async with AsyncSessionLocal() as session:
+        await pgvector_retriever.ensure_index(session)
 
 if __name__ == "__main__":
     asyncio.run(init_models())
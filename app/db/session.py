@@ -3,10 +3,13 @@ from __future__ import annotations
 
 from typing import AsyncGenerator
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
 from app.config.settings import settings
+from app.db.telemetry import EngineTelemetry, TimedAsyncQueuePool
+from app.libs import metrics
 
 # ────────────────────────────────────────────────
 # 1) Declarative Base
@@ -14,13 +17,43 @@ from app.config.settings import settings
 Base = declarative_base()
 
 # ────────────────────────────────────────────────
-# 2) Async Engine
+# 2) Async Engine – 풀 크기 · 재활용 · pre-ping · statement 캐시는 DB_* 설정
 # ────────────────────────────────────────────────
-engine: AsyncEngine = create_async_engine(
-    settings.database_url_async,
-    echo=False,         # SQL 로그 보고 싶으면 True 로 변경
-    pool_pre_ping=True,
-)
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    # SQLAlchemy asyncpg 방언의 prepared statement 캐시는 URL 쿼리 파라미터로 지정
+    url = make_url(url).update_query_dict(
+        {"prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+    )
+    new_engine = create_async_engine(
+        url,
+        echo=False,         # SQL 로그 보고 싶으면 True 로 변경
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={  # asyncpg 커넥션 자체의 statement 캐시
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "max_cached_statement_lifetime": settings.DB_STATEMENT_CACHE_LIFETIME,
+        },
+    )
+    telemetry = EngineTelemetry(name)
+    telemetry.attach(new_engine)
+    engine_telemetry[name] = telemetry
+    return new_engine
+
+
+engine_telemetry: dict[str, EngineTelemetry] = {}
+
+engine: AsyncEngine = _create_engine(settings.database_url_async, "primary")
+
+# 읽기 전용 레플리카 – DB_READ_REPLICA_HOST 가 없으면 기본 엔진을 그대로 사용
+#   (복제 지연이 있으므로 방금 쓴 데이터를 바로 읽어야 하는 곳에는 쓰지 않음)
+_read_url = settings.database_url_read_async
+read_engine: AsyncEngine = _create_engine(_read_url, "replica") if _read_url else engine
+
+metrics.register("db.pool", lambda: {name: t.snapshot() for name, t in engine_telemetry.items()})
 
 # ────────────────────────────────────────────────
 # 3) Async Session Factory
@@ -30,6 +63,11 @@ AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     expire_on_commit=False,
 )
 
+ReadSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+)
+
 # ────────────────────────────────────────────────
 # 4) FastAPI Depends 헬퍼
 # ────────────────────────────────────────────────
@@ -41,4 +79,16 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
 
-async_session = AsyncSessionLocal
\ No newline at end of file
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """읽기 전용 조회용 – 레플리카가 설정돼 있으면 레플리카 세션"""
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+async_session = AsyncSessionLocal
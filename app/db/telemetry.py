@@ -0,0 +1,138 @@
+# app/db/telemetry.py
+"""
+커넥션 풀 · SQL 지연 지표
+──────────────────────────────
+- checkout 대기 : 풀 클래스(TimedAsyncQueuePool)의 _do_get 소요 시간 – 풀이 꽉 차면 여기서 기다림
+                  (여유 커넥션이 없어 새로 여는 시간도 포함)
+- 사용 중 커넥션 : pool.checkedout() / 최대(size + overflow) → /images 동시 처리량 대비 풀 크기 판단용
+- SQL 지연 : before/after_cursor_execute 이벤트 – 전체 + 문장별(상위 STATEMENT_TOP 개만 노출)
+- DB_SLOW_STATEMENT_MS 를 넘은 SQL 은 WARNING 로그
+- 엔진마다 EngineTelemetry 1 개, /metrics 의 db.pool 로 노출
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config.settings import settings
+from app.libs import metrics
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_MAX_KEYS = 200  # 문장별 통계 최대 종류 (넘으면 "<other>" 로 합침)
+STATEMENT_TOP = 10        # /metrics 에 보이는 문장 수 (누적 시간 순)
+STATEMENT_PREVIEW = 160   # 문장 앞부분만 표시
+
+
+class EngineTelemetry:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.checkout_wait = metrics.TimingStats()
+        self.statements = metrics.TimingStats()
+        self.by_statement: dict[str, metrics.TimingStats] = {}
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.slow_statements = 0
+        self.pool: Any = None
+
+    # ── 연결 ──────────────────────────────────────────
+    def attach(self, engine: AsyncEngine) -> None:
+        sync_engine = engine.sync_engine
+        self.pool = sync_engine.pool
+        if isinstance(self.pool, TimedAsyncQueuePool):
+            self.pool.telemetry = self
+        event.listen(sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_execute)
+        event.listen(sync_engine, "connect", self._on_connect)
+        event.listen(sync_engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_conn, record) -> None:
+        self.connects += 1
+
+    def _on_invalidate(self, dbapi_conn, record, exc) -> None:
+        self.invalidations += 1
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            context._telemetry_started = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = getattr(context, "_telemetry_started", None)
+        if started is None:
+            return
+        ms = (time.perf_counter() - started) * 1000
+        self.statements.observe(ms)
+
+        stats = self.by_statement.get(statement)
+        if stats is None:
+            key = statement if len(self.by_statement) < STATEMENT_MAX_KEYS else "<other>"
+            stats = self.by_statement.setdefault(key, metrics.TimingStats(window=256))
+        stats.observe(ms)
+
+        if 0 < settings.DB_SLOW_STATEMENT_MS <= ms:
+            self.slow_statements += 1
+            logger.warning("[DB:%s] 느린 SQL %.0f ms – %s", self.name, ms, statement[:STATEMENT_PREVIEW])
+
+    # ── 지표 ──────────────────────────────────────────
+    def _pool_status(self) -> dict[str, Any]:
+        pool = self.pool
+        if pool is None or not hasattr(pool, "checkedout"):
+            return {}
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        in_use = pool.checkedout()
+        return {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "in_use": in_use,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "utilization": round(in_use / capacity, 3) if capacity > 0 else 0.0,
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        top = sorted(self.by_statement.items(), key=lambda item: item[1].total_ms, reverse=True)[:STATEMENT_TOP]
+        return {
+            "pool": self._pool_status(),
+            "checkout_wait": self.checkout_wait.snapshot(),
+            "checkout_timeouts": self.checkout_timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "statements": self.statements.snapshot(),
+            "slow_statements": self.slow_statements,
+            "top_statements": [
+                {"sql": sql[:STATEMENT_PREVIEW], **stats.snapshot(), "total_ms": round(stats.total_ms, 1)}
+                for sql, stats in top
+            ],
+        }
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """checkout 대기 시간을 재는 풀 (엔진 dispose 로 새로 만들어져도 telemetry 유지)"""
+
+    telemetry: EngineTelemetry | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:  # DB_POOL_TIMEOUT 초과
+            if self.telemetry is not None:
+                self.telemetry.checkout_timeouts += 1
+            raise
+        finally:
+            if self.telemetry is not None:
+                self.telemetry.checkout_wait.observe((time.perf_counter() - started) * 1000)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        if self.telemetry is not None:
+            self.telemetry.pool = pool
+        return pool
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.session import Base
+
+class ImageJob(Base):
+    """비동기 이미지 생성 작업 상태 (IMAGE_JOB_STORE=postgres) – POST /images/jobs"""
+    __tablename__ = "image_jobs"
+    id         = Column(String(32), primary_key=True)           # uuid4().hex
+    status     = Column(String(16), nullable=False, index=True) # queued | running | succeeded | failed
+    request    = Column(JSONB, nullable=False)
+    result     = Column(JSONB)
+    error      = Column(Text)
+    owner      = Column(String(64), index=True)                 # 작업을 받은 프로세스 (image_jobs.INSTANCE_ID)
+    lease_until = Column(DateTime(timezone=True))               # owner 가 주기적으로 연장 – 지나면 다른 프로세스가 failed 로 회수
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
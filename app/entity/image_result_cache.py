@@ -0,0 +1,11 @@
+from sqlalchemy import Column, DateTime, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.session import Base
+
+class ImageResultCache(Base):
+    """/images 결과 캐시 (IMAGE_CACHE_BACKEND=postgres) – key = 프롬프트+이미지 설정 해시"""
+    __tablename__ = "image_result_cache"
+    key        = Column(String(64), primary_key=True)
+    result     = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,134 @@
+# app/libs/embeddings.py
+"""
+임베딩 제공자 · 영구 임베딩 캐시
+──────────────────────────────
+- build_embedder(VECTOR_EMBEDDER) : "openai" (OpenAI 임베딩 API) | "hash" (네트워크 없는 결정적 로컬 임베더)
+  → 인덱싱과 조회가 같은 제공자를 쓰도록 한 곳에서 생성
+- EmbeddingCache : (모델 이름, 텍스트 sha256) → 벡터 를 sqlite 파일에 저장
+  → 문서를 고쳐도 바뀌지 않은 청크는 다시 임베딩하지 않음 (비용 발생 X)
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.config.settings import settings
+
+_TOKEN = re.compile(r"\w+")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedder_name(embedder: Embeddings) -> str:
+    """캐시 키에 쓰는 모델 이름 – 모델이 바뀌면 캐시도 분리"""
+    name = getattr(embedder, "name", None) or getattr(embedder, "model", None)
+    return str(name or type(embedder).__name__)
+
+
+class HashEmbedder(Embeddings):
+    """
+    결정적 로컬 임베더 (테스트 · 오프라인용)
+    단어 + 글자 3-gram 을 해시 버킷에 부호와 함께 더한 뒤 L2 정규화 → 겹치는 표현이 많을수록 가까움
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self.name = f"hash-{dim}"
+
+    def _features(self, text: str) -> Iterable[str]:
+        for token in _TOKEN.findall(text.lower()):
+            yield token
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                yield padded[i:i + 3]
+
+    def _embed(self, text: str) -> list[float]:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vec[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = float(np.linalg.norm(vec))
+        return (vec / norm if norm else vec).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+def build_embedder(kind: str | None = None) -> Embeddings:
+    kind = kind or settings.VECTOR_EMBEDDER
+    if kind == "openai":
+        from langchain_community.embeddings import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(model=settings.VECTOR_EMBED_MODEL, openai_api_key=settings.OPENAI_API_KEY)
+    if kind == "hash":
+        return HashEmbedder(settings.EMBED_DIM)
+    raise ValueError(f"알 수 없는 VECTOR_EMBEDDER: {kind} (openai | hash)")
+
+
+class EmbeddingCache:
+    """sqlite 임베딩 캐시 – 벡터는 float32 BLOB 으로 저장 (여러 스레드에서 호출 가능)"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model     TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim       INTEGER NOT NULL,
+                vector    BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            for start in range(0, len(hashes), 500):  # sqlite 변수 개수 제한
+                chunk = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    (model, *chunk),
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, items: Iterable[tuple[str, Sequence[float]]]) -> None:
+        rows = []
+        for h, vector in items:
+            arr = np.asarray(vector, dtype=np.float32)
+            rows.append((model, h, arr.shape[0], arr.tobytes()))
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def count(self, model: str | None = None) -> int:
+        with self._lock:
+            if model is None:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,123 @@
+# app/libs/executors.py
+"""
+이벤트 루프 밖에서 블로킹 작업을 돌리는 bounded 워커 풀
+──────────────────────────────
+- upload_pool    : boto3 업로드 (네트워크 I/O) · PNG 디코딩
+- clip_pool      : CLIP forward (torch 는 연산 중 GIL 을 놓으므로 스레드로 충분)
+- rendition_pool : WebP/AVIF · 썸네일 인코딩 (CPU 전용 → 프로세스 풀, spawn)
+- 동시 실행 수는 워커 수로 제한, 초과 요청은 이벤트 루프 위에서 대기
+- 대기 중(queued)/실행 중(running) 개수와 대기·실행 시간을 /metrics 로 노출
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from app.config.settings import settings
+from app.libs import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    ThreadPoolExecutor(또는 ProcessPoolExecutor) + 동시 실행 한도 + 대기열 지표
+    processes=True 면 fn 과 인자는 pickle 가능해야 함 (모듈 최상위 함수)
+    """
+
+    def __init__(self, name: str, max_workers: int, *, processes: bool = False) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.processes = processes
+        self._executor: Executor
+        if processes:
+            # 스레드·torch 가 떠 있는 프로세스에서 fork 하지 않도록 spawn (워커는 첫 작업 때 생성)
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._sem: asyncio.Semaphore | None = None
+        self._sem_loop: asyncio.AbstractEventLoop | None = None
+
+        self.queued = 0
+        self.running = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait = metrics.TimingStats()
+        self.run_time = metrics.TimingStats()
+
+        metrics.register(f"pool.{name}", self.snapshot)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # 세마포어는 이벤트 루프에 묶이므로 루프가 바뀌면(스크립트·벤치마크) 새로 만든다
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_workers)
+            self._sem_loop = loop
+        return self._sem
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """fn(*args, **kwargs) 를 풀에서 실행하고 결과를 await"""
+        loop = asyncio.get_running_loop()
+        enqueued = time.perf_counter()
+
+        sem = self._semaphore()
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            await sem.acquire()
+        finally:
+            self.queued -= 1
+
+        started = time.perf_counter()
+        self.wait.observe((started - enqueued) * 1000)
+        self.running += 1
+        try:
+            result = await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+            return result
+        finally:
+            self.running -= 1
+            self.run_time.observe((time.perf_counter() - started) * 1000)
+            sem.release()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "kind": "process" if self.processes else "thread",
+            "max_workers": self.max_workers,
+            "queued": self.queued,
+            "running": self.running,
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait": self.wait.snapshot(),
+            "run": self.run_time.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 프로세스 공용 풀 (스레드는 실제 작업이 들어올 때 생성됨)
+upload_pool = BoundedExecutor("upload", settings.UPLOAD_POOL_WORKERS)
+clip_pool = BoundedExecutor("clip", settings.CLIP_POOL_WORKERS)
+rendition_pool = BoundedExecutor("rendition", settings.RENDITION_POOL_WORKERS, processes=True)
+
+
+def shutdown_pools() -> None:
+    """lifespan 종료 시 호출"""
+    for pool in (upload_pool, clip_pool, rendition_pool):
+        pool.shutdown()
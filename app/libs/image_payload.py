@@ -0,0 +1,180 @@
+# app/libs/image_payload.py
+"""
+이미지 페이로드 저복사(low-copy) 처리
+──────────────────────────────
+- OpenAI 응답을 통째로 json 파싱하지 않고, 스트림에서 "b64_json" 값만 찾아
+  base64 를 조각 단위로 디코딩해 하나의 버퍼(ImageBuffer)에 바로 기록
+- 버퍼는 Content-Length 로 크기를 미리 잡아 재할당 없이 채움
+- 업로더(S3) · 채점기(PIL) 는 같은 버퍼의 memoryview 를 MemoryviewReader 로 읽음 → 추가 복사 없음
+- url 출력 모드에서는 이미지 URL 을 스트리밍 다운로드해 같은 버퍼에 기록
+"""
+from __future__ import annotations
+
+import binascii
+import io
+from typing import AsyncIterator
+
+_B64_KEY = b'"b64_json"'
+
+
+class ImageBuffer:
+    """미리 잡은 bytearray 에 순서대로 기록하고, 기록된 구간만 memoryview 로 노출"""
+
+    def __init__(self, capacity: int = 0) -> None:
+        self._buf = bytearray(capacity)
+        self.length = 0
+
+    def write(self, data: bytes) -> None:
+        end = self.length + len(data)
+        if end > len(self._buf):
+            # 예상 크기를 넘으면 1.5 배씩 늘림 (view 를 내보내기 전에만 호출됨)
+            self._buf.extend(bytes(max(end - len(self._buf), len(self._buf) // 2)))
+        self._buf[self.length:end] = data
+        self.length = end
+
+    @property
+    def view(self) -> memoryview:
+        """기록된 구간의 읽기 전용 view (복사 없음)"""
+        return memoryview(self._buf)[: self.length].toreadonly()
+
+
+class MemoryviewReader(io.RawIOBase):
+    """
+    memoryview 를 파일처럼 읽는 reader – io.BytesIO(memoryview) 와 달리 내용을 복사하지 않음
+    (boto3 Body · PIL.Image.open 이 요구하는 read / readinto / seek / tell 지원)
+    """
+
+    def __init__(self, view: memoryview) -> None:
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._view[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos : end].tobytes()
+        self._pos = end
+        return data
+
+    def readall(self) -> bytes:
+        return self.read(-1)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+
+def as_reader(data: bytes | memoryview) -> io.RawIOBase | io.BytesIO:
+    """bytes 는 BytesIO(내부 공유), memoryview 는 MemoryviewReader 로 – 둘 다 복사 없음"""
+    if isinstance(data, memoryview):
+        return MemoryviewReader(data)
+    return io.BytesIO(data)
+
+
+class Base64Decoder:
+    """base64 조각을 4 의 배수 단위로 디코딩해 ImageBuffer 에 기록 (나머지는 다음 조각과 합침)"""
+
+    def __init__(self, out: ImageBuffer) -> None:
+        self.out = out
+        self._rest = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if b"\\" in chunk:  # JSON 이스케이프(\/) 제거
+            chunk = chunk.replace(b"\\", b"")
+        if self._rest:
+            chunk = self._rest + chunk
+        usable = len(chunk) - len(chunk) % 4
+        if usable:
+            self.out.write(binascii.a2b_base64(chunk[:usable]))
+        self._rest = chunk[usable:]
+
+    def finish(self) -> None:
+        if self._rest:
+            raise ValueError(f"base64 길이가 4 의 배수가 아님 (남은 {len(self._rest)} 바이트)")
+
+
+async def decode_b64_json_stream(chunks: AsyncIterator[bytes], size_hint: int = 0) -> memoryview:
+    """
+    OpenAI 이미지 응답(JSON) 스트림에서 첫 번째 "b64_json" 값을 찾아 바로 디코딩.
+    size_hint : 응답 Content-Length (base64 → 원본은 약 3/4)
+    """
+    out = ImageBuffer(size_hint * 3 // 4)
+    decoder = Base64Decoder(out)
+    pending = b""
+    state = "key"  # key → value_start → value → done
+
+    async for chunk in chunks:
+        if state == "done":
+            continue  # 나머지 필드(usage 등)는 버림
+        data = pending + chunk if pending else chunk
+        pending = b""
+
+        if state == "key":
+            idx = data.find(_B64_KEY)
+            if idx < 0:
+                pending = data[-(len(_B64_KEY) - 1):]  # 조각 경계에 걸친 키 대비
+                continue
+            data = data[idx + len(_B64_KEY):]
+            state = "value_start"
+
+        if state == "value_start":
+            data = data.lstrip(b" \t\r\n:")
+            if not data:
+                continue
+            if data[:1] != b'"':
+                raise ValueError("b64_json 값이 문자열이 아닙니다")
+            data = data[1:]
+            state = "value"
+
+        if state == "value":
+            end = data.find(b'"')
+            if end < 0:
+                # 이스케이프 문자가 조각 끝에 걸리면 다음 조각과 합쳐 처리
+                if data.endswith(b"\\"):
+                    data, pending = data[:-1], b"\\"
+                decoder.feed(data)
+                continue
+            decoder.feed(data[:end])
+            decoder.finish()
+            state = "done"
+
+    if state != "done":
+        raise ValueError("응답에서 b64_json 을 찾지 못했습니다")
+    return out.view
+
+
+async def read_stream(chunks: AsyncIterator[bytes], size_hint: int = 0) -> memoryview:
+    """바이너리 스트림(url 다운로드)을 ImageBuffer 하나에 기록"""
+    out = ImageBuffer(size_hint)
+    async for chunk in chunks:
+        out.write(chunk)
+    return out.view
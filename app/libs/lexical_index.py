@@ -0,0 +1,192 @@
+# app/libs/lexical_index.py
+"""
+BM25 역색인 (한국어 Kiwi 형태소 기준)
+──────────────────────────────
+- 청크를 Kiwi 로 형태소 분석해 내용어(명사 · 동사/형용사 어간 · 외국어 · 숫자 · 어근)만 색인
+- 디스크 형식 : faiss_index 옆 bm25_index.npz 한 파일 (CSR 역색인 – 단어별 (문서 번호, tf) 배열)
+  문자열(단어 · 문서 id · 본문)은 utf-8 바이트 + offset 배열로 저장 → pickle 없이 np.load 로 바로 읽음
+- 조회는 질의 단어의 posting 만 훑어 BM25(Okapi) 점수 계산 – 네트워크 · 임베딩 호출 없음
+  (점수 식 · idf 하한은 rank_bm25.BM25Okapi 와 동일)
+- 인덱스는 vector_indexer 가 FAISS 갱신 때 함께 다시 만듦
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+# 색인할 품사 (Kiwi 태그, 불규칙 활용 표시 "-I/-R" 은 떼고 비교)
+LEXICAL_TAGS = frozenset({"NNG", "NNP", "NR", "SL", "SH", "SN", "XR", "VV", "VA"})
+
+_kiwi = None
+_kiwi_lock = threading.Lock()
+
+
+def _get_kiwi():
+    """Kiwi 모델은 로딩이 무거우므로 프로세스당 1 회 생성"""
+    global _kiwi
+    if _kiwi is None:
+        with _kiwi_lock:
+            if _kiwi is None:
+                from kiwipiepy import Kiwi
+
+                _kiwi = Kiwi()
+    return _kiwi
+
+
+def _terms(tokens) -> list[str]:
+    return [t.form.lower() for t in tokens if t.tag.split("-", 1)[0] in LEXICAL_TAGS]
+
+
+def tokenize(text: str) -> list[str]:
+    kiwi = _get_kiwi()
+    with _kiwi_lock:
+        return _terms(kiwi.tokenize(text))
+
+
+def tokenize_many(texts: Sequence[str]) -> list[list[str]]:
+    kiwi = _get_kiwi()
+    with _kiwi_lock:
+        return [_terms(tokens) for tokens in kiwi.tokenize(list(texts))]
+
+
+def _pack(strings: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack(data: np.ndarray, offsets: np.ndarray) -> list[str]:
+    raw = data.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+class LexicalHit(NamedTuple):
+    doc_id: str
+    text: str
+    score: float
+    coverage: float  # 질의 단어 중 이 문서에 나온 비율
+
+
+class LexicalIndex:
+    def __init__(
+        self,
+        terms: list[str],
+        indptr: np.ndarray,
+        postings: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray,
+        doc_ids: list[str],
+        texts: list[str],
+        *,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+    ) -> None:
+        self.terms = terms
+        self.vocab = {term: i for i, term in enumerate(terms)}
+        self.indptr = indptr
+        self.postings = postings
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.doc_ids = doc_ids
+        self.texts = texts
+        self.k1 = k1
+        self.b = b
+
+        n = len(doc_ids)
+        self.avgdl = float(doc_len.mean()) if n else 0.0
+        df = np.diff(indptr).astype(np.float64)
+        idf = np.log((n - df + 0.5) / (df + 0.5)) if n else df
+        if len(idf):
+            idf[idf < 0] = epsilon * float(idf.mean())  # 절반 넘는 문서에 나온 단어 (rank_bm25 와 동일)
+        self.idf = idf.astype(np.float32)
+        # 문서 길이 정규화 항은 미리 계산
+        self._norm = (k1 * (1 - b + b * doc_len / self.avgdl)).astype(np.float32) if n else doc_len
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    # ── 생성 · 저장 ─────────────────────────────────
+    @classmethod
+    def build(cls, doc_ids: Sequence[str], texts: Sequence[str]) -> "LexicalIndex":
+        counts = [Counter(tokens) for tokens in tokenize_many(texts)]
+        terms = sorted({term for c in counts for term in c})
+        vocab = {term: i for i, term in enumerate(terms)}
+
+        rows: list[list[tuple[int, int]]] = [[] for _ in terms]
+        for doc, c in enumerate(counts):
+            for term, tf in c.items():
+                rows[vocab[term]].append((doc, tf))
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(r) for r in rows])
+        postings = np.fromiter((d for r in rows for d, _ in r), dtype=np.int32, count=int(indptr[-1]))
+        tfs = np.fromiter((tf for r in rows for _, tf in r), dtype=np.int32, count=int(indptr[-1]))
+        doc_len = np.array([sum(c.values()) for c in counts], dtype=np.int32)
+        return cls(terms, indptr, postings, tfs, doc_len, list(doc_ids), list(texts))
+
+    def save(self, path: Path) -> None:
+        """임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+        terms, term_offsets = _pack(self.terms)
+        ids, id_offsets = _pack(self.doc_ids)
+        texts, text_offsets = _pack(self.texts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez_compressed(
+                f,
+                terms=terms, term_offsets=term_offsets,
+                indptr=self.indptr, postings=self.postings, tfs=self.tfs, doc_len=self.doc_len,
+                doc_ids=ids, doc_id_offsets=id_offsets,
+                texts=texts, text_offsets=text_offsets,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LexicalIndex":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(
+                _unpack(z["terms"], z["term_offsets"]),
+                z["indptr"], z["postings"], z["tfs"], z["doc_len"],
+                _unpack(z["doc_ids"], z["doc_id_offsets"]),
+                _unpack(z["texts"], z["text_offsets"]),
+            )
+
+    # ── 조회 ──────────────────────────────────────────
+    def search_tokens(self, query_terms: Sequence[str], k: int) -> list[LexicalHit]:
+        n = len(self.doc_ids)
+        unique = set(query_terms)
+        if not n or not unique:
+            return []
+        scores = np.zeros(n, dtype=np.float32)
+        matched = np.zeros(n, dtype=np.int32)
+        seen: set[int] = set()
+        for term in query_terms:  # 질의에 두 번 나온 단어는 두 번 더함 (rank_bm25 와 동일)
+            i = self.vocab.get(term)
+            if i is None:
+                continue
+            start, end = self.indptr[i], self.indptr[i + 1]
+            docs = self.postings[start:end]
+            tf = self.tfs[start:end]
+            scores[docs] += self.idf[i] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+            if i not in seen:
+                seen.add(i)
+                matched[docs] += 1
+        candidates = np.flatnonzero(matched)
+        if not len(candidates):
+            return []
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            LexicalHit(self.doc_ids[d], self.texts[d], float(scores[d]), matched[d] / len(unique))
+            for d in ordered
+        ]
+
+    def search(self, query: str, k: int = 4) -> list[LexicalHit]:
+        return self.search_tokens(tokenize(query), k)
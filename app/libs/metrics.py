@@ -0,0 +1,82 @@
+# app/libs/metrics.py
+"""
+프로세스 내부 지표 레지스트리
+──────────────────────────────
+- 각 모듈이 `register(name, provider)` 로 스냅샷 함수를 등록
+- `GET /metrics` (app/api/ops.py) 가 `snapshot()` 결과를 JSON 으로 노출
+"""
+from __future__ import annotations
+
+import logging
+import os
+from collections import deque
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_providers: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+class TimingStats:
+    """
+    누적 count/avg/max + 최근 window 개 샘플 기준 p50/p99 (ms 단위)
+    이벤트 루프 한 스레드에서만 갱신한다는 전제 → 락 없음
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def observe(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    def _percentile(self, q: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[int(q * (len(ordered) - 1))]
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self._percentile(0.50), 3),
+            "p99_ms": round(self._percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+def current_rss_mb() -> float:
+    """현재 RSS(MB) – /proc 이 없으면(macOS 등) 최고치 ru_maxrss 로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def register(name: str, provider: Callable[[], dict[str, Any]]) -> None:
+    """지표 제공 함수 등록 (같은 이름이면 덮어씀)"""
+    _providers[name] = provider
+
+
+def snapshot() -> dict[str, Any]:
+    """등록된 모든 지표를 한 번에 수집 – 한 provider 의 오류가 전체를 막지 않도록 격리"""
+    result: dict[str, Any] = {}
+    for name, provider in _providers.items():
+        try:
+            result[name] = provider()
+        except Exception as e:  # noqa: BLE001
+            logger.warning("지표 수집 실패 – %s: %s", name, e)
+            result[name] = {"error": str(e)}
+    return result
@@ -0,0 +1,240 @@
+# app/libs/openai_client.py
+"""
+OpenAI 공유 HTTP 클라이언트
+──────────────────────────────
+- 앱 lifespan 에서 한 번 만들고 종료 시 닫는다 → 요청마다 TCP+TLS 핸드셰이크를 반복하지 않음
+- keep-alive 풀 한도 · HTTP/2 · 단계별(connect/read/write/pool) 타임아웃은 settings 로 조정
+- 429 / 5xx 응답은 `Retry-After` 헤더를 존중하는 지수 백오프로 재시도
+- `OPENAI_BASE_URL` 을 바꾸면 로컬 스텁 서버로 대체 가능 (scripts/fake_openai_images.py)
+- `stream=true` 요청은 `open_event_stream()` 으로 SSE 이벤트를 받는다
+- 큰 응답은 `open_response_stream()` 으로 본문을 메모리에 모으지 않고 조각 단위로 읽는다
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator
+
+import httpx
+from httpx_sse import EventSource
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 재시도 대상 상태 코드
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# 요청이 서버에 도달하기 전에 실패한 경우만 재시도 (이미지 생성은 멱등이 아님)
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.OPENAI_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401  (httpx[http2] 설치 여부 확인)
+        except ImportError:
+            logger.warning("⚠️ h2 패키지가 없어 HTTP/1.1 로 동작합니다 (pip install 'httpx[http2]')")
+            http2 = False
+
+    return httpx.AsyncClient(
+        base_url=settings.OPENAI_BASE_URL,
+        headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OPENAI_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=settings.OPENAI_CONNECT_TIMEOUT,
+            read=settings.OPENAI_READ_TIMEOUT,
+            write=settings.OPENAI_WRITE_TIMEOUT,
+            pool=settings.OPENAI_POOL_TIMEOUT,
+        ),
+    )
+
+
+async def init_openai_client() -> httpx.AsyncClient:
+    """lifespan 시작 시 호출 – 공유 클라이언트 생성"""
+    global _client
+    if _client is None:
+        _client = _build_client()
+        logger.info("OpenAI HTTP 클라이언트 생성 – base_url=%s", settings.OPENAI_BASE_URL)
+    return _client
+
+
+async def close_openai_client() -> None:
+    """lifespan 종료 시 호출 – 커넥션 풀 정리"""
+    global _client, _download_client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    if _download_client is not None:
+        await _download_client.aclose()
+        _download_client = None
+
+
+def get_openai_client() -> httpx.AsyncClient:
+    """
+    공유 클라이언트 반환.
+    lifespan 밖(스크립트·벤치마크)에서 호출되면 지연 생성한다.
+    """
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+def _retry_after_seconds(res: httpx.Response) -> float | None:
+    """Retry-After 헤더(초 또는 HTTP-date)를 초 단위로 변환"""
+    value = res.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """지수 백오프 + full jitter"""
+    ceiling = min(settings.OPENAI_RETRY_BACKOFF_MAX, settings.OPENAI_RETRY_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+async def post_with_retry(path: str, *, json: dict[str, Any]) -> httpx.Response:
+    """
+    공유 클라이언트로 POST 를 보내고, 429/5xx · 연결 실패는 재시도한다.
+    마지막 응답은 상태 코드와 관계없이 그대로 반환 → 호출 측에서 raise_for_status()
+    """
+    client = get_openai_client()
+    max_retries = settings.OPENAI_MAX_RETRIES
+
+    for attempt in range(max_retries + 1):
+        try:
+            res = await client.post(path, json=json)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= max_retries:
+                raise
+            delay = _backoff_seconds(attempt)
+            logger.warning("OpenAI 연결 실패(%s) – %.2fs 후 재시도 (%d/%d)", e, delay, attempt + 1, max_retries)
+            await asyncio.sleep(delay)
+            continue
+
+        if res.status_code not in RETRYABLE_STATUS or attempt >= max_retries:
+            return res
+
+        retry_after = _retry_after_seconds(res)
+        delay = (
+            min(retry_after, settings.OPENAI_RETRY_BACKOFF_MAX)
+            if retry_after is not None
+            else _backoff_seconds(attempt)
+        )
+        logger.warning(
+            "OpenAI %s 응답 – %.2fs 후 재시도 (%d/%d)", res.status_code, delay, attempt + 1, max_retries
+        )
+        await asyncio.sleep(delay)
+
+    raise AssertionError("unreachable")
+
+
+@asynccontextmanager
+async def open_response_stream(
+    path: str,
+    *,
+    json: dict[str, Any],
+    headers: dict[str, str] | None = None,
+) -> AsyncIterator[httpx.Response]:
+    """
+    응답 본문을 읽지 않은 채로 넘기는 POST (본문은 호출 측이 aiter_bytes 등으로 소비).
+    재시도는 post_with_retry 와 같은 규칙 – 단, 본문을 읽기 시작한 뒤에는 재시도하지 않음
+    (2xx 가 아니면 본문을 읽어 httpx.HTTPStatusError 로 올림)
+    """
+    client = get_openai_client()
+    max_retries = settings.OPENAI_MAX_RETRIES
+
+    for attempt in range(max_retries + 1):
+        request = client.build_request("POST", path, json=json, headers=headers)
+        try:
+            res = await client.send(request, stream=True)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= max_retries:
+                raise
+            delay = _backoff_seconds(attempt)
+            logger.warning("OpenAI 연결 실패(%s) – %.2fs 후 재시도 (%d/%d)", e, delay, attempt + 1, max_retries)
+            await asyncio.sleep(delay)
+            continue
+
+        if res.status_code in RETRYABLE_STATUS and attempt < max_retries:
+            await res.aclose()
+            retry_after = _retry_after_seconds(res)
+            delay = (
+                min(retry_after, settings.OPENAI_RETRY_BACKOFF_MAX)
+                if retry_after is not None
+                else _backoff_seconds(attempt)
+            )
+            logger.warning(
+                "OpenAI %s 응답 – %.2fs 후 재시도 (%d/%d)", res.status_code, delay, attempt + 1, max_retries
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        try:
+            if res.is_error:
+                await res.aread()
+                res.raise_for_status()
+            yield res
+        finally:
+            await res.aclose()
+        return
+
+    raise AssertionError("unreachable")
+
+
+@asynccontextmanager
+async def open_event_stream(path: str, *, json: dict[str, Any]) -> AsyncIterator[EventSource]:
+    """SSE 응답(stream=true)을 여는 POST – 재시도 규칙은 open_response_stream 과 동일"""
+    async with open_response_stream(path, json=json, headers={"Accept": "text/event-stream"}) as res:
+        yield EventSource(res)
+
+
+# ────────────────────────────────────────────────────────────────
+# 이미지 URL 다운로드용 클라이언트 (url 출력 모드)
+#   - OpenAI 클라이언트와 분리 → 외부 호스트로 Authorization 헤더가 나가지 않음
+# ────────────────────────────────────────────────────────────────
+_download_client: httpx.AsyncClient | None = None
+
+
+def get_download_client() -> httpx.AsyncClient:
+    global _download_client
+    if _download_client is None:
+        _download_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.OPENAI_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.OPENAI_CONNECT_TIMEOUT,
+                read=settings.OPENAI_READ_TIMEOUT,
+                write=settings.OPENAI_WRITE_TIMEOUT,
+                pool=settings.OPENAI_POOL_TIMEOUT,
+            ),
+            follow_redirects=True,
+        )
+    return _download_client
@@ -1,37 +1,286 @@
-import boto3
-import uuid
+# app/libs/s3.py
+"""
+S3 업로더
+──────────────────────────────
+- boto3 클라이언트는 첫 업로드 때 한 번 생성 (import 시점 X) → 설정·엔드포인트 교체가 쉬움
+- botocore 커넥션 풀 크기 · 타임아웃은 settings 로 조정, S3_ENDPOINT_URL 로 MinIO 등 S3 호환 스텁 사용
+- S3_MULTIPART_THRESHOLD 이상은 multipart (TransferConfig), 미만은 put_object 한 번
+- 블로킹 호출은 upload_pool(UPLOAD_POOL_WORKERS) 에서 실행 → 동시 업로드 수 제한
+- 일시 오류(5xx · throttling · 연결 오류)는 이벤트 루프에서 full-jitter 백오프 후 재시도
+  (백오프 동안 풀 스레드를 붙잡지 않음)
+- 생성 이미지는 내용 해시(sha256) 키로 저장 → 같은 이미지는 head_object 확인 후 업로드 생략
+  (s3:ListBucket 권한이 없으면 없는 키도 403 – 존재 여부를 알 수 없으므로 확인을 끄고 그대로 업로드)
+- 업로드 지연 · 처리량(bytes/s) · 중복 생략 수를 /metrics 로 노출
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
 import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
 from botocore.exceptions import BotoCoreError, ClientError
 
 from app.config.settings import settings
+from app.libs import metrics
+from app.libs.executors import upload_pool
+from app.libs.image_payload import as_reader
 
 logger = logging.getLogger(__name__)
 
-# S3 클라이언트 생성
-s3 = boto3.client(
-    "s3",
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    region_name=settings.AWS_REGION,
-)
+# 재시도 대상 S3 오류 코드 (그 외 5xx 도 재시도)
+RETRYABLE_CODES = frozenset({
+    "SlowDown", "Throttling", "ThrottlingException", "RequestTimeout",
+    "RequestTimeTooSkewed", "InternalError", "ServiceUnavailable",
+})
+
+
+def _is_retryable(e: BaseException) -> bool:
+    if isinstance(e, ClientError):
+        code = e.response.get("Error", {}).get("Code", "")
+        status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in RETRYABLE_CODES or status >= 500
+    if isinstance(e, BotoCoreError):  # 연결 실패 · 타임아웃 등
+        return True
+    # multipart 실패는 S3UploadFailedError 로 감싸져 올라옴 → 원인으로 판단
+    return e.__cause__ is not None and _is_retryable(e.__cause__)
+
+
+def _is_not_found(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+def _is_forbidden(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in ("403", "Forbidden", "AccessDenied")
+
+
+def content_key(data: bytes | memoryview, ext: str = "png") -> str:
+    """내용 주소 키 – {S3_KEY_PREFIX}/{sha256}.{ext} (memoryview 도 복사 없이 해시)"""
+    return f"{settings.S3_KEY_PREFIX}/{hashlib.sha256(data).hexdigest()}.{ext}"
+
+
+class S3Uploader:
+    def __init__(self) -> None:
+        self._client = None
+        self._transfer_config = None
+        self._lock = threading.Lock()
+
+        # 존재가 확인된 키 (LRU) – 같은 이미지 반복 시 head_object 도 생략
+        self._known: OrderedDict[str, None] = OrderedDict()
+        self._known_max = settings.S3_KNOWN_KEYS_CACHE
+        self._head_forbidden_logged = False  # 403 경고는 프로세스당 한 번만
+
+        self.uploads = 0
+        self.deduplicated = 0
+        self.head_forbidden = 0
+        self.bytes_saved = 0
+        self.multipart = 0
+        self.retries = 0
+        self.failed = 0
+        self.bytes_total = 0
+        self.busy_s = 0.0
+        self.latency = metrics.TimingStats()
+
+        metrics.register("s3.uploader", self.snapshot)
+
+    # ── 클라이언트 (지연 생성, 스레드 안전) ──────────────
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client
+
+    def _build_client(self):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        config = Config(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.S3_CONNECT_TIMEOUT,
+            read_timeout=settings.S3_READ_TIMEOUT,
+            retries={"mode": "standard", "total_max_attempts": 1},  # 재시도는 upload() 에서
+            s3={"addressing_style": "path"} if settings.S3_ENDPOINT_URL else None,
+        )
+        self._transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+        )
+        logger.info(
+            "S3 클라이언트 생성 – endpoint=%s pool=%d",
+            settings.S3_ENDPOINT_URL or "aws", settings.S3_MAX_POOL_CONNECTIONS,
+        )
+        return boto3.client(
+            "s3",
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            config=config,
+        )
+
+    def object_url(self, key: str) -> str:
+        if settings.S3_ENDPOINT_URL:
+            return f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{settings.AWS_S3_BUCKET_NAME}/{key}"
+        return f"https://{settings.AWS_S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+    # ── 동기 업로드 (풀 스레드에서 실행) ─────────────────
+    def exists_sync(self, key: str) -> bool:
+        """있으면 True. 없거나 확인할 권한이 없으면(403) False → 업로드 진행"""
+        try:
+            self.client.head_object(Bucket=settings.AWS_S3_BUCKET_NAME, Key=key)
+        except ClientError as e:
+            if _is_not_found(e):
+                return False
+            if _is_forbidden(e):
+                # ListBucket 없이 HeadObject 하면 없는 키도 403 (있는 키는 200) – 이 호출만 "없음" 으로 처리
+                self.head_forbidden += 1
+                if not self._head_forbidden_logged:
+                    self._head_forbidden_logged = True
+                    logger.warning(
+                        "S3 head_object 403 – 없는 키로 보고 업로드합니다 "
+                        "(s3:ListBucket 이 없으면 없는 키도 403, s3:GetObject 가 없으면 있는 키도 403): %s", e,
+                    )
+                return False
+            raise
+        return True
+
+    def upload_sync(self, data: bytes | memoryview, key: str, content_type: str, skip_existing: bool = False) -> str:
+        """
+        업로드 방식 반환 : "exists"(이미 있어 생략) | "put" | "multipart"
+        memoryview 는 파일 객체로 감싸 그대로 전송 (복사 없음)
+        """
+        client = self.client
+        if skip_existing and self.exists_sync(key):
+            return "exists"
+        if len(data) < settings.S3_MULTIPART_THRESHOLD:
+            client.put_object(
+                Bucket=settings.AWS_S3_BUCKET_NAME,
+                Key=key,
+                Body=as_reader(data),
+                ContentType=content_type,
+            )
+            return "put"
+        client.upload_fileobj(
+            as_reader(data),
+            settings.AWS_S3_BUCKET_NAME,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self._transfer_config,
+        )
+        return "multipart"
+
+    # ── 비동기 업로드 ─────────────────────────────────
+    def _remember(self, key: str) -> None:
+        self._known[key] = None
+        self._known.move_to_end(key)
+        while len(self._known) > self._known_max:
+            self._known.popitem(last=False)
+
+    async def upload(
+        self,
+        data: bytes | memoryview,
+        key: str,
+        content_type: str = "image/png",
+        *,
+        skip_existing: bool = False,
+    ) -> str:
+        """
+        풀에서 업로드하고 객체 URL 반환. 일시 오류는 S3_MAX_RETRIES 회까지 재시도
+        skip_existing=True : 내용 주소 키 전용 – 이미 있는 키는 업로드하지 않음
+        """
+        if skip_existing and key in self._known:
+            self.deduplicated += 1
+            self.bytes_saved += len(data)
+            return self.object_url(key)
+
+        max_retries = settings.S3_MAX_RETRIES
+        started = time.perf_counter()
+
+        for attempt in range(max_retries + 1):
+            try:
+                mode = await upload_pool.run(self.upload_sync, data, key, content_type, skip_existing)
+                break
+            except Exception as e:
+                if attempt >= max_retries or not _is_retryable(e):
+                    self.failed += 1
+                    raise RuntimeError(f"S3 업로드 실패: {e}") from e
+                self.retries += 1
+                ceiling = min(settings.S3_RETRY_BACKOFF_MAX, settings.S3_RETRY_BACKOFF_BASE * (2 ** attempt))
+                delay = random.uniform(0, ceiling)
+                logger.warning("S3 업로드 오류(%s) – %.2fs 후 재시도 (%d/%d)", e, delay, attempt + 1, max_retries)
+                await asyncio.sleep(delay)
 
-# 이미지 바이트 데이터, content_type을 받아, S3에 저장된 이미지의 URL 반환
-def upload_image_to_s3(png_bytes: bytes, content_type="image/png") -> str:
+        elapsed = time.perf_counter() - started
+        url = self.object_url(key)
+        if skip_existing:
+            self._remember(key)
+        if mode == "exists":
+            self.deduplicated += 1
+            self.bytes_saved += len(data)
+            logger.info("S3 중복 이미지 – 업로드 생략: %s", url)
+            return url
+
+        self.uploads += 1
+        self.multipart += int(mode == "multipart")
+        self.bytes_total += len(data)
+        self.busy_s += elapsed
+        self.latency.observe(elapsed * 1000)
+        logger.info("✅ S3 업로드 성공: %s (%.1f KB, %.0f ms)", url, len(data) / 1024, elapsed * 1000)
+        return url
+
+    async def upload_image(
+        self,
+        png_bytes: bytes | memoryview,
+        content_type: str = "image/png",
+        ext: str = "png",
+    ) -> tuple[str, str]:
+        """생성 이미지를 내용 주소 키로 업로드 → (S3 키, URL). 같은 이미지는 한 번만 저장"""
+        key = await upload_pool.run(content_key, png_bytes, ext)  # 해시는 GIL 을 놓으므로 풀에서
+        url = await self.upload(png_bytes, key, content_type, skip_existing=settings.S3_DEDUP_CHECK)
+        return key, url
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "endpoint": settings.S3_ENDPOINT_URL or "aws",
+            "uploads": self.uploads,
+            "deduplicated": self.deduplicated,
+            "dedup_check": settings.S3_DEDUP_CHECK,
+            "head_forbidden": self.head_forbidden,
+            "bytes_saved": self.bytes_saved,
+            "multipart": self.multipart,
+            "retries": self.retries,
+            "failed": self.failed,
+            "bytes_total": self.bytes_total,
+            "bytes_per_sec": round(self.bytes_total / self.busy_s) if self.busy_s else 0,
+            "latency": self.latency.snapshot(),
+        }
+
+
+s3_uploader = S3Uploader()
+
+
+# 이미지 바이트 데이터, content_type을 받아, S3에 저장된 이미지의 URL 반환 (스크립트용 동기 버전)
+def upload_image_to_s3(png_bytes: bytes | memoryview, content_type="image/png") -> str:
     """
-    PNG 바이트를 S3에 업로드하고 URL을 반환
+    PNG 바이트를 내용 주소 키로 S3에 업로드하고 URL을 반환
+    (이벤트 루프 안에서는 `await s3_uploader.upload_image(...)` 사용)
     """
-    # S3 내부 경로
-    filename = f"fastapi/{uuid.uuid4()}.png"
+    key = content_key(png_bytes)
     try:
-        s3.put_object(  # S3에 이미지 파일을 저장
-            Bucket=settings.AWS_S3_BUCKET_NAME,
-            Key=filename,  # S3에서의 파일 경로
-            Body=png_bytes,
-            ContentType=content_type,
-        )
-        s3_url = f"https://{settings.AWS_S3_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{filename}"
-        logger.info("✅ S3 업로드 성공: %s", s3_url)
-        return s3_url
-
+        s3_uploader.upload_sync(png_bytes, key, content_type, skip_existing=settings.S3_DEDUP_CHECK)
     except (BotoCoreError, ClientError) as e:
         raise RuntimeError(f"S3 업로드 실패: {e}")
+    return s3_uploader.object_url(key)
@@ -0,0 +1,246 @@
+# app/libs/vector_indexer.py
+"""
+FAISS 증분 인덱서
+──────────────────────────────
+- 문서를 청크로 나눠 청크마다 sha256 → 인덱스에 이미 있는 청크는 그대로 둠
+- 새로 생긴 청크만 임베딩 : EmbeddingCache 에 있으면 재사용, 없으면 VECTOR_EMBED_BATCH_SIZE 단위 배치를
+  VECTOR_EMBED_CONCURRENCY 개까지 병렬 요청 → 결과는 캐시에 저장
+- 사라진 청크는 FAISS.delete, 새 청크는 FAISS.add_embeddings 로 기존 인덱스를 제자리에서 갱신
+- 청크 해시는 docstore 내용에서 다시 계산 → 예전 방식(uuid id)으로 만든 인덱스도 재임베딩 없이 이어서 사용
+- 저장은 프로세스별 임시 폴더(mkdtemp)에 쓴 뒤 swap 잠금 안에서 두 파일 교체 → 읽는 쪽(같은 잠금)은
+  항상 같은 버전의 index.faiss · index.pkl 쌍을 봄. VectorStoreManager 변경 감지가 새 버전을 로드
+- 갱신 전체는 build 잠금(파일 잠금)으로 직렬화 → 워커 여럿이 동시에 시작해도 한 곳만 임베딩 · 저장하고
+  나머지는 기다렸다가 결과를 로드
+- lexical_path 가 있으면 같은 청크로 BM25 역색인(lexical_index)도 다시 만듦 (로컬 형태소 분석, 임베딩 X)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from filelock import FileLock
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.config.settings import settings
+from app.libs.embeddings import EmbeddingCache, embedder_name, text_hash
+from app.libs.lexical_index import LexicalIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILES = ("index.faiss", "index.pkl")
+BUILD_LOCK_TIMEOUT = 3600.0  # 다른 프로세스의 전체 재임베딩을 기다리는 최대 시간(초)
+
+
+def build_lock(path: Path) -> FileLock:
+    """인덱스 갱신 직렬화 (임베딩 · 저장 전체)"""
+    return FileLock(str(path.with_name(f".{path.name}.build.lock")), timeout=BUILD_LOCK_TIMEOUT)
+
+
+def swap_lock(path: Path) -> FileLock:
+    """두 파일 교체 ↔ 두 파일 읽기 상호 배제 (짧게만 잡음)"""
+    return FileLock(str(path.with_name(f".{path.name}.swap.lock")), timeout=60)
+
+
+def index_exists(path: Path) -> bool:
+    return all((path / name).exists() for name in INDEX_FILES)
+
+
+@dataclass
+class IndexReport:
+    chunks: int = 0        # 문서의 고유 청크 수
+    unchanged: int = 0     # 인덱스에 이미 있던 청크
+    added: int = 0
+    removed: int = 0
+    cache_hits: int = 0    # 임베딩 캐시에서 가져온 청크
+    embedded: int = 0      # 실제로 임베딩 API 를 호출한 청크
+    batches: int = 0
+    lexical_docs: int = 0  # BM25 인덱스를 다시 만들었으면 문서 수
+    elapsed_ms: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def split_chunks(raw_text: str) -> list[str]:
+    from langchain_text_splitters import CharacterTextSplitter
+
+    splitter = CharacterTextSplitter(
+        chunk_size=settings.VECTOR_CHUNK_SIZE,
+        chunk_overlap=settings.VECTOR_CHUNK_OVERLAP,
+    )
+    return splitter.split_text(raw_text)
+
+
+class IncrementalIndexer:
+    def __init__(
+        self,
+        path: Path,
+        embedder: Embeddings,
+        cache: EmbeddingCache,
+        *,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+        lexical_path: Path | None = None,
+    ) -> None:
+        self.path = path
+        self.lexical_path = lexical_path
+        self.embedder = embedder
+        self.cache = cache
+        self.model = embedder_name(embedder)
+        self.batch_size = batch_size or settings.VECTOR_EMBED_BATCH_SIZE
+        self.concurrency = concurrency or settings.VECTOR_EMBED_CONCURRENCY
+
+    # ── 임베딩 (캐시 → 배치 · 병렬) ─────────────────────
+    def embed(self, texts: dict[str, str], report: IndexReport) -> dict[str, list[float]]:
+        """{해시: 텍스트} → {해시: 벡터}"""
+        hashes = list(texts)
+        vectors = self.cache.get_many(self.model, hashes)
+        report.cache_hits += len(vectors)
+
+        missing = [h for h in hashes if h not in vectors]
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        if not batches:
+            return vectors
+
+        def run(batch: list[str]) -> list[tuple[str, list[float]]]:
+            result = self.embedder.embed_documents([texts[h] for h in batch])
+            pairs = list(zip(batch, result))
+            self.cache.put_many(self.model, pairs)  # 배치마다 저장 → 중간 실패해도 끝난 배치는 남음
+            return pairs
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches)), thread_name_prefix="embed") as pool:
+            for pairs in pool.map(run, batches):
+                vectors.update(pairs)
+        report.embedded += len(missing)
+        report.batches += len(batches)
+        return vectors
+
+    # ── 인덱스 ────────────────────────────────────────
+    def _load(self):
+        from langchain_community.vectorstores import FAISS
+
+        if index_exists(self.path):
+            return FAISS.load_local(str(self.path), self.embedder, allow_dangerous_deserialization=True)
+        return None
+
+    def _save(self, store) -> None:
+        """
+        이 프로세스 전용 임시 폴더에 저장 후 swap 잠금 안에서 두 파일 교체
+        (읽는 쪽이 반쯤 쓴 파일이나 새 index + 옛 docstore 조합을 보지 않도록)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{self.path.name}.", dir=self.path.parent))
+        try:
+            store.save_local(str(tmp))
+            self.path.mkdir(parents=True, exist_ok=True)
+            with swap_lock(self.path):
+                for name in INDEX_FILES:
+                    os.replace(tmp / name, self.path / name)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _save_lexical(self, store, report: IndexReport) -> None:
+        if self.lexical_path is None:
+            return
+        doc_ids = list(store.index_to_docstore_id.values())
+        texts = [store.docstore.search(doc_id).page_content for doc_id in doc_ids]
+        LexicalIndex.build(doc_ids, texts).save(self.lexical_path)
+        report.lexical_docs = len(doc_ids)
+
+    def sync(self, raw_text: str) -> IndexReport:
+        """문서 내용에 맞게 인덱스 갱신 (바뀐 것이 없으면 저장도 하지 않음)"""
+        from langchain_community.vectorstores import FAISS
+
+        started = time.perf_counter()
+        report = IndexReport()
+
+        wanted: dict[str, str] = {}
+        for chunk in split_chunks(raw_text):
+            wanted.setdefault(text_hash(chunk), chunk)  # 같은 내용 청크는 1 개만
+        report.chunks = len(wanted)
+
+        store = self._load()
+        stale: list[str] = []
+        present: set[str] = set()
+        if store is not None:
+            for doc_id in store.index_to_docstore_id.values():
+                doc = store.docstore.search(doc_id)
+                h = text_hash(doc.page_content) if isinstance(doc, Document) else None
+                if h in wanted and h not in present:
+                    present.add(h)
+                else:
+                    stale.append(doc_id)
+        new = {h: t for h, t in wanted.items() if h not in present}
+        report.unchanged = len(present)
+
+        if not new and not stale:
+            if store is not None and self.lexical_path is not None and not self.lexical_path.exists():
+                self._save_lexical(store, report)
+            report.elapsed_ms = (time.perf_counter() - started) * 1000
+            return report
+
+        vectors = self.embed(new, report)
+        pairs = [(new[h], vectors[h]) for h in new]
+        metadatas = [{"chunk_hash": h} for h in new]
+        if store is None:
+            store = FAISS.from_embeddings(pairs, self.embedder, metadatas=metadatas, ids=list(new))
+        else:
+            if stale:
+                store.delete(stale)
+            if pairs:
+                store.add_embeddings(pairs, metadatas=metadatas, ids=list(new))
+        report.added = len(new)
+        report.removed = len(stale)
+
+        self._save(store)
+        self._save_lexical(store, report)
+        report.elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info("[VectorIndex] 갱신 – %s", report.as_dict())
+        return report
+
+
+def _remove_stale_tmp(path: Path) -> None:
+    """중간에 죽은 프로세스가 남긴 임시 폴더 정리 (build 잠금 안에서만 호출)"""
+    for tmp in path.parent.glob(f".{path.name}.*"):
+        if tmp.is_dir():
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def sync_vector_index(
+    path: Path,
+    source: Path,
+    embedder: Embeddings,
+    lexical_path: Path | None = None,
+    *,
+    if_missing: bool = False,
+) -> IndexReport:
+    """
+    source 문서로 path 의 인덱스를 증분 갱신 (캐시는 VECTOR_EMBED_CACHE_PATH)
+    lexical_path 를 생략하면 LEXICAL_INDEX_PATH 에 BM25 인덱스도 함께 저장
+    if_missing : 잠금을 얻은 뒤 인덱스가 이미 있으면(다른 프로세스가 만듦) 아무것도 하지 않음
+    """
+    if not source.exists():
+        raise FileNotFoundError(f"[VectorStore] document not found: {source}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with build_lock(path):
+        if if_missing and index_exists(path):
+            return IndexReport()
+        _remove_stale_tmp(path)
+        app_dir = Path(__file__).resolve().parent.parent
+        cache = EmbeddingCache((app_dir / settings.VECTOR_EMBED_CACHE_PATH).resolve())
+        try:
+            indexer = IncrementalIndexer(
+                path, embedder, cache,
+                lexical_path=lexical_path or (app_dir / settings.LEXICAL_INDEX_PATH).resolve(),
+            )
+            return indexer.sync(source.read_text(encoding="utf-8"))
+        finally:
+            cache.close()
@@ -1,12 +1,39 @@
 # app/libs/vector_store.py
-from pathlib import Path
+"""
+FAISS 벡터 스토어 매니저 (프로세스당 1 벌)
+──────────────────────────────
+- app/vector_store/faiss_index 를 프로세스에서 한 번만 로드, 임베딩 객체도 1 개만 생성
+- VECTOR_STORE_MMAP=True : faiss.IO_FLAG_MMAP 으로 읽기 → 인덱스 페이지는 OS 페이지 캐시를 공유
+  (워커 N 개여도 인덱스 본문은 물리 메모리에 1 벌)
+- VECTOR_STORE_WATCH=True : index.faiss / index.pkl 의 (mtime, size) 를 주기적으로 확인해
+  바뀌면 백그라운드에서 새 버전을 로드한 뒤 참조만 교체 → 조회는 막히지 않음
+  (쓰는 도중의 파일을 읽지 않도록 두 번 연속 같은 값일 때만 교체, 로드 실패 시 이전 버전 유지)
+- 기동(start)은 있는 인덱스를 읽기만 함 – 없으면 로그만 남기고 벡터 스토어 없이 기동
+  (워커마다 기동 시 임베딩 API 를 부르지 않도록 생성은 scripts/build_vector_index.py 또는 첫 조회 때)
+- 첫 조회 때도 인덱스가 없으면 vector_indexer 로 생성 – 파일 잠금으로 한 프로세스만 만들고 나머지는 그 결과를 로드
+  두 파일은 swap 잠금 안에서 읽어 항상 같은 버전 쌍을 로드
+- 임베딩 제공자는 VECTOR_EMBEDDER 로 교체 (openai | hash) – 인덱싱 · 조회가 같은 객체 사용
+- 로드 시간 · 로드 전후 RSS 를 /metrics 로 노출
+"""
+from __future__ import annotations
 
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.docstore.document import Document
+import asyncio
+import logging
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from app.config.settings import settings
+from app.libs import metrics
+
+if TYPE_CHECKING:  # langchain · numpy 는 실제 로드 · 갱신 시점에만 import (import main 비용 유지)
+    from langchain_community.vectorstores import FAISS
+
+    from app.libs.vector_indexer import IndexReport
+
+logger = logging.getLogger(__name__)
 
 # ── (A) 모듈 기준 “app/” 폴더
 BASE_DIR = Path(__file__).resolve().parent.parent  # …/app/libs → …/app
@@ -14,35 +41,210 @@ BASE_DIR = Path(__file__).resolve().parent.parent  # …/app/libs → …/app
 # ── (B) 문서·인덱스 경로
 TXT_SOURCE = (BASE_DIR / settings.VECTOR_DOC_PATH).resolve()
 VECTORSTORE_PATH = (BASE_DIR / "vector_store" / "faiss_index").resolve()
+INDEX_FILES = ("index.faiss", "index.pkl")
+
+
+def build_index(path: Path, embeddings: Any, *, if_missing: bool = False) -> IndexReport:
+    """문서 → 청크 → (바뀐 청크만) 임베딩 → FAISS 증분 갱신·저장"""
+    from app.libs.vector_indexer import sync_vector_index
+
+    return sync_vector_index(path, TXT_SOURCE, embeddings, if_missing=if_missing)
+
+
+def read_faiss_index(path: Path, mmap: bool):
+    """index.faiss 읽기 – mmap 을 지원하지 않는 인덱스 종류/빌드면 일반 읽기로 대체"""
+    import faiss
+
+    if mmap:
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        try:
+            return faiss.read_index(str(path), flags), True
+        except RuntimeError as e:
+            logger.warning("[VectorStore] mmap 로드 불가 – 일반 로드로 대체: %s", e)
+    return faiss.read_index(str(path)), False
+
+
+class VectorStoreManager:
+    def __init__(self, path: Path, *, mmap: bool, poll_interval: float) -> None:
+        self.path = path
+        self.mmap = mmap
+        self.poll_interval = poll_interval
+
+        self._store: FAISS | None = None
+        self._embeddings: Any = None
+        self._signature: tuple | None = None
+        self._lock = threading.Lock()
+        self._watch_task: asyncio.Task[None] | None = None
+
+        self.version = 0
+        self.mmapped = False
+        self.reloads = 0
+        self.errors = 0
+        self.last_error: str | None = None
+        self.last_sync: dict[str, Any] | None = None
+        self.load_time = metrics.TimingStats()
+        self.rss_before_mb: float | None = None
+        self.rss_after_mb: float | None = None
+
+        metrics.register("vector_store", self.snapshot)
+
+    # ── 로드 ─────────────────────────────────────────
+    def _file_signature(self) -> tuple | None:
+        signature = []
+        for name in INDEX_FILES:
+            try:
+                st = (self.path / name).stat()
+            except FileNotFoundError:
+                return None
+            signature.append((st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    @property
+    def embeddings(self) -> Any:
+        if self._embeddings is None:
+            from app.libs.embeddings import build_embedder
+
+            self._embeddings = build_embedder()
+        return self._embeddings
+
+    def _load(self) -> FAISS:
+        """디스크에서 새 버전을 읽어 반환 (교체는 호출 측에서)"""
+        from langchain_community.vectorstores import FAISS
+
+        from app.libs.vector_indexer import swap_lock
+
+        if self._file_signature() is None:
+            logger.info("[VectorStore] 인덱스 없음 – 문서에서 생성: %s", self.path)
+            self.sync(if_missing=True)  # 다른 워커가 먼저 만들고 있으면 기다렸다가 그 결과를 로드
+
+        started = time.perf_counter()
+        rss_before = metrics.current_rss_mb()
+        with swap_lock(self.path):  # 교체 중인 두 파일을 섞어 읽지 않도록
+            signature = self._file_signature()
+            index, mmapped = read_faiss_index(self.path / "index.faiss", self.mmap)
+            with open(self.path / "index.pkl", "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)  # 로컬에서 만든 파일만 사용
+        store = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+        )
+
+        self._signature = signature
+        self.mmapped = mmapped
+        self.rss_before_mb = rss_before
+        self.rss_after_mb = metrics.current_rss_mb()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.load_time.observe(elapsed_ms)
+        logger.info(
+            "[VectorStore] 로드 v%d – ntotal=%d mmap=%s %.0f ms, RSS %.1f → %.1f MB",
+            self.version + 1, index.ntotal, mmapped, elapsed_ms, self.rss_before_mb, self.rss_after_mb,
+        )
+        return store
+
+    def get(self) -> FAISS:
+        """현재 버전 반환 (첫 호출 때만 로드) – 조회 측은 받은 참조를 그대로 사용"""
+        store = self._store
+        if store is not None:
+            return store
+        with self._lock:
+            if self._store is None:
+                self._store = self._load()
+                self.version += 1
+            return self._store
+
+    def reload(self) -> bool:
+        """파일이 바뀌었으면 새 버전을 읽어 교체. 교체했으면 True"""
+        with self._lock:
+            if self._store is not None and self._file_signature() == self._signature:
+                return False
+            store = self._load()
+            self._store = store  # 참조 교체는 원자적 – 진행 중 조회는 이전 버전으로 끝남
+            self.version += 1
+            self.reloads += 1
+            return True
+
+    # ── 변경 감지 (lifespan) ─────────────────────────
+    async def _watch(self) -> None:
+        seen = self._file_signature()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = self._file_signature()
+            if current is None or current == self._signature:
+                seen = current
+                continue
+            if current != seen:  # 아직 쓰는 중일 수 있음 → 다음 주기에 같은 값이면 교체
+                seen = current
+                continue
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:  # noqa: BLE001  – 이전 버전으로 계속 서비스
+                self.errors += 1
+                self.last_error = str(e)
+                logger.exception("[VectorStore] 새 버전 로드 실패 – 이전 버전 유지")
+
+    def sync(self, if_missing: bool = False) -> IndexReport:
+        """문서와 인덱스를 맞춤 – 파일이 바뀌면 변경 감지(또는 reload)가 새 버전으로 교체"""
+        report = build_index(self.path, self.embeddings, if_missing=if_missing)
+        self.last_sync = report.as_dict()
+        return report
+
+    async def start(self, watch: bool = True) -> None:
+        """있는 인덱스만 선로드 (생성 · 임베딩 호출 없음) + (선택) 변경 감지 시작"""
+        if self._file_signature() is None:
+            logger.warning(
+                "[VectorStore] 인덱스 없음 – 벡터 스토어 없이 기동 "
+                "(python -m scripts.build_vector_index 로 만들면 변경 감지가 로드): %s", self.path,
+            )
+        else:
+            try:
+                await asyncio.to_thread(self.get)
+            except Exception as e:  # noqa: BLE001  – 벡터 검색을 쓰지 않는 배포에서도 기동은 계속
+                self.errors += 1
+                self.last_error = str(e)
+                logger.warning("[VectorStore] 선로드 실패 – 첫 조회 때 다시 시도: %s", e)
+        if watch and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def snapshot(self) -> dict[str, Any]:
+        store = self._store
+        return {
+            "path": str(self.path),
+            "loaded": store is not None,
+            "version": self.version,
+            "ntotal": store.index.ntotal if store is not None else 0,
+            "mmap": self.mmapped,
+            "watching": self._watch_task is not None,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "last_sync": self.last_sync,
+            "load": self.load_time.snapshot(),
+            "rss_before_load_mb": round(self.rss_before_mb, 1) if self.rss_before_mb is not None else None,
+            "rss_after_load_mb": round(self.rss_after_mb, 1) if self.rss_after_mb is not None else None,
+        }
+
+
+vector_store_manager = VectorStoreManager(
+    VECTORSTORE_PATH,
+    mmap=settings.VECTOR_STORE_MMAP,
+    poll_interval=settings.VECTOR_STORE_POLL_INTERVAL,
+)
 
-# ── (C) 문서 파일 체크
-if not TXT_SOURCE.exists():
-    raise FileNotFoundError(f"[VectorStore] document not found: {TXT_SOURCE}")
 
 def get_vectorstore() -> FAISS:
     """
-    • 저장된 FAISS 인덱스를 로드하거나,
-    • 없으면 raw_text → split → FAISS.build → 저장
+    • 프로세스 공용 FAISS 스토어 반환 (최초 1 회 로드, 없으면 문서로 생성·저장)
+    • 파일이 바뀌면 변경 감지 task 가 새 버전으로 교체
     """
-    # 1) 임베딩 객체
-    embeddings = OpenAIEmbeddings(openai_api_key=settings.OPENAI_API_KEY)
-
-    # 2) 이미 훈련된 인덱스가 있으면 바로 로드
-    if VECTORSTORE_PATH.exists():
-        return FAISS.load_local(
-            str(VECTORSTORE_PATH),
-            embeddings,
-            allow_dangerous_deserialization=True
-        )
-
-    # 3) 없으면 문서 읽어서 청크 분할
-    raw_text = TXT_SOURCE.read_text(encoding="utf-8")
-    splitter = CharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    texts = splitter.split_text(raw_text)
-    docs = [Document(page_content=t) for t in texts]
-
-    # 4) FAISS 생성 & 디렉터리 보장 후 저장
-    vs = FAISS.from_documents(docs, embeddings)
-    VECTORSTORE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    vs.save_local(str(VECTORSTORE_PATH))
-    return vs
+    return vector_store_manager.get()
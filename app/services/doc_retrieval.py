@@ -0,0 +1,169 @@
+"""
+app/services/doc_retrieval.py
+──────────────────────────────
+✔️ 참고 문서 검색 – BM25(lexical) · FAISS(vector) · hybrid
+
+▸ 동작 요약
+   1. **lexical** : bm25_index.npz 로 BM25 top-k (로컬 계산, 임베딩 호출 없음).
+   2. **vector** : 질의를 임베딩해 FAISS top-k.
+   3. **hybrid** : 먼저 BM25. 1 위 문서의 점수가 DOC_HYBRID_MIN_SCORE 이상이고 질의 단어를
+                   DOC_HYBRID_MIN_COVERAGE 비율 이상 포함하면 그대로 반환 (임베딩 생략).
+                   아니면 임베딩 → FAISS 결과와 RRF(reciprocal rank fusion) 로 합침.
+                   호출 측에 이미 질의 벡터가 있으면(정교화 단계) 임베딩 비용이 없으므로 항상 합침.
+   4. BM25 인덱스 파일이 바뀌면 다음 조회 때 다시 읽음 (확인 주기 VECTOR_STORE_POLL_INTERVAL).
+   5. **지표** : 모드별 호출 수, 임베딩 생략 비율, 지연을 /metrics 로 노출.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, Sequence
+
+from app.config.settings import settings
+from app.libs import metrics
+from app.libs.vector_store import BASE_DIR, vector_store_manager
+
+if TYPE_CHECKING:  # numpy · Kiwi 는 인덱스를 처음 읽을 때 import
+    from app.libs.lexical_index import LexicalIndex
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+LEXICAL_INDEX_PATH = (BASE_DIR / settings.LEXICAL_INDEX_PATH).resolve()
+
+
+class DocHit(NamedTuple):
+    text: str
+    score: float
+    source: str  # lexical | vector | hybrid
+
+
+class LexicalIndexHolder:
+    """bm25_index.npz 지연 로드 + 파일 변경 시 다시 읽기"""
+
+    def __init__(self, path: Path, check_interval: float) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._index: LexicalIndex | None = None
+        self._signature: tuple[int, int] | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def get(self) -> LexicalIndex | None:
+        """인덱스가 없으면 None (→ 벡터 검색으로 대체)"""
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < self.check_interval:
+            return self._index
+        with self._lock:
+            self._checked_at = now
+            signature = self._file_signature()
+            if signature is None:
+                return self._index
+            if signature != self._signature:
+                from app.libs.lexical_index import LexicalIndex
+
+                self._index = LexicalIndex.load(self.path)
+                self._signature = signature
+                self.loads += 1
+                logger.info("[DocRetrieval] BM25 인덱스 로드 – %d 문서", len(self._index))
+            return self._index
+
+
+def rrf_merge(rankings: Sequence[Sequence[str]], k: int, rrf_k: int) -> list[tuple[str, float]]:
+    """순위 목록들 → (텍스트, RRF 점수) 상위 k 개"""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, text in enumerate(ranking):
+            scores[text] = scores.get(text, 0.0) + 1.0 / (rrf_k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+class DocRetriever:
+    def __init__(self, mode: str | None = None) -> None:
+        self.mode = mode or settings.DOC_RETRIEVAL_MODE
+        if self.mode not in RETRIEVAL_MODES:
+            raise ValueError(f"알 수 없는 DOC_RETRIEVAL_MODE: {self.mode} ({' | '.join(RETRIEVAL_MODES)})")
+        self.lexical = LexicalIndexHolder(LEXICAL_INDEX_PATH, settings.VECTOR_STORE_POLL_INTERVAL)
+
+        self.queries = 0
+        self.lexical_only = 0     # hybrid 에서 BM25 만으로 끝난 질의
+        self.embedding_calls = 0
+        self.latency = metrics.TimingStats()
+
+    # ── 단일 방식 ─────────────────────────────────────
+    def _lexical(self, query: str, k: int) -> list[DocHit] | None:
+        index = self.lexical.get()
+        if index is None:
+            return None
+        return [DocHit(h.text, h.score, "lexical") for h in index.search(query, k)]
+
+    def _vector(self, query: str, k: int, vector: Sequence[float] | None) -> list[DocHit]:
+        if vector is None:
+            self.embedding_calls += 1
+            vector = vector_store_manager.embeddings.embed_query(query)
+        store = vector_store_manager.get()
+        return [
+            DocHit(doc.page_content, float(score), "vector")
+            for doc, score in store.similarity_search_with_score_by_vector(vector, k=k)
+        ]
+
+    def _hybrid(self, query: str, k: int, vector: Sequence[float] | None) -> list[DocHit]:
+        index = self.lexical.get()
+        if index is None:
+            return self._vector(query, k, vector)
+        lexical = index.search(query, k)
+        confident = bool(lexical) and (
+            lexical[0].score >= settings.DOC_HYBRID_MIN_SCORE
+            and lexical[0].coverage >= settings.DOC_HYBRID_MIN_COVERAGE
+        )
+        if confident and vector is None:
+            self.lexical_only += 1
+            return [DocHit(h.text, h.score, "lexical") for h in lexical]
+        dense = self._vector(query, k, vector)
+        merged = rrf_merge([[h.text for h in lexical], [h.text for h in dense]], k, settings.DOC_HYBRID_RRF_K)
+        return [DocHit(text, score, "hybrid") for text, score in merged]
+
+    # ── 조회 (블로킹 – 이벤트 루프에서는 search) ─────────
+    def search_sync(self, query: str, k: int = 4, vector: Sequence[float] | None = None) -> list[DocHit]:
+        started = time.perf_counter()
+        self.queries += 1
+        if self.mode == "lexical":
+            hits = self._lexical(query, k)
+            if hits is None:  # 인덱스가 아직 없으면 벡터 검색
+                hits = self._vector(query, k, vector)
+        elif self.mode == "vector":
+            hits = self._vector(query, k, vector)
+        else:
+            hits = self._hybrid(query, k, vector)
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        return hits
+
+    async def search(self, query: str, k: int = 4, vector: Sequence[float] | None = None) -> list[DocHit]:
+        """vector : 호출 측이 이미 가진 질의 임베딩 (있으면 임베딩 호출 생략)"""
+        return await asyncio.to_thread(self.search_sync, query, k, vector)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "queries": self.queries,
+            "lexical_only": self.lexical_only,
+            "embedding_calls": self.embedding_calls,
+            "embedding_skip_rate": round(1 - self.embedding_calls / self.queries, 4) if self.queries else 0.0,
+            "lexical_index_loads": self.lexical.loads,
+            "latency": self.latency.snapshot(),
+        }
+
+
+doc_retriever = DocRetriever()
+metrics.register("doc.retrieval", doc_retriever.snapshot)
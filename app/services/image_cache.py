@@ -0,0 +1,283 @@
+"""
+app/services/image_cache.py
+──────────────────────────────
+✔️ /images 결과 캐시 + single-flight 합치기
+
+▸ 동작 요약
+   1. **키** : 합성된 프롬프트 + 이미지 생성 설정(model/size/quality/...) 의 sha256.
+   2. **백엔드** : memory(LRU, 프로세스 내부) / postgres(image_result_cache 테이블) / none.
+   3. **TTL** : IMAGE_CACHE_TTL 초 지난 결과는 사용하지 않음.
+   4. **single-flight** : 같은 키의 생성이 진행 중이면 새로 만들지 않고 그 결과를 함께 기다림.
+   5. **정리** : postgres 백엔드는 IMAGE_CACHE_PURGE_INTERVAL 주기로 만료 행을 삭제 (lifespan 에서 시작/종료).
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Protocol
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config.settings import settings
+from app.db.session import AsyncSessionLocal
+from app.entity.image_result_cache import ImageResultCache
+from app.libs import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def image_cache_key(prompt: str, variant: str = "") -> str:
+    """프롬프트 + 결과에 영향을 주는 이미지 설정(+ 파생 이미지 옵션 variant) → sha256"""
+    material = {
+        "prompt": prompt,
+        "model": settings.OPENAI_IMAGE_MODEL,
+        "n": settings.OPENAI_IMAGE_N,
+        "size": settings.OPENAI_IMAGE_SIZE,
+        "quality": settings.OPENAI_IMAGE_QUALITY,
+        "background": settings.OPENAI_IMAGE_BACKGROUND,
+        "output_format": settings.OPENAI_IMAGE_OUTPUT_FORMAT,
+    }
+    if variant:
+        material["variant"] = variant
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# ────────────────────────────────────────────────────────────────
+# 1) 백엔드
+# ────────────────────────────────────────────────────────────────
+class ResultCacheBackend(Protocol):
+    name: str
+
+    async def get(self, key: str) -> dict | None: ...
+
+    async def set(self, key: str, value: dict) -> None: ...
+
+
+class NullResultCache:
+    name = "none"
+
+    async def get(self, key: str) -> dict | None:
+        return None
+
+    async def set(self, key: str, value: dict) -> None:
+        return None
+
+
+class MemoryResultCache:
+    """프로세스 내부 LRU + TTL"""
+
+    name = "memory"
+
+    def __init__(self, max_items: int, ttl: float) -> None:
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PostgresResultCache:
+    """image_result_cache 테이블 – 워커·레플리카 간 공유"""
+
+    name = "postgres"
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+    async def get(self, key: str) -> dict | None:
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(
+                select(ImageResultCache.result).where(
+                    ImageResultCache.key == key,
+                    ImageResultCache.expires_at > datetime.now(timezone.utc),
+                )
+            )
+
+    async def set(self, key: str, value: dict) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+        stmt = insert(ImageResultCache).values(key=key, result=value, expires_at=expires_at)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ImageResultCache.key],
+            set_={"result": stmt.excluded.result, "expires_at": stmt.excluded.expires_at},
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    async def purge_expired(self) -> int:
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(
+                delete(ImageResultCache).where(ImageResultCache.expires_at <= datetime.now(timezone.utc))
+            )
+            await db.commit()
+            return res.rowcount or 0
+
+
+def _build_backend() -> ResultCacheBackend:
+    backend = settings.IMAGE_CACHE_BACKEND
+    if backend == "memory":
+        return MemoryResultCache(settings.IMAGE_CACHE_MAX_ITEMS, settings.IMAGE_CACHE_TTL)
+    if backend == "postgres":
+        return PostgresResultCache(settings.IMAGE_CACHE_TTL)
+    if backend == "none":
+        return NullResultCache()
+    raise ValueError(f"알 수 없는 IMAGE_CACHE_BACKEND: {backend} (memory | postgres | none)")
+
+
+# ────────────────────────────────────────────────────────────────
+# 2) single-flight : 같은 키의 동시 요청은 한 번만 실행
+#    - 실제 작업은 별도 task 로 실행 → 먼저 온 요청이 끊겨도 나머지 요청은 결과를 받음
+# ────────────────────────────────────────────────────────────────
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task[Any]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+# ────────────────────────────────────────────────────────────────
+# 3) 캐시 + single-flight 조합
+# ────────────────────────────────────────────────────────────────
+class ImageResultCacheService:
+    def __init__(self, backend: ResultCacheBackend, *, purge_interval: float = 0.0) -> None:
+        self.backend = backend
+        self.flight = SingleFlight()
+        self.purge_interval = purge_interval
+        self._purge_task: asyncio.Task[None] | None = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.purged = 0
+
+    # ── 수명 주기 (lifespan) ─────────────────────────
+    async def start(self) -> None:
+        """postgres 백엔드면 만료 행 정리 루프 시작 (만료 행은 조회에서 제외될 뿐 지워지지 않음)"""
+        if self._purge_task is not None or self.purge_interval <= 0:
+            return
+        if isinstance(self.backend, PostgresResultCache):
+            self._purge_task = asyncio.create_task(self._purge_loop(self.backend), name="image-cache-purge")
+
+    async def stop(self) -> None:
+        if self._purge_task is None:
+            return
+        self._purge_task.cancel()
+        await asyncio.gather(self._purge_task, return_exceptions=True)
+        self._purge_task = None
+
+    async def _purge_loop(self, backend: PostgresResultCache) -> None:
+        while True:
+            try:
+                purged = await backend.purge_expired()
+                self.purged += purged
+                if purged:
+                    logger.info("[ImageCache] 만료 항목 %d 건 삭제", purged)
+            except Exception:  # noqa: BLE001  – DB 일시 장애로 루프가 죽지 않도록
+                logger.exception("[ImageCache] 만료 항목 삭제 실패")
+            await asyncio.sleep(self.purge_interval)
+
+    async def get(self, prompt: str, variant: str = "") -> dict | None:
+        """캐시 조회만 (hit/miss 집계). 백엔드 장애는 miss 로 취급"""
+        key = image_cache_key(prompt, variant)
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:  # noqa: BLE001
+            self.errors += 1
+            logger.warning("[ImageCache] 조회 실패 – 생성으로 진행: %s", e)
+            cached = None
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        logger.info("[ImageCache] HIT %s", key[:12])
+        return cached
+
+    async def put(self, prompt: str, result: dict, variant: str = "") -> None:
+        """생성 결과 저장. 실패는 로그만 남김"""
+        try:
+            await self.backend.set(image_cache_key(prompt, variant), result)
+        except Exception as e:  # noqa: BLE001
+            self.errors += 1
+            logger.warning("[ImageCache] 저장 실패 – %s", e)
+
+    async def get_or_generate(
+        self,
+        prompt: str,
+        generate: Callable[[], Awaitable[dict]],
+        use_cache: bool = True,
+        variant: str = "",
+    ) -> dict:
+        """
+        use_cache=False : 캐시 조회·합치기 없이 새로 생성 (결과는 캐시에 덮어씀)
+        variant         : 같은 프롬프트라도 결과가 달라지는 요청 옵션 (파생 이미지 구성 등)
+        캐시 백엔드 장애는 생성 경로로 우회 (요청 실패로 이어지지 않음)
+        """
+
+        async def _generate_and_store() -> dict:
+            result = await generate()
+            await self.put(prompt, result, variant)
+            return result
+
+        if not use_cache:
+            return await _generate_and_store()
+
+        cached = await self.get(prompt, variant)
+        if cached is not None:
+            return cached
+        return await self.flight.do(image_cache_key(prompt, variant), _generate_and_store)
+
+    def snapshot(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        snap: dict[str, Any] = {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "coalesced": self.flight.coalesced,
+            "inflight": len(self.flight),
+            "errors": self.errors,
+        }
+        if isinstance(self.backend, MemoryResultCache):
+            snap["size"] = len(self.backend)
+        if isinstance(self.backend, PostgresResultCache):
+            snap["purged"] = self.purged
+        return snap
+
+
+image_result_cache = ImageResultCacheService(_build_backend(), purge_interval=settings.IMAGE_CACHE_PURGE_INTERVAL)
+metrics.register("image.result_cache", image_result_cache.snapshot)
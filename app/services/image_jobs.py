@@ -0,0 +1,353 @@
+"""
+app/services/image_jobs.py
+──────────────────────────────
+✔️ /images/jobs 비동기 작업 – 요청은 즉시 job id 를 받고, 생성은 워커가 처리
+
+▸ 동작 요약
+   1. **대기열** : asyncio.Queue(IMAGE_JOB_QUEUE_SIZE). 가득 차면 `JobQueueFull` → 라우터에서 429.
+   2. **워커** : IMAGE_JOB_WORKERS 개의 task 가 대기열에서 꺼내 build_image_chain 실행
+                 (요청 세션과 무관하게 작업마다 AsyncSessionLocal 로 세션을 새로 엶).
+   3. **상태 저장소** : memory(테스트·단일 프로세스) / postgres(image_jobs 테이블, 워커·레플리카 공유).
+   4. **상태** : queued → running → succeeded | failed.
+   5. **회수 (postgres)** : 작업마다 owner(프로세스 id) · lease_until 기록. owner 는 IMAGE_JOB_HEARTBEAT 마다
+                            자기 작업의 lease 를 연장하고, lease 가 지난 작업(owner 가 죽었거나 멈춤)만 failed 로 정리
+                            → 워커 · 레플리카가 여럿이어도 기동 · 재시작이 다른 프로세스의 진행 중 작업을 건드리지 않음.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Protocol
+
+from sqlalchemy import select, update
+
+from app.config.settings import settings
+from app.db.session import AsyncSessionLocal, ReadSessionLocal
+from app.entity.image_job import ImageJob
+from app.libs import metrics
+from app.services.image_service import build_image_chain
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+ACTIVE = (QUEUED, RUNNING)
+FINISHED = (SUCCEEDED, FAILED)
+
+# 이 프로세스의 작업 소유자 id (재시작하면 새 id → 이전 프로세스의 작업은 lease 만료 후 회수)
+INSTANCE_ID = f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobQueueFull(Exception):
+    """대기열이 가득 참 – 클라이언트는 잠시 후 재시도"""
+
+
+# ────────────────────────────────────────────────────────────────
+# 1) 상태 저장소
+# ────────────────────────────────────────────────────────────────
+class JobStore(Protocol):
+    name: str
+
+    async def create(self, job_id: str, request: dict) -> None: ...
+
+    async def update(self, job_id: str, status: str, result: dict | None = None, error: str | None = None) -> None: ...
+
+    async def get(self, job_id: str) -> dict | None: ...
+
+    async def heartbeat(self) -> int: ...
+
+    async def recover(self) -> int: ...
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MemoryJobStore:
+    """프로세스 내부 dict – 끝난 작업은 retention 초 뒤 정리"""
+
+    name = "memory"
+
+    def __init__(self, retention: float) -> None:
+        self.retention = retention
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._finished_at: dict[str, float] = {}
+
+    def _purge(self) -> None:
+        cutoff = time.monotonic() - self.retention
+        for job_id in [j for j, t in self._finished_at.items() if t < cutoff]:
+            self._jobs.pop(job_id, None)
+            self._finished_at.pop(job_id, None)
+
+    async def create(self, job_id: str, request: dict) -> None:
+        self._purge()
+        now = _now().isoformat()
+        self._jobs[job_id] = {
+            "jobId": job_id,
+            "status": QUEUED,
+            "request": request,
+            "result": None,
+            "error": None,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+
+    async def update(self, job_id: str, status: str, result: dict | None = None, error: str | None = None) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job.update(status=status, result=result, error=error, updatedAt=_now().isoformat())
+        if status in FINISHED:
+            self._finished_at[job_id] = time.monotonic()
+
+    async def get(self, job_id: str) -> dict | None:
+        return self._jobs.get(job_id)
+
+    async def heartbeat(self) -> int:
+        return 0
+
+    async def recover(self) -> int:
+        return 0  # 프로세스와 함께 사라지므로 복구할 작업 없음
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+
+class PostgresJobStore:
+    """image_jobs 테이블 – 어느 워커/레플리카로 조회가 들어와도 같은 상태를 봄"""
+
+    name = "postgres"
+
+    def __init__(self, owner: str, lease: float) -> None:
+        self.owner = owner
+        self.lease = timedelta(seconds=lease)
+
+    async def create(self, job_id: str, request: dict) -> None:
+        async with AsyncSessionLocal() as db:
+            db.add(ImageJob(
+                id=job_id, status=QUEUED, request=request, owner=self.owner, lease_until=_now() + self.lease,
+            ))
+            await db.commit()
+
+    async def update(self, job_id: str, status: str, result: dict | None = None, error: str | None = None) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ImageJob)
+                .where(ImageJob.id == job_id)
+                .values(status=status, result=result, error=error, updated_at=_now())
+            )
+            await db.commit()
+
+    async def get(self, job_id: str) -> dict | None:
+        async with AsyncSessionLocal() as db:
+            job = await db.scalar(select(ImageJob).where(ImageJob.id == job_id))
+        if job is None:
+            return None
+        return {
+            "jobId": job.id,
+            "status": job.status,
+            "request": job.request,
+            "result": job.result,
+            "error": job.error,
+            "createdAt": job.created_at.isoformat(),
+            "updatedAt": job.updated_at.isoformat(),
+        }
+
+    async def heartbeat(self) -> int:
+        """이 프로세스가 가진 미완료 작업의 lease 연장"""
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(
+                update(ImageJob)
+                .where(ImageJob.owner == self.owner, ImageJob.status.in_(ACTIVE))
+                .values(lease_until=_now() + self.lease)
+            )
+            await db.commit()
+            return res.rowcount or 0
+
+    async def recover(self) -> int:
+        """
+        lease 가 지난 미완료 작업(queued/running)만 failed 로 정리 – owner 가 죽어 다시 실행될 일이 없는 작업
+        살아 있는 다른 프로세스의 작업은 heartbeat 로 lease 가 계속 연장되므로 건드리지 않음
+        """
+        now = _now()
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(
+                update(ImageJob)
+                .where(
+                    ImageJob.status.in_(ACTIVE),
+                    ImageJob.owner != self.owner,
+                    ImageJob.lease_until < now,
+                )
+                .values(status=FAILED, error="작업을 맡은 서버가 응답하지 않아 중단됨", updated_at=now)
+            )
+            await db.commit()
+            return res.rowcount or 0
+
+
+def _build_store() -> JobStore:
+    store = settings.IMAGE_JOB_STORE
+    if store == "memory":
+        return MemoryJobStore(settings.IMAGE_JOB_RETENTION)
+    if store == "postgres":
+        return PostgresJobStore(INSTANCE_ID, settings.IMAGE_JOB_LEASE)
+    raise ValueError(f"알 수 없는 IMAGE_JOB_STORE: {store} (memory | postgres)")
+
+
+# ────────────────────────────────────────────────────────────────
+# 2) 대기열 + 워커 풀
+# ────────────────────────────────────────────────────────────────
+class ImageJobQueue:
+    def __init__(self, store: JobStore, workers: int, max_queue: int, heartbeat: float) -> None:
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.heartbeat_interval = heartbeat
+        self._queue: asyncio.Queue[tuple[str, dict, float]] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._heartbeat_task: asyncio.Task[None] | None = None
+
+        self.running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.recovered = 0
+        self.wait = metrics.TimingStats()
+        self.run_time = metrics.TimingStats()
+
+        metrics.register("image.jobs", self.snapshot)
+
+    # ── 수명 주기 (lifespan) ─────────────────────────
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        await self._recover()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"image-job-worker-{i}") for i in range(self.workers)
+        ]
+        if isinstance(self.store, PostgresJobStore):
+            self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="image-job-heartbeat")
+        logger.info("[ImageJobs] 워커 %d 개 시작 (store=%s, queue=%d)", self.workers, self.store.name, self.max_queue)
+
+    async def stop(self) -> None:
+        tasks = self._tasks + ([self._heartbeat_task] if self._heartbeat_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._heartbeat_task = None
+
+        # 아직 시작하지 못한 작업은 결과를 기다리는 클라이언트가 알 수 있도록 failed 로 기록
+        while self._queue is not None and not self._queue.empty():
+            job_id, _, _ = self._queue.get_nowait()
+            await self._finish(job_id, FAILED, error="서버 종료로 취소됨")
+        self._queue = None
+
+    async def _recover(self) -> None:
+        recovered = await self.store.recover()
+        if recovered:
+            self.recovered += recovered
+            logger.warning("[ImageJobs] lease 가 만료된 미완료 작업 %d 건을 failed 처리", recovered)
+
+    async def _heartbeat(self) -> None:
+        """자기 작업 lease 연장 + 멈춘 프로세스의 작업 회수"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.store.heartbeat()
+                await self._recover()
+            except Exception:  # noqa: BLE001  – DB 일시 장애로 루프가 죽지 않도록
+                logger.exception("[ImageJobs] lease 연장 실패")
+
+    # ── 제출 ─────────────────────────────────────────
+    async def submit(self, request: dict, params: dict) -> str:
+        """
+        request : 상태 조회 시 그대로 돌려줄 요청 본문 (JSON 직렬화 가능)
+        params  : build_image_chain 키워드 인자
+        """
+        if self._queue is None:
+            raise RuntimeError("ImageJobQueue 가 시작되지 않았습니다 (lifespan 확인)")
+        if self._queue.full():
+            self.rejected += 1
+            raise JobQueueFull(f"대기 중인 작업이 {self.max_queue} 건으로 가득 찼습니다")
+
+        job_id = uuid.uuid4().hex
+        await self.store.create(job_id, request)
+        try:
+            self._queue.put_nowait((job_id, params, time.perf_counter()))
+        except asyncio.QueueFull:
+            # 저장소 기록을 await 하는 사이 다른 요청이 남은 자리를 채운 경우
+            self.rejected += 1
+            await self.store.update(job_id, FAILED, error="대기열이 가득 참")
+            raise JobQueueFull(f"대기 중인 작업이 {self.max_queue} 건으로 가득 찼습니다") from None
+        self.submitted += 1
+        return job_id
+
+    async def get(self, job_id: str) -> dict | None:
+        return await self.store.get(job_id)
+
+    # ── 실행 ─────────────────────────────────────────
+    async def _finish(self, job_id: str, status: str, result: dict | None = None, error: str | None = None) -> None:
+        try:
+            await self.store.update(job_id, status, result=result, error=error)
+        except Exception:  # 상태 기록 실패로 워커가 죽으면 안 됨
+            logger.exception("[ImageJobs] 상태 기록 실패 – %s → %s", job_id, status)
+
+    async def _worker(self, index: int) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job_id, params, enqueued = await queue.get()
+            started = time.perf_counter()
+            self.wait.observe((started - enqueued) * 1000)
+            self.running += 1
+            try:
+                await self._finish(job_id, RUNNING)
+                async with ReadSessionLocal() as db:  # 프롬프트 합성(읽기)만 함
+                    result = await build_image_chain(db=db, **params)
+            except asyncio.CancelledError:
+                await self._finish(job_id, FAILED, error="서버 종료로 중단됨")
+                raise
+            except Exception as e:  # noqa: BLE001
+                self.failed += 1
+                logger.exception("[ImageJobs] 작업 실패 – %s", job_id)
+                await self._finish(job_id, FAILED, error=str(e) or type(e).__name__)
+            else:
+                self.succeeded += 1
+                await self._finish(job_id, SUCCEEDED, result=result)
+            finally:
+                self.running -= 1
+                self.run_time.observe((time.perf_counter() - started) * 1000)
+                queue.task_done()
+
+    def snapshot(self) -> dict[str, Any]:
+        snap: dict[str, Any] = {
+            "store": self.store.name,
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "recovered": self.recovered,
+            "wait": self.wait.snapshot(),
+            "run": self.run_time.snapshot(),
+        }
+        if isinstance(self.store, MemoryJobStore):
+            snap["stored"] = len(self.store)
+        return snap
+
+
+image_jobs = ImageJobQueue(
+    _build_store(),
+    workers=settings.IMAGE_JOB_WORKERS,
+    max_queue=settings.IMAGE_JOB_QUEUE_SIZE,
+    heartbeat=settings.IMAGE_JOB_HEARTBEAT,
+)
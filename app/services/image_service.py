@@ -1,65 +1,204 @@
 from app.config.settings import settings
-from langchain_core.runnables import RunnableLambda
-from langchain_core.runnables import RunnableSequence
 
-from app.services.prompt_service import build_prompt
-from app.libs.s3 import upload_image_to_s3
+from app.services.prompt_refiner import prompt_refiner
+from app.services.prompt_service import build_prompt, list_prompt_combinations
+from app.services.image_cache import image_result_cache
+from app.services.renditions import RenditionSpec, decode_rgb, rendition_stage
+from app.libs.s3 import s3_uploader
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.enums import Equilibrium
-from typing import Sequence
-import uuid, base64, httpx
-from app.utils.CLIPScore import calculate_clip_score
-
-
-# 1. 이미지 생성 함수 (LangChain용)
-async def generate_image(prompt: str) -> bytes:
-    payload: dict = {
-                "model":      settings.OPENAI_IMAGE_MODEL,      # gpt-image-1
-                "prompt":     prompt,
-                "n":          settings.OPENAI_IMAGE_N,          # 1
-                "size":       settings.OPENAI_IMAGE_SIZE,       # "1536x1024"
-                "quality":    settings.OPENAI_IMAGE_QUALITY,    # "medium"
-                "background": settings.OPENAI_IMAGE_BACKGROUND, # "auto"
-                # output-format 이 "b64_json" 이면 base64로, "url" 이면 링크로
-            }
-    headers = {"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
-
-    async with httpx.AsyncClient(timeout=httpx.Timeout(120)) as client:
-        res = await client.post(
-            "https://api.openai.com/v1/images/generations",
-            json=payload,
-            headers=headers
-        )
-    res.raise_for_status()
-    b64 = res.json()["data"][0]["b64_json"]
-    return base64.b64decode(b64)
+from typing import Any, AsyncIterator, Sequence
+import asyncio, base64
+from app.utils.clip_batcher import score_clip
+from app.utils.CLIPScore import clip_loader, text_feature_cache, warm_text_cache
+from app.libs.image_payload import decode_b64_json_stream, read_stream
+from app.libs.openai_client import get_download_client, open_event_stream, open_response_stream, post_with_retry
+from app.libs.executors import clip_pool, upload_pool
+from app.db.session import ReadSessionLocal
+import logging
 
+logger = logging.getLogger(__name__)
+
+
+# 1. 이미지 생성 함수
+def _image_payload(prompt: str) -> dict:
+    payload = {
+        "model":      settings.OPENAI_IMAGE_MODEL,      # gpt-image-1
+        "prompt":     prompt,
+        "n":          settings.OPENAI_IMAGE_N,          # 1
+        "size":       settings.OPENAI_IMAGE_SIZE,       # "1536x1024"
+        "quality":    settings.OPENAI_IMAGE_QUALITY,    # "medium"
+        "background": settings.OPENAI_IMAGE_BACKGROUND, # "auto"
+    }
+    # output-format 이 "b64_json" 이면 base64로, "url" 이면 링크로
+    if settings.OPENAI_IMAGE_OUTPUT_FORMAT == "url":
+        payload["response_format"] = "url"
+    return payload
+
+
+def _content_length(res) -> int:
+    try:
+        return int(res.headers.get("content-length", 0))
+    except ValueError:
+        return 0
 
-# 2. 이미지 후처리 및 업로드
-def process_and_upload(png_bytes: bytes, prompt: str) -> dict:
-    uid = uuid.uuid4()
-    filename = f"generated/{uid}.png"
-    content_type = "image/png"
 
-    s3_url = upload_image_to_s3(png_bytes, content_type)
-    clip_score = calculate_clip_score(png_bytes, prompt)
+async def generate_image(prompt: str) -> memoryview:
+    """
+    생성 이미지를 버퍼 하나에 받아 memoryview 로 반환 (업로드·채점이 같은 버퍼를 공유)
+    - b64_json : 응답 JSON 을 스트리밍하며 b64_json 값만 조각 단위로 디코딩
+    - url      : 응답의 이미지 URL 을 스트리밍 다운로드
+    공유 클라이언트(lifespan 관리) 사용 – 429/5xx 는 내부에서 재시도
+    """
+    payload = _image_payload(prompt)
 
-    return {
-        "filename": filename,
-        "originalFilename": f"{uid}.png",
+    if settings.OPENAI_IMAGE_OUTPUT_FORMAT == "url":
+        res = await post_with_retry("/images/generations", json=payload)
+        res.raise_for_status()
+        url = res.json()["data"][0]["url"]
+        async with get_download_client().stream("GET", url) as img:
+            img.raise_for_status()
+            return await read_stream(img.aiter_bytes(), _content_length(img))
+
+    async with open_response_stream("/images/generations", json=payload) as res:
+        return await decode_b64_json_stream(res.aiter_bytes(), _content_length(res))
+
+
+# 1-1. 스트리밍 생성 (stream=true) – 중간 이미지를 받는 대로 넘기고, 마지막에 완성본 bytes
+#      이벤트 : ("partial_image", {"index", "b64_json"}) … → ("completed", png_bytes)
+async def stream_image_generation(prompt: str) -> AsyncIterator[tuple[str, Any]]:
+    payload = {
+        **_image_payload(prompt),
+        "stream": True,
+        "partial_images": settings.OPENAI_IMAGE_PARTIAL_IMAGES,
+    }
+    async with open_event_stream("/images/generations", json=payload) as events:
+        async for sse in events.aiter_sse():
+            if not sse.data or sse.data == "[DONE]":
+                continue
+            data = sse.json()
+            kind = data.get("type") or sse.event
+            if kind == "image_generation.partial_image":
+                yield "partial_image", {"index": data.get("partial_image_index"), "b64_json": data["b64_json"]}
+            elif kind == "image_generation.completed":
+                yield "completed", base64.b64decode(data["b64_json"])
+                return
+            elif kind == "error" or "error" in data:
+                raise RuntimeError(f"이미지 스트림 오류: {data.get('error', data)}")
+    raise RuntimeError("이미지 스트림이 완료 이벤트 없이 종료되었습니다")
+
+
+# 2. 이미지 후처리 및 업로드
+#    - boto3 업로드(s3_uploader) / torch forward 는 블로킹 → 각자의 bounded 풀에서 실행
+#    - CLIP 채점은 동시 요청끼리 마이크로 배칭 (CLIP_BATCH_*)
+#    - 두 작업은 서로 독립이므로 동시에 돌리고 둘 다 끝날 때까지 대기
+#    - png 는 generate_image 의 memoryview 그대로 (두 작업 모두 복사 없이 같은 버퍼를 읽음)
+#    - S3 키는 이미지 내용 해시 → filename 은 실제 저장된 키, 같은 이미지는 다시 올리지 않음
+#    - renditions 가 있으면 PNG 를 한 번만 디코딩해 CLIP 전처리와 파생 이미지 인코딩이 공유
+def _image_result(key: str, s3_url: str, clip_score: float, prompt: str, renditions: dict | None = None) -> dict:
+    result = {
+        "filename": key,
+        "originalFilename": key.rsplit("/", 1)[-1],
         "imageLink": s3_url,
-        "contentType": content_type,
+        "contentType": "image/png",
         "clipScore": clip_score,
         "pullPrompt": prompt
     }
+    if renditions is not None:
+        result.update(renditions)  # renditions + renditionStats
+    return result
+
+
+def _post_process_tasks(
+    png_bytes: bytes | memoryview,
+    prompt: str,
+    renditions: RenditionSpec | None,
+) -> dict[str, asyncio.Future]:
+    """후처리 단계별 task – uploaded / scored (/ renditions, decoded)"""
+    tasks: dict[str, asyncio.Future] = {
+        "uploaded": asyncio.ensure_future(s3_uploader.upload_image(png_bytes, "image/png")),
+    }
+    if renditions is None:
+        tasks["scored"] = asyncio.ensure_future(score_clip(png_bytes, prompt))
+        return tasks
+
+    decoded = asyncio.ensure_future(upload_pool.run(decode_rgb, png_bytes))
+
+    async def _score() -> float:
+        if settings.CLIP_SCORER == "sidecar":  # 사이드카는 PNG 를 받아 자체 디코딩
+            return await score_clip(png_bytes, prompt)
+        return await score_clip(await decoded, prompt)
+
+    async def _renditions() -> dict:
+        return await rendition_stage.run(await decoded, len(png_bytes), renditions)
+
+    tasks["decoded"] = decoded
+    tasks["scored"] = asyncio.ensure_future(_score())
+    tasks["renditions"] = asyncio.ensure_future(_renditions())
+    return tasks
+
+
+def _cancel_pending(tasks: dict[str, asyncio.Future]) -> None:
+    for task in tasks.values():  # 한쪽이 실패했거나 호출 측이 취소된 경우
+        task.cancel()
+
+
+async def process_and_upload(
+    png_bytes: bytes | memoryview,
+    prompt: str,
+    renditions: RenditionSpec | None = None,
+) -> dict:
+    tasks = _post_process_tasks(png_bytes, prompt, renditions)
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        _cancel_pending(tasks)
+    key, s3_url = tasks["uploaded"].result()
+    return _image_result(
+        key, s3_url, tasks["scored"].result(), prompt,
+        tasks["renditions"].result() if "renditions" in tasks else None,
+    )
 
 # 3. 체인 정의
+#    - 기본 : 단계별로 그대로 await (요청마다 Runnable 객체를 만들지 않음)
+#    - IMAGE_CHAIN_TRACING=True : LangSmith 추적용 LangChain RunnableSequence 로 실행 (프로세스당 1 회 구성)
+_traced_chain = None
+
+
+def _get_traced_chain():
+    global _traced_chain
+    if _traced_chain is None:
+        from langchain_core.runnables import RunnableLambda
+
+        async def _generate(inputs: dict) -> dict:
+            return {**inputs, "image": await generate_image(inputs["prompt"])}
+
+        async def _post_process(inputs: dict) -> dict:
+            return await process_and_upload(inputs["image"], inputs["prompt"], inputs.get("renditions"))
+
+        _traced_chain = (
+                RunnableLambda(_generate, name="generate_image")
+                | RunnableLambda(_post_process, name="process_and_upload")  # 업로드·스코어링을 풀에서 병렬 실행
+        )
+    return _traced_chain
+
+
+async def run_image_pipeline(prompt: str, renditions: RenditionSpec | None = None) -> dict:
+    if settings.IMAGE_CHAIN_TRACING:
+        return await _get_traced_chain().ainvoke({"prompt": prompt, "renditions": renditions})
+
+    png_bytes = await generate_image(prompt)
+    return await process_and_upload(png_bytes, prompt, renditions)
+
+
 async def build_image_chain(
     db: AsyncSession,
     floor_plan_id: int,
     equilibrium: Equilibrium,
     tag_id: int,
     furniture_tag_ids: Sequence[int],
+    use_cache: bool = True,
+    renditions: RenditionSpec | None = None,
 ) -> dict:
     # Step 1: DB 기반 프롬프트 생성
     prompt = await build_prompt(
@@ -69,12 +208,123 @@ async def build_image_chain(
         tag_id=tag_id,
         furniture_tag_ids=furniture_tag_ids,
     )
+    # 이후 단계는 DB 를 쓰지 않음 → 이미지 생성 동안 커넥션을 잡고 있지 않도록 바로 풀에 반환
+    #   (닫힌 세션도 다시 쓰면 새 커넥션을 받으므로 호출 측에는 영향 없음)
+    await db.close()
+    # Step 1-1: 참고 문서 기반 정교화 (PROMPT_REFINE_ENABLED, 정확 일치 캐시)
+    prompt = await prompt_refiner.refine(prompt)
+
+    # Step 2: 이미지 생성 → 업로드·채점(· 파생 이미지)
+    #   같은 프롬프트·설정의 결과가 캐시에 있으면 재사용, 진행 중이면 그 결과를 함께 기다림
+    return await image_result_cache.get_or_generate(
+        prompt,
+        lambda: run_image_pipeline(prompt, renditions),
+        use_cache=use_cache,
+        variant=renditions.cache_variant() if renditions else "",
+    )
 
-    # Step 2: LangChain-style chain 구성
-    chain: RunnableSequence = (
-            RunnableLambda(generate_image)  # async function
-            | RunnableLambda(lambda img: process_and_upload(img, prompt))  # 동기 함수로 처리
+
+# 3-1. 스트리밍 체인 (POST /images/stream)
+#      단계마다 (event, data) 를 내보냄 : prompt → generation_started → partial_image* → uploaded/scored(/renditions) → done
+#      - 요청 세션은 응답 본문 전송 전에 닫히므로 자체 세션 사용
+#      - 캐시 hit 이면 prompt → done 으로 바로 끝남. 중간 이미지를 받아야 하므로 single-flight 는 적용하지 않음
+async def stream_image_chain(
+    floor_plan_id: int,
+    equilibrium: Equilibrium,
+    tag_id: int,
+    furniture_tag_ids: Sequence[int],
+    use_cache: bool = True,
+    renditions: RenditionSpec | None = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    async with ReadSessionLocal() as db:
+        prompt = await build_prompt(
+            db=db,
+            floor_plan_id=floor_plan_id,
+            equilibrium=equilibrium,
+            tag_id=tag_id,
+            furniture_tag_ids=furniture_tag_ids,
+        )
+    prompt = await prompt_refiner.refine(prompt)
+    yield "prompt", {"prompt": prompt}
+
+    variant = renditions.cache_variant() if renditions else ""
+    if use_cache:
+        cached = await image_result_cache.get(prompt, variant)
+        if cached is not None:
+            yield "done", cached
+            return
+
+    yield "generation_started", {
+        "model": settings.OPENAI_IMAGE_MODEL,
+        "partialImages": settings.OPENAI_IMAGE_PARTIAL_IMAGES,
+    }
+    png_bytes = b""
+    async for kind, data in stream_image_generation(prompt):
+        if kind == "partial_image":
+            yield "partial_image", data
+        else:
+            png_bytes = data
+
+    # 업로드·채점(·파생 이미지)은 동시에 시작하고 끝나는 순서대로 알림
+    tasks = _post_process_tasks(png_bytes, prompt, renditions)
+    names = {task: name for name, task in tasks.items()}
+    pending = set(tasks.values())
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                name = names[fut]
+                if name == "uploaded":
+                    key, s3_url = fut.result()
+                    yield "uploaded", {"filename": key, "imageLink": s3_url}
+                elif name == "scored":
+                    yield "scored", {"clipScore": fut.result()}
+                elif name == "renditions":
+                    yield "renditions", fut.result()
+                else:
+                    fut.result()  # decoded – 실패 시 여기서 전파
+    finally:
+        _cancel_pending(tasks)  # 클라이언트가 끊었거나 한쪽이 실패한 경우
+
+    result = _image_result(
+        *tasks["uploaded"].result(), tasks["scored"].result(), prompt,
+        tasks["renditions"].result() if "renditions" in tasks else None,
     )
+    await image_result_cache.put(prompt, result, variant)
+    yield "done", result
+
+
+# 4. CLIP 텍스트 feature 캐시 워밍업 (lifespan 에서 백그라운드 실행)
+#    정교화(PROMPT_REFINE_ENABLED)를 켜면 채점 프롬프트는 정교화 결과라 합성 프롬프트로 채운 항목은 hit 하지 않음
+#    → 조합마다 LLM 을 부르지 않도록 워밍업을 건너뜀 (첫 요청 때 인코딩)
+async def warm_clip_text_cache() -> int:
+    if settings.PROMPT_REFINE_ENABLED:
+        logger.info("CLIP 텍스트 캐시 워밍업 생략 – 프롬프트 정교화 사용 중 (채점 프롬프트가 합성 프롬프트와 다름)")
+        return 0
+    try:
+        async with ReadSessionLocal() as db:
+            prompts = await list_prompt_combinations(
+                db,
+                max_furniture=settings.CLIP_TEXT_CACHE_WARMUP_MAX_FURNITURE,
+                limit=text_feature_cache.max_size,
+            )
+        encoded = await clip_pool.run(warm_text_cache, prompts)
+    except Exception:  # 워밍업 실패는 서비스에 영향 없음 – 첫 요청 때 인코딩됨
+        logger.exception("CLIP 텍스트 캐시 워밍업 실패")
+        return 0
+    logger.info("CLIP 텍스트 캐시 워밍업 완료 – 조합 %d 개 / 신규 인코딩 %d 개", len(prompts), encoded)
+    return encoded
 
-    return await chain.ainvoke(prompt)
 
+# 5. CLIP 기동 워밍업 : 모델 로딩(+더미 forward) → 텍스트 캐시 순서로 진행
+async def warm_up_clip() -> None:
+    if settings.CLIP_SCORER == "sidecar":  # 모델은 사이드카 프로세스가 워밍업
+        return
+    if settings.CLIP_WARMUP_ON_STARTUP:
+        try:
+            await clip_pool.run(clip_loader.warmup)
+        except Exception:  # 실패해도 첫 요청 때 다시 로딩 시도
+            logger.exception("CLIP 모델 워밍업 실패")
+            return
+    if settings.CLIP_TEXT_CACHE_WARMUP:
+        await warm_clip_text_cache()
@@ -0,0 +1,258 @@
+"""
+app/services/prompt_catalog.py
+──────────────────────────────
+✔️ 프롬프트 카탈로그(도면 · 태그 · 가구태그) 프로세스 캐시
+
+▸ 동작 요약
+   1. **기동 시 적재** : init_automap 이후 세 테이블의 (id, prompt) 를 한 번에 읽어 dict 로 보관.
+   2. **TTL** : PROMPT_CATALOG_TTL 초가 지나면 다음 조회 때 다시 적재 (동시 요청은 한 번만 적재).
+   3. **무효화** : `invalidate()` 또는 Postgres `NOTIFY <PROMPT_CATALOG_CHANNEL>` 수신 시 즉시 재적재.
+   4. **지표** : hit/miss, 적재 횟수, 마지막 적재 후 경과 시간(staleness) 을 /metrics 로 노출.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.db.automap import AutomapBase
+from app.db.session import AsyncSessionLocal
+from app.libs import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCatalog:
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.floor_plans: dict[int, str | None] = {}
+        self.tags: dict[int, str | None] = {}
+        self.furniture_tags: dict[int, str | None] = {}
+        # (floor_plan_id, Equilibrium) → 평형 대입이 끝난 도면 프롬프트 (재적재 시 초기화)
+        self._rendered: dict[tuple[int, Any], str] = {}
+
+        self.loaded_at: float | None = None     # time.monotonic() 기준
+        self.version = 0
+        self._stale = True
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.invalidations = 0
+        self.last_error: str | None = None
+
+        metrics.register("prompt.catalog", self.snapshot)
+
+    # ── 적재 ─────────────────────────────────────────
+    def _reload_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def load(self, db: AsyncSession) -> None:
+        """세 테이블 전체를 읽어 dict 교체 (교체는 한 번에 → 조회 측은 항상 일관된 스냅샷)"""
+        FloorPlan = AutomapBase.classes.FloorPlan
+        Tag = AutomapBase.classes.Tag
+        FurnitureTag = AutomapBase.classes.FurnitureTag
+
+        # 읽는 도중 들어온 무효화(NOTIFY)는 이번 결과에 반영됐다고 볼 수 없음 → 적재 후에도 stale 유지
+        invalidations = self.invalidations
+        floor_plans = dict((await db.execute(select(FloorPlan.id, FloorPlan.floor_plan_prompt))).all())
+        tags = dict((await db.execute(select(Tag.id, Tag.tag_prompt))).all())
+        furniture_tags = dict(
+            (await db.execute(select(FurnitureTag.id, FurnitureTag.furniture_prompt))).all()
+        )
+
+        self.floor_plans, self.tags, self.furniture_tags = floor_plans, tags, furniture_tags
+        self._rendered = {}
+        self.loaded_at = time.monotonic()
+        self.version += 1
+        self.reloads += 1
+        self._stale = self.invalidations != invalidations
+        self.last_error = None
+        logger.info(
+            "[PromptCatalog] 적재 v%d – floor_plans=%d tags=%d furniture_tags=%d",
+            self.version, len(floor_plans), len(tags), len(furniture_tags),
+        )
+
+    async def refresh(self) -> None:
+        """자체 세션으로 재적재 (동시 호출은 한 번만 실행)"""
+        version = self.version
+        async with self._reload_lock():
+            if self.version != version and not self._stale:
+                return  # 대기하는 동안 다른 코루틴이 이미 적재함
+            async with AsyncSessionLocal() as db:
+                await self.load(db)
+
+    @property
+    def fresh(self) -> bool:
+        if self._stale or self.loaded_at is None:
+            return False
+        return self.ttl <= 0 or time.monotonic() - self.loaded_at < self.ttl
+
+    async def ensure_fresh(self) -> bool:
+        """
+        TTL 만료 / 무효화 상태면 재적재 후 True.
+        적재 실패 시 False → 호출 측은 DB 직접 조회로 대체
+        """
+        if self.fresh:
+            return True
+        try:
+            await self.refresh()
+        except Exception as e:  # noqa: BLE001
+            self.last_error = str(e)
+            logger.warning("[PromptCatalog] 재적재 실패 – DB 직접 조회로 대체: %s", e)
+            return False
+        return True
+
+    def invalidate(self, reason: str = "manual") -> None:
+        """다음 조회 때 재적재하도록 표시 (데이터는 재적재 전까지 유지)"""
+        self._stale = True
+        self.invalidations += 1
+        logger.info("[PromptCatalog] 무효화 – %s", reason)
+
+    # ── 조회 (모두 캐시 hit 일 때만 사용, 하나라도 없으면 miss) ──
+    def lookup(
+        self,
+        floor_plan_id: int,
+        tag_id: int,
+        furniture_tag_ids: Sequence[int],
+    ) -> tuple[str | None, str | None, list[str]] | None:
+        if (
+            floor_plan_id not in self.floor_plans
+            or tag_id not in self.tags
+            or any(fid not in self.furniture_tags for fid in furniture_tag_ids)
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        furniture = [
+            self.furniture_tags[fid]
+            for fid in sorted(set(furniture_tag_ids))  # build_prompt 의 ORDER BY id ASC 와 동일
+            if self.furniture_tags[fid] is not None
+        ]
+        return self.floor_plans[floor_plan_id], self.tags[tag_id], furniture
+
+    def rendered_floor_plan(self, floor_plan_id: int, equilibrium: Any, render: Callable[[], str]) -> str:
+        """(floor_plan_id, 평형) 단위로 도면 프롬프트 대입 결과를 메모이즈"""
+        key = (floor_plan_id, equilibrium)
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            rendered = self._rendered[key] = render()
+        return rendered
+
+    def lookup_tables(
+        self,
+        floor_plan_ids: set[int],
+        tag_ids: set[int],
+        furniture_tag_ids: set[int],
+        items: int = 1,
+    ) -> tuple[dict[int, str | None], dict[int, str | None], dict[int, str | None]] | None:
+        """배치 합성용 – 필요한 id 가 전부 있으면 세 dict 를 그대로 반환 (items 만큼 hit/miss 집계)"""
+        if (
+            floor_plan_ids <= self.floor_plans.keys()
+            and tag_ids <= self.tags.keys()
+            and furniture_tag_ids <= self.furniture_tags.keys()
+        ):
+            self.hits += items
+            return self.floor_plans, self.tags, self.furniture_tags
+        self.misses += items
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "version": self.version,
+            "fresh": self.fresh,
+            "staleness_s": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at else None,
+            "ttl_s": self.ttl,
+            "sizes": {
+                "rendered_floor_plans": len(self._rendered),
+                "floor_plans": len(self.floor_plans),
+                "tags": len(self.tags),
+                "furniture_tags": len(self.furniture_tags),
+            },
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "reloads": self.reloads,
+            "invalidations": self.invalidations,
+            "last_error": self.last_error,
+        }
+
+
+prompt_catalog = PromptCatalog(ttl=settings.PROMPT_CATALOG_TTL)
+
+
+# ────────────────────────────────────────────────────────────────
+# Postgres LISTEN/NOTIFY → 카탈로그 무효화
+#   - SQLAlchemy 풀과 별개인 asyncpg 전용 연결 1 개를 유지
+#   - 연결이 끊기면 재접속하고, 그 사이 놓친 알림이 있을 수 있으므로 무효화
+#   - 트리거 설치는 app/db/create_tables.py 참고
+# ────────────────────────────────────────────────────────────────
+class CatalogListener:
+    def __init__(self, catalog: PromptCatalog, channel: str, retry_delay: float = 5.0) -> None:
+        self.catalog = catalog
+        self.channel = channel
+        self.retry_delay = retry_delay
+        self._task: asyncio.Task[None] | None = None
+        self._reload_tasks: set[asyncio.Task[None]] = set()
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        self.catalog.invalidate(f"NOTIFY {channel} {payload}".strip())
+        # 다음 요청이 기다리지 않도록 바로 백그라운드 재적재
+        task = asyncio.get_running_loop().create_task(self.catalog.ensure_fresh())
+        self._reload_tasks.add(task)
+        task.add_done_callback(self._reload_tasks.discard)
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        dsn = settings.database_url_async.replace("postgresql+asyncpg://", "postgresql://", 1)
+        first = True
+        while True:
+            try:
+                conn = await asyncpg.connect(dsn)
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("[PromptCatalog] LISTEN 연결 실패 – %.0fs 후 재시도: %s", self.retry_delay, e)
+                await asyncio.sleep(self.retry_delay)
+                continue
+            try:
+                await conn.add_listener(self.channel, self._on_notify)
+                if not first:
+                    self.catalog.invalidate("LISTEN 재접속")
+                first = False
+                logger.info("[PromptCatalog] LISTEN %s", self.channel)
+                while True:  # heartbeat – 조용히 끊긴 연결도 감지
+                    await asyncio.sleep(self.retry_delay)
+                    await conn.execute("SELECT 1")
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("[PromptCatalog] LISTEN 연결 끊김: %s", e)
+            finally:
+                if not conn.is_closed():
+                    await conn.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+catalog_listener = CatalogListener(prompt_catalog, settings.PROMPT_CATALOG_CHANNEL)
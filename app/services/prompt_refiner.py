@@ -0,0 +1,184 @@
+"""
+app/services/prompt_refiner.py
+──────────────────────────────
+✔️ 프롬프트 정교화 단계 (build_prompt 다음) – 참고 문서 검색 + LLM 으로 이미지 프롬프트 보강, 정확 일치 캐시
+
+▸ 동작 요약
+   1. **캐시** : 합성 프롬프트(+ 모델 · 설정) sha256 → 정교화 결과. hit 이면 검색 · LLM 모두 생략.
+                 build_prompt 는 (도면 · 평형 · 태그 · 가구) 를 그대로 문장으로 만들기 때문에 같은 요청이면 키도 같음.
+                 카탈로그 문구가 바뀌면 키도 바뀌어 옛 문구의 정교화 결과는 쓰지 않음.
+   2. **miss** : doc_retriever(BM25 · FAISS)로 top-k 청크 검색 → chat/completions (공유 httpx 풀 · 재시도) → 캐시에 저장.
+                 임베딩은 검색 방식(DOC_RETRIEVAL_MODE)이 필요할 때만 – hybrid 는 BM25 신뢰도가 낮을 때만 임베딩.
+   3. TTL + LRU. 같은 프롬프트 동시 요청은 single-flight 로 한 번만 실행.
+   4. 정교화 실패 시 원래 프롬프트로 계속 진행 (이미지 생성은 막지 않음).
+   5. **지표** : hit 률, 아낀 검색 · LLM 호출 수, 단계 지연을 /metrics 로 노출.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.config.settings import settings
+from app.libs import metrics
+from app.libs.openai_client import post_with_retry
+from app.services.doc_retrieval import doc_retriever
+from app.services.image_cache import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+REFINE_SYSTEM_PROMPT = (
+    "You refine prompts for an interior-design image generator. "
+    "Use the reference notes only where they are relevant. Keep every constraint from the original prompt "
+    "(layout, area, style, furniture) and do not invent rooms or furniture. "
+    "Reply with the refined prompt only."
+)
+
+
+def refine_cache_key(prompt: str) -> str:
+    """프롬프트 + 정교화 결과에 영향을 주는 설정 → sha256"""
+    material = {
+        "prompt": prompt,
+        "model": settings.PROMPT_REFINE_MODEL,
+        "temperature": settings.PROMPT_REFINE_TEMPERATURE,
+        "top_k": settings.PROMPT_REFINE_TOP_K,
+        "system": REFINE_SYSTEM_PROMPT,
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# ────────────────────────────────────────────────────────────────
+# 1) 캐시 (이벤트 루프 한 스레드에서만 사용 → 락 없음)
+# ────────────────────────────────────────────────────────────────
+class ExactPromptCache:
+    """키 → 정교화 결과, LRU + TTL"""
+
+    def __init__(self, max_items: int, ttl: float) -> None:
+        self.max_items = max_items
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, refined = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return refined
+
+    def put(self, key: str, refined: str) -> None:
+        self._data[key] = (time.monotonic() + self.ttl, refined)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ────────────────────────────────────────────────────────────────
+# 2) 정교화 단계
+# ────────────────────────────────────────────────────────────────
+class PromptRefiner:
+    def __init__(self) -> None:
+        self.exact = ExactPromptCache(settings.PROMPT_REFINE_CACHE_MAX_ITEMS, settings.PROMPT_REFINE_CACHE_TTL)
+        self.flight = SingleFlight()
+
+        self.requests = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.retrieval_calls = 0
+        self.llm_calls = 0
+        self.latency = metrics.TimingStats()
+        self.llm_latency = metrics.TimingStats()
+
+        metrics.register("prompt.refiner", self.snapshot)
+
+    async def _retrieve(self, prompt: str) -> list[str]:
+        self.retrieval_calls += 1
+        hits = await doc_retriever.search(prompt, settings.PROMPT_REFINE_TOP_K)
+        return [hit.text for hit in hits]
+
+    async def _complete(self, prompt: str, notes: list[str]) -> str:
+        self.llm_calls += 1
+        started = time.perf_counter()
+        reference = "\n\n".join(f"- {note}" for note in notes) or "(none)"
+        res = await post_with_retry(
+            "/chat/completions",
+            json={
+                "model": settings.PROMPT_REFINE_MODEL,
+                "temperature": settings.PROMPT_REFINE_TEMPERATURE,
+                "messages": [
+                    {"role": "system", "content": REFINE_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Reference notes:\n{reference}\n\nPrompt:\n{prompt}"},
+                ],
+            },
+        )
+        res.raise_for_status()
+        refined = res.json()["choices"][0]["message"]["content"].strip()
+        self.llm_latency.observe((time.perf_counter() - started) * 1000)
+        return refined or prompt
+
+    async def _refine_uncached(self, key: str, prompt: str) -> str:
+        self.misses += 1
+        refined = await self._complete(prompt, await self._retrieve(prompt))
+        self.exact.put(key, refined)
+        return refined
+
+    async def refine(self, prompt: str) -> str:
+        """정교화된 프롬프트 반환. 꺼져 있거나 실패하면 원래 프롬프트"""
+        if not settings.PROMPT_REFINE_ENABLED:
+            return prompt
+
+        started = time.perf_counter()
+        self.requests += 1
+        key = refine_cache_key(prompt)
+        refined = self.exact.get(key)
+        if refined is not None:
+            self.exact_hits += 1
+        else:
+            try:
+                refined = await self.flight.do(key, lambda: self._refine_uncached(key, prompt))
+            except Exception as e:  # noqa: BLE001  – 정교화는 부가 단계 → 원래 프롬프트로 진행
+                self.errors += 1
+                logger.warning("[PromptRefiner] 정교화 실패 – 원래 프롬프트 사용: %s", e)
+                refined = prompt
+
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        logger.info("🟢 [Prompt] REFINED\n%s", refined)
+        return refined
+
+    def snapshot(self) -> dict[str, Any]:
+        lookups = self.exact_hits + self.misses
+        return {
+            "enabled": settings.PROMPT_REFINE_ENABLED,
+            "requests": self.requests,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "exact_hit_rate": round(self.exact_hits / lookups, 4) if lookups else 0.0,
+            "coalesced": self.flight.coalesced,
+            "errors": self.errors,
+            "calls": {
+                "retrieval": self.retrieval_calls,
+                "llm": self.llm_calls,
+            },
+            # 캐시가 없었다면 요청마다 검색 · LLM 을 1 회씩 호출 (single-flight 로 합쳐진 요청도 호출하지 않음)
+            #   검색 중 임베딩 호출 · 생략 수는 /metrics 의 doc.retrieval 참고
+            "saved_calls": {
+                "retrieval": self.exact_hits + self.flight.coalesced,
+                "llm": self.exact_hits + self.flight.coalesced,
+            },
+            "exact_size": len(self.exact),
+            "latency": self.latency.snapshot(),
+            "llm_latency": self.llm_latency.snapshot(),
+        }
+
+
+prompt_refiner = PromptRefiner()
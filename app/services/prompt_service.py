@@ -1,45 +1,65 @@
 """
 app/services/prompt_service.py
 ──────────────────────────────
-✔️ FastAPI + SQLAlchemy(Async) + LangChain  기반 “프롬프트 합성” 서비스
+✔️ FastAPI + SQLAlchemy(Async) 기반 “프롬프트 합성” 서비스
 
 ▸ 흐름 요약
    1. **DB 조회** : 도면·취향·가구 프롬프트를 *비동기* 로 읽어 온다.
    2. **Enum 설명** : `Equilibrium`(면적 구간) Enum 의 `value`(or description) 를 사용.
-   3. **LangChain PromptTemplate** 로 네 가지 텍스트를 줄바꿈(\n) 방식으로 결합.
+   3. **템플릿 합성** : 도면 템플릿은 행(문자열)마다 한 번만 컴파일, 평형 대입 결과는 메모이즈.
+      세 텍스트는 줄바꿈(\n) 으로 결합 (LangChain PromptTemplate 와 같은 f-string 규칙, 요청마다 재파싱 X).
    4. **DEBUG 로그** 로 각 단계·최종 결과를 확인할 수 있다.
 """
 from __future__ import annotations
 
 import logging
-from typing import Sequence
+from functools import lru_cache
+from itertools import combinations
+from string import Formatter
+from typing import Callable, NamedTuple, Sequence
 
-from langchain.prompts import PromptTemplate
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config.settings import settings
 from app.db.automap import AutomapBase          # Reflection 된 ORM 컨테이너
 from app.models.enums import Equilibrium        # 면적 구간 Enum
+from app.services.prompt_catalog import prompt_catalog  # 도면·태그·가구 프롬프트 캐시
 
 logger = logging.getLogger(__name__)
 
 # ────────────────────────────────────────────────────────────────
-# 1) PromptTemplate 정의
-#    - input_variables: 템플릿에서 {name} 으로 참조할 변수들
-#    - template: 입력된 프롬프트를 줄바꿈으로 이어 붙임
+# 1) 템플릿 정의
+#    - 최종 프롬프트 = 도면 / 태그 / 가구 프롬프트를 줄바꿈으로 이어 붙임
+#    - 도면 프롬프트는 f-string 템플릿 ({input} 자리에 평형 설명 대입)
 # ────────────────────────────────────────────────────────────────
-PROMPT_TMPL = PromptTemplate(
-    input_variables=[
-        "floor_plan_prompt",
-        "tag_prompt",
-        "furniture_prompt"
-    ],
-    template=(
-        "{floor_plan_prompt}\n"
-        "{tag_prompt}\n"
-        "{furniture_prompt}"
-    ),
-)
+PROMPT_SEPARATOR = "\n"
+
+
+@lru_cache(maxsize=1024)
+def compile_floor_plan_template(fp_prompt: str) -> Callable[..., str]:
+    """
+    도면 템플릿 문자열 → format 함수 (문자열당 1 회만 파싱)
+    LangChain PromptTemplate.from_template 과 같은 규칙: 위치 인자 `{}` 불가, 이스케이프는 `{{ }}`
+    """
+    for _, field, _, _ in Formatter().parse(fp_prompt):
+        if field is not None and (field == "" or field.isdigit()):
+            raise ValueError(f"도면 템플릿에 위치 인자 {{{field}}} 는 사용할 수 없습니다")
+    return fp_prompt.format
+
+
+@lru_cache(maxsize=4096)
+def render_floor_plan(fp_prompt: str, equilibrium: Equilibrium) -> str:
+    """도면 템플릿에 평형 설명 대입 (같은 템플릿·평형이면 메모이즈된 결과 반환)"""
+    return compile_floor_plan_template(fp_prompt)(input=equilibrium.description)
+
+
+def join_prompt(floor_plan_prompt: str, tag_prompt: str, furniture_prompts: Sequence[str]) -> str:
+    return PROMPT_SEPARATOR.join((floor_plan_prompt, tag_prompt, PROMPT_SEPARATOR.join(furniture_prompts)))
+
+# DB 에 행이 없을 때 대신 들어가는 문구
+FP_PROMPT_MISSING = "도면 프롬프트가 존재하지 않습니다"
+TAG_PROMPT_MISSING = "태그 프롬프트가 존재하지 않습니다"
 
 # ────────────────────────────────────────────────────────────────
 # 2) 핵심 비동기 함수 : build_prompt
@@ -71,9 +91,26 @@ async def build_prompt(
     Returns
     -------
     str
-        네 가지 프롬프트를 LangChain 템플릿으로 합성한 최종 문자열
+        네 가지 프롬프트를 템플릿으로 합성한 최종 문자열
     """
 
+    # ── (0) 카탈로그 캐시 – 정상 상태에서는 DB 왕복 0 회
+    if settings.PROMPT_CATALOG_ENABLED and await prompt_catalog.ensure_fresh():
+        cached = prompt_catalog.lookup(floor_plan_id, tag_id, furniture_tag_ids)
+        if cached is not None:
+            fp_prompt, tag_prompt, furniture_tag_rows = cached
+            final_prompt = join_prompt(
+                prompt_catalog.rendered_floor_plan(
+                    floor_plan_id,
+                    equilibrium,
+                    lambda: render_floor_plan(fp_prompt or FP_PROMPT_MISSING, equilibrium),
+                ),
+                tag_prompt or TAG_PROMPT_MISSING,
+                furniture_tag_rows,
+            )
+            logger.info("🟢 [Prompt] FINAL (catalog v%d)\n%s", prompt_catalog.version, final_prompt)
+            return final_prompt
+
     # ── (1) Automap 클래스 – 테이블명 → CamelCase 로 변환된 이름
     FloorPlan = AutomapBase.classes.FloorPlan
     Tag = AutomapBase.classes.Tag
@@ -84,22 +121,15 @@ async def build_prompt(
             await db.scalar(
                 select(FloorPlan.floor_plan_prompt).where(FloorPlan.id == floor_plan_id)
             )
-            or "도면 프롬프트가 존재하지 않습니다"
+            or FP_PROMPT_MISSING
     )
 
-    # 평형 프롬프트 템플릿에 추가
-    # 1. LangChain 템플릿 생성
-    template = PromptTemplate.from_template(fp_prompt)
-
-    # 2. 변수 대입 (input이라는 이름으로)
-    fp_prompt_with_equilibrium = template.format(input=equilibrium.description)
-
     # ② Tag (기존 Taste)
     tag_prompt: str = (
             await db.scalar(
                 select(Tag.tag_prompt).where(Tag.id == tag_id)
             )
-            or "태그 프롬프트가 존재하지 않습니다"
+            or TAG_PROMPT_MISSING
     )
 
     # ③ FurnitureTag (기존 Furniture)
@@ -114,12 +144,131 @@ async def build_prompt(
     furniture_prompt = "\n".join(furniture_tag_rows)
     logger.info("[Prompt] FurnitureTags %s →\n%s", furniture_tag_ids, furniture_prompt)
 
-    # ④ 최종 프롬프트 LangChain 합성
-    final_prompt: str = PROMPT_TMPL.format(
-        floor_plan_prompt=fp_prompt_with_equilibrium,
-        tag_prompt=tag_prompt,  # ✅ taste_prompt → tag_prompt
-        furniture_prompt=furniture_prompt,
-    )
+    # ④ 최종 프롬프트 합성
+    final_prompt = compose_prompt(fp_prompt, equilibrium, tag_prompt, furniture_tag_rows)
     logger.info("🟢 [Prompt] FINAL\n%s", final_prompt)
 
     return final_prompt
+
+
+# ────────────────────────────────────────────────────────────────
+# 3) 순수 합성 함수 : DB 조회 결과 → 최종 프롬프트 문자열
+#    - build_prompt / 워밍업 조합 열거가 같은 규칙을 공유
+# ────────────────────────────────────────────────────────────────
+def compose_prompt(
+    fp_prompt: str,
+    equilibrium: Equilibrium,
+    tag_prompt: str,
+    furniture_prompts: Sequence[str],
+) -> str:
+    # 평형 프롬프트 템플릿에 추가 (컴파일·대입 결과 모두 캐시됨)
+    fp_prompt_with_equilibrium = render_floor_plan(fp_prompt, equilibrium)
+
+    return join_prompt(
+        fp_prompt_with_equilibrium,
+        tag_prompt,  # ✅ taste_prompt → tag_prompt
+        furniture_prompts,
+    )
+
+
+# ────────────────────────────────────────────────────────────────
+# 4) 배치 합성 : 여러 방의 프롬프트를 테이블당 1 쿼리(IN) 로 합성
+#    - 카탈로그 캐시가 모든 id 를 갖고 있으면 쿼리 0 회
+#    - 결과는 요청 순서 그대로, 항목별 (prompt, error) – 한 항목 실패가 배치 전체를 막지 않음
+# ────────────────────────────────────────────────────────────────
+class PromptSpec(NamedTuple):
+    floor_plan_id: int
+    equilibrium: Equilibrium
+    tag_id: int
+    furniture_tag_ids: Sequence[int]
+
+
+async def build_prompts_batch(
+    db: AsyncSession,
+    specs: Sequence[PromptSpec],
+) -> list[tuple[str | None, str | None]]:
+    fp_ids = {s.floor_plan_id for s in specs}
+    tag_ids = {s.tag_id for s in specs}
+    furniture_ids = {fid for s in specs for fid in s.furniture_tag_ids}
+
+    tables = None
+    if settings.PROMPT_CATALOG_ENABLED and await prompt_catalog.ensure_fresh():
+        tables = prompt_catalog.lookup_tables(fp_ids, tag_ids, furniture_ids, items=len(specs))
+
+    if tables is None:
+        FloorPlan = AutomapBase.classes.FloorPlan
+        Tag = AutomapBase.classes.Tag
+        FurnitureTag = AutomapBase.classes.FurnitureTag
+
+        floor_plans = dict((await db.execute(
+            select(FloorPlan.id, FloorPlan.floor_plan_prompt).where(FloorPlan.id.in_(fp_ids))
+        )).all())
+        tags = dict((await db.execute(
+            select(Tag.id, Tag.tag_prompt).where(Tag.id.in_(tag_ids))
+        )).all())
+        furniture_tags = dict((await db.execute(
+            select(FurnitureTag.id, FurnitureTag.furniture_prompt).where(FurnitureTag.id.in_(furniture_ids))
+        )).all()) if furniture_ids else {}
+        tables = floor_plans, tags, furniture_tags
+
+    floor_plans, tags, furniture_tags = tables
+    results: list[tuple[str | None, str | None]] = []
+    for spec in specs:
+        try:
+            furniture_prompts = [
+                furniture_tags[fid]
+                for fid in sorted(set(spec.furniture_tag_ids))  # build_prompt 의 ORDER BY id ASC 와 동일
+                if furniture_tags.get(fid) is not None
+            ]
+            prompt = compose_prompt(
+                floor_plans.get(spec.floor_plan_id) or FP_PROMPT_MISSING,
+                spec.equilibrium,
+                tags.get(spec.tag_id) or TAG_PROMPT_MISSING,
+                furniture_prompts,
+            )
+            results.append((prompt, None))
+        except Exception as e:  # 템플릿 오류 등은 해당 항목에만 기록
+            logger.warning("[Prompt] batch 항목 합성 실패 %s: %s", spec, e)
+            results.append((None, f"{type(e).__name__}: {e}"))
+
+    logger.info("🟢 [Prompt] BATCH %d 건 합성 (실패 %d)", len(specs), sum(1 for _, err in results if err))
+    return results
+
+
+# ────────────────────────────────────────────────────────────────
+# 5) 프롬프트 조합 열거 (CLIP 텍스트 feature 캐시 워밍업용)
+#    - 도면 × 평형 × 태그 × 가구태그 조합(id 오름차순, 최대 max_furniture 개)
+#    - 가구 조합은 지수적으로 늘어나므로 limit 개에서 중단
+# ────────────────────────────────────────────────────────────────
+async def list_prompt_combinations(
+    db: AsyncSession,
+    max_furniture: int,
+    limit: int,
+) -> list[str]:
+    FloorPlan = AutomapBase.classes.FloorPlan
+    Tag = AutomapBase.classes.Tag
+    FurnitureTag = AutomapBase.classes.FurnitureTag
+
+    floor_plans = (await db.execute(select(FloorPlan.floor_plan_prompt))).scalars().all()
+    tags = (await db.execute(select(Tag.tag_prompt))).scalars().all()
+    furniture = (
+        await db.execute(select(FurnitureTag.furniture_prompt).order_by(FurnitureTag.id.asc()))
+    ).scalars().all()
+
+    prompts: list[str] = []
+    for fp_prompt in floor_plans:
+        for equilibrium in Equilibrium:
+            for tag_prompt in tags:
+                for size in range(1, max_furniture + 1):
+                    for furniture_prompts in combinations(furniture, size):
+                        if len(prompts) >= limit:
+                            return prompts
+                        prompts.append(
+                            compose_prompt(
+                                fp_prompt or FP_PROMPT_MISSING,
+                                equilibrium,
+                                tag_prompt or TAG_PROMPT_MISSING,
+                                furniture_prompts,
+                            )
+                        )
+    return prompts
@@ -0,0 +1,158 @@
+"""
+app/services/renditions.py
+──────────────────────────────
+✔️ 파생 이미지 단계 – 원본 PNG 옆에 WebP/AVIF 와 썸네일을 함께 저장
+
+▸ 동작 요약
+   1. **디코딩 1 회** : PNG 는 decode_rgb 로 한 번만 디코딩 → 같은 RGB 이미지를 CLIP 전처리와 인코딩이 공유.
+   2. **인코딩** : 형식·썸네일마다 rendition_pool(프로세스 풀)에서 병렬 인코딩 (원시 RGB 를 넘김).
+   3. **업로드** : 결과물은 s3_uploader 로 동시에 업로드 (내용 해시 키 → 중복 업로드 없음).
+   4. **지표** : 단계 지연, 인코딩 지연, 형식별 원본 대비 바이트 절감률을 /metrics 로 노출.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple, Sequence
+
+from app.config.settings import settings
+from app.libs import metrics
+from app.libs.executors import rendition_pool
+from app.libs.image_payload import as_reader
+from app.libs.s3 import s3_uploader
+from app.utils.image_codec import CONTENT_TYPES, avif_supported, encode_rendition
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_FORMAT = "webp"
+
+
+class RenditionSpec(NamedTuple):
+    formats: tuple[str, ...]          # 원본 크기 변환 형식
+    thumbnail_sizes: tuple[int, ...]  # 긴 변 기준 px
+    quality: int
+
+    @property
+    def empty(self) -> bool:
+        return not self.formats and not self.thumbnail_sizes
+
+    def cache_variant(self) -> str:
+        """결과 캐시 키에 섞을 문자열 – 같은 프롬프트라도 옵션이 다르면 다른 결과"""
+        return json.dumps(self._asdict(), sort_keys=True)
+
+
+def make_rendition_spec(
+    formats: Sequence[str] | None = None,
+    thumbnail_sizes: Sequence[int] | None = None,
+    quality: int | None = None,
+) -> RenditionSpec | None:
+    """
+    요청 값(없으면 settings 기본값)으로 스펙 생성. 만들 것이 없으면 None
+    형식은 양쪽 모두 미리 검증됨 – settings 는 기동 시, 요청은 RenditionOptions(422)
+    """
+    spec = RenditionSpec(
+        formats=tuple(dict.fromkeys(settings.IMAGE_RENDITION_FORMATS if formats is None else formats)),
+        thumbnail_sizes=tuple(sorted(set(settings.IMAGE_THUMBNAIL_SIZES if thumbnail_sizes is None else thumbnail_sizes))),
+        quality=settings.IMAGE_RENDITION_QUALITY if quality is None else quality,
+    )
+    return None if spec.empty else spec
+
+
+def default_rendition_spec() -> RenditionSpec | None:
+    return make_rendition_spec() if settings.IMAGE_RENDITIONS_DEFAULT else None
+
+
+def decode_rgb(data: bytes | memoryview) -> "Image.Image":
+    """PNG → RGB (픽셀까지 읽어 둠 → 이후 스레드·프로세스에서 재디코딩 없음)"""
+    from PIL import Image
+
+    img = Image.open(as_reader(data)).convert("RGB")
+    img.load()
+    return img
+
+
+class RenditionStage:
+    def __init__(self) -> None:
+        self.runs = 0
+        self.latency = metrics.TimingStats()
+        self.encode = metrics.TimingStats()
+        self.original_bytes = 0
+        self.format_bytes: dict[str, int] = {}
+        self.format_original_bytes: dict[str, int] = {}
+        self._avif: bool | None = None
+
+        metrics.register("image.renditions", self.snapshot)
+
+    def _jobs(self, spec: RenditionSpec) -> list[tuple[str, str, int | None]]:
+        """(이름, 형식, 긴 변 제한) 목록"""
+        formats = list(spec.formats)
+        if "avif" in formats:
+            if self._avif is None:
+                self._avif = avif_supported()
+            if not self._avif:
+                logger.warning("AVIF 인코더가 없어 avif 파생 이미지는 건너뜁니다")
+                formats.remove("avif")
+        jobs: list[tuple[str, str, int | None]] = [(fmt, fmt, None) for fmt in formats]
+        jobs += [(f"thumb_{side}", THUMBNAIL_FORMAT, side) for side in spec.thumbnail_sizes]
+        return jobs
+
+    async def run(self, image: "Image.Image", original_size: int, spec: RenditionSpec) -> dict[str, Any]:
+        started = time.perf_counter()
+        jobs = self._jobs(spec)
+        raw = image.tobytes()  # 프로세스 경계는 원시 RGB 로 넘김 (PNG 재디코딩 없음)
+
+        encoded = await asyncio.gather(*(
+            rendition_pool.run(encode_rendition, image.mode, image.size, raw, fmt, spec.quality, max_side)
+            for _, fmt, max_side in jobs
+        ))
+        uploaded = await asyncio.gather(*(
+            s3_uploader.upload_image(data, CONTENT_TYPES[fmt], fmt)
+            for (_, fmt, _), (data, _, _, _) in zip(jobs, encoded)
+        ))
+
+        items = []
+        for (name, fmt, max_side), (data, width, height, encode_ms), (key, url) in zip(jobs, encoded, uploaded):
+            self.encode.observe(encode_ms)
+            if max_side is None:
+                self.format_bytes[fmt] = self.format_bytes.get(fmt, 0) + len(data)
+                self.format_original_bytes[fmt] = self.format_original_bytes.get(fmt, 0) + original_size
+            items.append({
+                "name": name,
+                "format": fmt,
+                "width": width,
+                "height": height,
+                "bytes": len(data),
+                "savedRatio": round(1 - len(data) / original_size, 4) if original_size else 0.0,
+                "filename": key,
+                "imageLink": url,
+            })
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.runs += 1
+        self.original_bytes += original_size
+        self.latency.observe(elapsed_ms)
+        return {
+            "renditions": items,
+            "renditionStats": {"originalBytes": original_size, "latencyMs": round(elapsed_ms, 1)},
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "latency": self.latency.snapshot(),
+            "encode": self.encode.snapshot(),
+            "original_bytes": self.original_bytes,
+            "saved_ratio": {
+                fmt: round(1 - self.format_bytes[fmt] / self.format_original_bytes[fmt], 4)
+                for fmt in self.format_bytes
+                if self.format_original_bytes.get(fmt)
+            },
+        }
+
+
+rendition_stage = RenditionStage()
@@ -0,0 +1,269 @@
+"""
+app/services/vector_retrieval.py
+──────────────────────────────
+✔️ pgvector 검색 – embedding_chunks 의 ANN 인덱스 관리 · 대량 적재 · top-k 조회
+
+▸ 동작 요약
+   1. **인덱스** : PGVECTOR_INDEX(hnsw | ivfflat) 인덱스를 만들고, 거리 opclass(PGVECTOR_DISTANCE) 나
+                   파라미터(m · ef_construction · lists)가 바뀌었으면 다시 만듦. ivfflat 은 데이터 분포로 중심점을 정하므로 적재 후 reindex 로 갱신.
+   2. **적재** : 세션의 asyncpg 연결에서 텍스트 COPY (CSV) → INSERT 대비 왕복·파싱 비용 절감.
+                 텍스트 형식이라 vector 타입 코덱 등록 없이 풀의 연결을 그대로 사용.
+   3. **조회** : 기존 AsyncSession 으로 `ORDER BY embedding <=> q LIMIT k`.
+                 hnsw.ef_search / ivfflat.probes 는 set_config(..., is_local) 로 해당 트랜잭션에만 적용.
+                 여러 질의는 unnest + LATERAL 로 한 번의 왕복에 처리.
+   4. **지표** : 조회 · 배치 조회 · 적재 지연을 /metrics 로 노출.
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import logging
+import math
+import re
+import time
+from typing import Any, NamedTuple, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.libs import metrics
+
+logger = logging.getLogger(__name__)
+
+# 거리 종류 → (연산자, 인덱스 operator class)
+DISTANCES = {
+    "cosine": ("<=>", "vector_cosine_ops"),
+    "l2": ("<->", "vector_l2_ops"),
+    "ip": ("<#>", "vector_ip_ops"),  # 음의 내적 (작을수록 가까움)
+}
+INDEX_TYPES = ("hnsw", "ivfflat", "none")
+
+
+class ChunkHit(NamedTuple):
+    id: int
+    content: str
+    distance: float
+
+
+def vector_literal(vector: Sequence[float]) -> str:
+    """pgvector 텍스트 표현 '[0.1,0.2,...]'"""
+    return "[" + ",".join(repr(float(v)) for v in vector) + "]"
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector 권장값 – 100만 행까지 rows/1000, 그 이상은 sqrt(rows)"""
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(rows // 1000, 10)
+
+
+def index_signature(indexdef: str) -> str:
+    """
+    'USING hnsw (embedding vector_cosine_ops) WITH (m=16,ef_construction=64)' 부분만 정규화
+    (pg_indexes.indexdef 는 스키마 접두사 · 따옴표 · 공백이 달라서 그 앞부분과 표기 차이는 무시)
+    """
+    _, _, tail = indexdef.partition(" USING ")
+    return re.sub(r"[\s'\"]", "", tail).lower()
+
+
+class PgVectorRetriever:
+    def __init__(
+        self,
+        table: str = "embedding_chunks",
+        *,
+        dim: int | None = None,
+        index_type: str | None = None,
+        distance: str | None = None,
+    ) -> None:
+        self.table = table
+        self.dim = dim or settings.EMBED_DIM
+        self.index_type = index_type or settings.PGVECTOR_INDEX
+        self.distance = distance or settings.PGVECTOR_DISTANCE
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"알 수 없는 PGVECTOR_INDEX: {self.index_type} ({' | '.join(INDEX_TYPES)})")
+        if self.distance not in DISTANCES:
+            raise ValueError(f"알 수 없는 PGVECTOR_DISTANCE: {self.distance} ({' | '.join(DISTANCES)})")
+        self.operator, self.opclass = DISTANCES[self.distance]
+
+        self.ingested = 0
+        self.query_latency = metrics.TimingStats()
+        self.batch_latency = metrics.TimingStats()
+        self.ingest_latency = metrics.TimingStats()
+
+    # ── 인덱스 관리 ──────────────────────────────────
+    def index_name(self, index_type: str | None = None) -> str:
+        return f"{self.table}_embedding_{index_type or self.index_type}"
+
+    async def _index_ddl(self, session: AsyncSession) -> str | None:
+        if self.index_type == "hnsw":
+            params = f"m = {settings.PGVECTOR_HNSW_M}, ef_construction = {settings.PGVECTOR_HNSW_EF_CONSTRUCTION}"
+        elif self.index_type == "ivfflat":
+            lists = settings.PGVECTOR_IVFFLAT_LISTS
+            if lists <= 0:
+                rows = await session.scalar(text(f"SELECT count(*) FROM {self.table}"))
+                lists = ivfflat_lists(rows or 0)
+            params = f"lists = {lists}"
+        else:
+            return None
+        return (
+            f"CREATE INDEX {self.index_name()} ON {self.table} "
+            f"USING {self.index_type} (embedding {self.opclass}) WITH ({params})"
+        )
+
+    async def ensure_index(self, session: AsyncSession, *, rebuild: bool = False) -> bool:
+        """
+        설정과 같은 인덱스가 있으면 그대로 두고, 없거나 opclass · 파라미터가 다르면 (다시) 생성. 만들었으면 True
+        다른 종류의 인덱스(hnsw ↔ ivfflat)는 삭제
+        """
+        for other in INDEX_TYPES[:2]:
+            if other != self.index_type:
+                await session.execute(text(f"DROP INDEX IF EXISTS {self.index_name(other)}"))
+
+        ddl = await self._index_ddl(session)
+        if ddl is None:
+            await session.commit()
+            return False
+
+        current = await session.scalar(
+            text("SELECT indexdef FROM pg_indexes WHERE tablename = :t AND indexname = :i"),
+            {"t": self.table, "i": self.index_name()},
+        )
+        # 접근 방식 · opclass(거리 함수) · WITH 파라미터까지 비교 – opclass 가 다르면 새 연산자 조회가 seq scan 이 됨
+        if current is not None and not rebuild and index_signature(current) == index_signature(ddl):
+            await session.commit()
+            return False
+
+        started = time.perf_counter()
+        await session.execute(text(f"DROP INDEX IF EXISTS {self.index_name()}"))
+        await session.execute(text(ddl))
+        await session.commit()
+        logger.info("[pgvector] 인덱스 생성 %.0f ms – %s", (time.perf_counter() - started) * 1000, ddl)
+        return True
+
+    async def reindex(self, session: AsyncSession) -> bool:
+        """대량 적재 후 호출 – ivfflat 은 lists 를 행 수에 맞춰 다시 계산해 재생성"""
+        return await self.ensure_index(session, rebuild=self.index_type == "ivfflat")
+
+    # ── 적재 (COPY) ─────────────────────────────────
+    async def ingest(
+        self,
+        session: AsyncSession,
+        contents: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+    ) -> int:
+        """(내용, 벡터) 를 PGVECTOR_COPY_BATCH 행 단위 COPY 로 적재하고 커밋. 적재한 행 수 반환"""
+        if len(contents) != len(vectors):
+            raise ValueError("contents 와 vectors 길이가 다릅니다")
+        started = time.perf_counter()
+
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection  # asyncpg.Connection (세션 트랜잭션 안)
+
+        batch = settings.PGVECTOR_COPY_BATCH
+        for start in range(0, len(contents), batch):
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            for content, vector in zip(contents[start:start + batch], vectors[start:start + batch]):
+                if len(vector) != self.dim:
+                    raise ValueError(f"벡터 차원 {len(vector)} ≠ {self.dim}")
+                writer.writerow((content, vector_literal(vector)))
+            await driver.copy_to_table(
+                self.table,
+                source=io.BytesIO(buf.getvalue().encode("utf-8")),
+                columns=["content", "embedding"],
+                format="csv",
+            )
+        await session.commit()
+
+        self.ingested += len(contents)
+        self.ingest_latency.observe((time.perf_counter() - started) * 1000)
+        return len(contents)
+
+    # ── 조회 ──────────────────────────────────────────
+    async def _tune(self, session: AsyncSession, ef_search: int | None, probes: int | None) -> None:
+        if self.index_type == "hnsw":
+            value = ef_search or settings.PGVECTOR_HNSW_EF_SEARCH
+            await session.execute(text("SELECT set_config('hnsw.ef_search', :v, true)"), {"v": str(value)})
+        elif self.index_type == "ivfflat":
+            value = probes or settings.PGVECTOR_IVFFLAT_PROBES
+            await session.execute(text("SELECT set_config('ivfflat.probes', :v, true)"), {"v": str(value)})
+
+    async def search(
+        self,
+        session: AsyncSession,
+        vector: Sequence[float],
+        k: int = 4,
+        *,
+        ef_search: int | None = None,
+        probes: int | None = None,
+    ) -> list[ChunkHit]:
+        started = time.perf_counter()
+        await self._tune(session, ef_search, probes)
+        rows = await session.execute(
+            text(
+                f"WITH q AS (SELECT CAST(CAST(:q AS text) AS vector) AS vec) "
+                f"SELECT id, content, embedding {self.operator} q.vec AS distance "
+                f"FROM {self.table}, q ORDER BY embedding {self.operator} q.vec LIMIT :k"
+            ),
+            {"q": vector_literal(vector), "k": k},
+        )
+        hits = [ChunkHit(*row) for row in rows]
+        self.query_latency.observe((time.perf_counter() - started) * 1000)
+        return hits
+
+    async def search_many(
+        self,
+        session: AsyncSession,
+        vectors: Sequence[Sequence[float]],
+        k: int = 4,
+        *,
+        ef_search: int | None = None,
+        probes: int | None = None,
+    ) -> list[list[ChunkHit]]:
+        """질의 N 개를 한 번의 왕복으로 – 결과는 입력 순서대로"""
+        if not vectors:
+            return []
+        started = time.perf_counter()
+        await self._tune(session, ef_search, probes)
+        array = "{" + ",".join(f'"{vector_literal(v)}"' for v in vectors) + "}"
+        rows = await session.execute(
+            text(
+                f"SELECT q.ord, c.id, c.content, c.distance "
+                f"FROM unnest(CAST(CAST(:qs AS text) AS vector[])) WITH ORDINALITY AS q(vec, ord) "
+                f"CROSS JOIN LATERAL ("
+                f"  SELECT id, content, embedding {self.operator} q.vec AS distance "
+                f"  FROM {self.table} ORDER BY embedding {self.operator} q.vec LIMIT :k"
+                f") c ORDER BY q.ord, c.distance"
+            ),
+            {"qs": array, "k": k},
+        )
+        results: list[list[ChunkHit]] = [[] for _ in vectors]
+        for ord_, id_, content, distance in rows:
+            results[ord_ - 1].append(ChunkHit(id_, content, distance))
+        self.batch_latency.observe((time.perf_counter() - started) * 1000)
+        return results
+
+    async def search_text(self, session: AsyncSession, query: str, k: int = 4) -> list[ChunkHit]:
+        """질의 문장을 벡터 스토어와 같은 임베더로 임베딩해 조회"""
+        from app.libs.vector_store import vector_store_manager
+
+        vector = await asyncio.to_thread(vector_store_manager.embeddings.embed_query, query)
+        return await self.search(session, vector, k)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "table": self.table,
+            "index": self.index_type,
+            "distance": self.distance,
+            "ingested": self.ingested,
+            "query": self.query_latency.snapshot(),
+            "batch_query": self.batch_latency.snapshot(),
+            "ingest": self.ingest_latency.snapshot(),
+        }
+
+
+pgvector_retriever = PgVectorRetriever()
+metrics.register("vector.pgvector", pgvector_retriever.snapshot)
@@ -1,27 +1,377 @@
-import torch
-import open_clip
-from PIL import Image
-from io import BytesIO
-
-# 모델은 최초 1회만 로딩
-_model, _, _preprocess = open_clip.create_model_and_transforms(
-    model_name="ViT-B-32",
-    pretrained="laion2b_s34b_b79k"
-)
-_tokenizer = open_clip.get_tokenizer("ViT-B-32")
-_device = "cuda" if torch.cuda.is_available() else "cpu"
-_model = _model.to(_device)
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Iterable, Sequence
+
+from app.config.settings import settings
+from app.libs import metrics
+from app.libs.image_payload import as_reader
+
+if TYPE_CHECKING:  # torch / open_clip 은 실제 로딩 시점에만 import
+    import torch
+
+logger = logging.getLogger(__name__)
+
+
+# 선택 가능한 추론 백엔드
+#   eager       : fp32 eager (기존 동작)
+#   int8        : Linear 레이어 int8 동적 양자화 (CPU 전용)
+#   torchscript : encode_image / encode_text 를 trace + freeze 한 그래프
+INFERENCE_BACKENDS = ("eager", "int8", "torchscript")
+
+
+class ClipModelLoader:
+    """
+    CLIP 모델 지연 로더
+    - import 시점에는 아무것도 로딩하지 않음 (torch · open_clip import 포함)
+    - 첫 채점 또는 명시적 warmup() 때 한 번만 로딩 (스레드 안전)
+    - CLIP_WEIGHTS_PATH 가 있으면 로컬 체크포인트만 사용 → 오프라인 기동 시 네트워크 접근 없음
+    - backend / inference_mode / 스레드 수로 CPU 추론 방식을 선택
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        pretrained: str,
+        weights_path: str | None = None,
+        *,
+        backend: str = "eager",
+        inference_mode: bool = True,
+        num_threads: int | None = None,
+        num_interop_threads: int | None = None,
+    ) -> None:
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"알 수 없는 CLIP 추론 백엔드: {backend} (지원: {INFERENCE_BACKENDS})")
+        self.model_name = model_name
+        self.pretrained = pretrained
+        self.weights_path = weights_path
+        self.backend = backend
+        self.inference_mode = inference_mode
+        self.num_threads = num_threads
+        self.num_interop_threads = num_interop_threads
+        self._lock = threading.Lock()
+        self.state = "idle"  # idle → loading → ready | failed
+        self.error: str | None = None
+        self.load_ms: float | None = None
+
+        self.model: Any = None
+        self.preprocess: Any = None
+        self.tokenizer: Any = None
+        self.device = "cpu"
+        self._image_encoder: Any = None  # backend 별 실제 호출 대상
+        self._text_encoder: Any = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def load(self) -> ClipModelLoader:
+        if self.ready:
+            return self
+        with self._lock:
+            if self.ready:  # 다른 스레드가 먼저 로딩 완료
+                return self
+            self.state = "loading"
+            started = time.perf_counter()
+            try:
+                import torch
+                import open_clip
+
+                self._configure_threads(torch)
+                source = self.weights_path or self.pretrained
+                model, _, preprocess = open_clip.create_model_and_transforms(
+                    model_name=self.model_name,
+                    pretrained=source,
+                )
+                self.device = "cuda" if torch.cuda.is_available() else "cpu"
+                self.model = model.to(self.device).eval()
+                self.preprocess = preprocess
+                self.tokenizer = open_clip.get_tokenizer(self.model_name)
+                self._apply_backend(torch)
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                raise
+            self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.state = "ready"
+            logger.info(
+                "CLIP 모델 로딩 완료 – %s (%s, backend=%s) %.1f ms",
+                self.model_name, source, self.backend, self.load_ms,
+            )
+        return self
+
+    def _configure_threads(self, torch: Any) -> None:
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        if self.num_interop_threads:
+            try:
+                torch.set_num_interop_threads(self.num_interop_threads)
+            except RuntimeError:  # 이미 병렬 작업이 시작된 뒤에는 변경 불가
+                logger.warning("torch inter-op 스레드 수는 이미 고정됨 – 설정 무시")
 
-def calculate_clip_score(png_bytes: bytes, prompt: str) -> float:
-    image = Image.open(BytesIO(png_bytes)).convert("RGB")
-    image_tensor = _preprocess(image).unsqueeze(0).to(_device)
-    text_tokens = _tokenizer([prompt]).to(_device)
+    def _apply_backend(self, torch: Any) -> None:
+        model = self.model
+        backend = self.backend
+        if backend == "int8" and self.device != "cpu":
+            logger.warning("int8 동적 양자화는 CPU 전용 – eager 로 대체")
+            backend = self.backend = "eager"
+
+        if backend == "int8":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = model
+
+        if backend == "torchscript":
+            image_size = getattr(model.visual, "image_size", 224)
+            if isinstance(image_size, (tuple, list)):
+                image_size = image_size[0]
+            # batch 차원이 1 로 고정되지 않도록 2 개짜리 예제로 trace
+            example_image = torch.zeros((2, 3, image_size, image_size), device=self.device)
+            example_text = self.tokenizer(["a photo", "a room"]).to(self.device)
+            self._image_encoder = _trace_encoder(torch, model, "encode_image", example_image)
+            self._text_encoder = _trace_encoder(torch, model, "encode_text", example_text)
+        else:
+            self._image_encoder = model.encode_image
+            self._text_encoder = model.encode_text
+
+    def grad_context(self) -> contextlib.AbstractContextManager:
+        """torch.inference_mode (기본) 또는 torch.no_grad"""
+        import torch
+
+        return torch.inference_mode() if self.inference_mode else torch.no_grad()
+
+    def encode_image(self, image_tensor: torch.Tensor) -> torch.Tensor:
+        return self._image_encoder(image_tensor)
+
+    def encode_text(self, text_tokens: torch.Tensor) -> torch.Tensor:
+        return self._text_encoder(text_tokens)
+
+    def warmup(self) -> None:
+        """로딩 + 더미 forward 1회 (첫 요청의 지연을 기동 단계로 옮김)"""
+        import torch
+
+        self.load()
+        with self.grad_context():
+            dummy = torch.zeros((1, 3, 224, 224), device=self.device)
+            self.encode_image(dummy)
+            self.encode_text(self.tokenizer(["warmup"]).to(self.device))
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "model": self.model_name,
+            "weights": self.weights_path or self.pretrained,
+            "device": self.device,
+            "backend": self.backend,
+            "inference_mode": self.inference_mode,
+            "num_threads": self.num_threads,
+            "load_ms": self.load_ms,
+            "error": self.error,
+        }
+
+
+def _trace_encoder(torch: Any, model: Any, method: str, example: torch.Tensor) -> Any:
+    """model.encode_image / encode_text 를 forward 로 감싸 trace → freeze"""
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.model = model
+
+        def forward(self, x: torch.Tensor) -> torch.Tensor:
+            return getattr(self.model, method)(x)
 
     with torch.no_grad():
-        image_features = _model.encode_image(image_tensor)
-        text_features = _model.encode_text(text_tokens)
+        return torch.jit.freeze(torch.jit.trace(_Encoder().eval(), example))
+
+
+clip_loader = ClipModelLoader(
+    model_name=settings.CLIP_MODEL_NAME,
+    pretrained=settings.CLIP_PRETRAINED,
+    weights_path=settings.CLIP_WEIGHTS_PATH,
+    backend=settings.CLIP_INFERENCE_BACKEND,
+    inference_mode=settings.CLIP_INFERENCE_MODE,
+    num_threads=settings.CLIP_NUM_THREADS,
+    num_interop_threads=settings.CLIP_NUM_INTEROP_THREADS,
+)
+metrics.register("clip.model", clip_loader.status)
+
+
+class TextFeatureCache:
+    """
+    정규화된 CLIP 텍스트 feature LRU 캐시
+    - key : 프롬프트 sha256 (긴 프롬프트 문자열을 그대로 들고 있지 않음)
+    - 용량 초과 시 가장 오래 안 쓰인 항목부터 제거
+    - clip_pool 스레드들이 동시에 접근 → 락으로 보호
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._data: OrderedDict[str, torch.Tensor] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str) -> torch.Tensor | None:
+        k = self.key(prompt)
+        with self._lock:
+            feat = self._data.get(k)
+            if feat is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(k)
+            self.hits += 1
+            return feat
+
+    def put(self, prompt: str, feat: torch.Tensor) -> None:
+        if self.max_size <= 0:
+            return
+        k = self.key(prompt)
+        with self._lock:
+            self._data[k] = feat
+            self._data.move_to_end(k)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, prompt: str) -> bool:
+        with self._lock:
+            return self.key(prompt) in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+text_feature_cache = TextFeatureCache(settings.CLIP_TEXT_CACHE_SIZE)
+metrics.register("clip.text_cache", text_feature_cache.stats)
+
+
+def _encode_texts(prompts: list[str]) -> torch.Tensor:
+    """프롬프트 목록 → 정규화된 텍스트 feature (clip_loader.grad_context() 안에서 호출)"""
+    clip = clip_loader.load()
+    text_tokens = clip.tokenizer(prompts).to(clip.device)
+    text_features = clip.encode_text(text_tokens)
+    text_features /= text_features.norm(dim=-1, keepdim=True)
+    return text_features
+
+
+def _text_features_for(prompts: list[str]) -> torch.Tensor:
+    """캐시 hit 는 그대로 쓰고 miss 만 한 번에 인코딩 → (len(prompts), D)"""
+    import torch
+
+    features: list[torch.Tensor | None] = [text_feature_cache.get(p) for p in prompts]
+    missing = [i for i, feat in enumerate(features) if feat is None]
+    if missing:
+        encoded = _encode_texts([prompts[i] for i in missing])
+        for i, feat in zip(missing, encoded):
+            features[i] = feat
+            text_feature_cache.put(prompts[i], feat.clone())  # 배치 텐서 전체가 캐시에 묶이지 않도록 복사
+    return torch.stack(features)
+
+
+def _as_rgb(image: Any) -> Any:
+    """PNG bytes/memoryview 는 디코딩, 이미 디코딩된 PIL 이미지는 그대로 사용"""
+    from PIL import Image
+
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return Image.open(as_reader(image)).convert("RGB")
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+def calculate_clip_score(png_bytes: Any, prompt: str) -> float:
+    score = calculate_clip_scores([(png_bytes, prompt)])[0]
+    if isinstance(score, Exception):
+        raise score
+    return score
+
+def calculate_clip_scores(items: Sequence[tuple[Any, str]]) -> list[float | Exception]:
+    """
+    (이미지, 프롬프트) 쌍 여러 개를 한 번의 encode_image / encode_text 로 채점
+    - 같은 배치 안의 중복 프롬프트는 한 번만 인코딩
+    - 텍스트 feature 캐시 hit 면 encode_text 는 생략 (이미지 인코더만 실행)
+    - 반환 순서 = 입력 순서
+    - 이미지는 PNG bytes / memoryview(업로드와 같은 버퍼) / 디코딩된 PIL 이미지(파생 이미지 단계와 공유)
+    - 디코딩 · 전처리는 항목별로 먼저 수행 → 깨진 이미지는 그 자리에 예외 객체를 돌려주고 나머지만 forward
+    """
+    if not items:
+        return []
+
+    import torch
+
+    clip = clip_loader.load()
+    results: list[float | Exception] = [0.0] * len(items)
+    images = []
+    valid: list[int] = []
+    for i, (png, _) in enumerate(items):
+        try:
+            images.append(clip.preprocess(_as_rgb(png)))
+        except Exception as e:  # noqa: BLE001  – 손상 · 디코딩 불가 이미지는 해당 항목만 실패
+            results[i] = e
+        else:
+            valid.append(i)
+    if not valid:
+        return results
+    items = [items[i] for i in valid]
+    image_tensor = torch.stack(images).to(clip.device)
+
+    prompt_pos: dict[str, int] = {}
+    for _, prompt in items:
+        prompt_pos.setdefault(prompt, len(prompt_pos))
+    text_index = torch.tensor([prompt_pos[prompt] for _, prompt in items], device=clip.device)
+
+    with clip.grad_context():
+        image_features = clip.encode_image(image_tensor)
         image_features /= image_features.norm(dim=-1, keepdim=True)
-        text_features /= text_features.norm(dim=-1, keepdim=True)
-        score = (image_features @ text_features.T).item()
+        text_features = _text_features_for(list(prompt_pos))
+        # i 번째 이미지 ↔ i 번째 프롬프트 (대각 성분만 계산)
+        scores = (image_features * text_features[text_index]).sum(dim=-1).tolist()
+
+    for i, score in zip(valid, scores):
+        results[i] = round(score, 4)
+    return results
+
+
+def warm_text_cache(prompts: Iterable[str], batch_size: int = 32) -> int:
+    """
+    프롬프트 텍스트 feature 를 미리 계산해 캐시에 적재 (블로킹 → clip_pool 에서 호출)
+    반환값: 새로 인코딩한 프롬프트 수
+    """
+    encoded = 0
+    batch: list[str] = []
+
+    def _flush() -> None:
+        nonlocal encoded
+        with clip_loader.load().grad_context():
+            for prompt, feat in zip(batch, _encode_texts(batch)):
+                text_feature_cache.put(prompt, feat.clone())
+        encoded += len(batch)
+        batch.clear()
 
-    return round(score, 4)
\ No newline at end of file
+    for prompt in dict.fromkeys(prompts):
+        if prompt in text_feature_cache:
+            continue
+        batch.append(prompt)
+        if len(batch) >= batch_size:
+            _flush()
+    if batch:
+        _flush()
+    return encoded
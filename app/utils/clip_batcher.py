@@ -0,0 +1,137 @@
+# app/utils/clip_batcher.py
+"""
+CLIP 동적 마이크로 배칭
+──────────────────────────────
+- 동시에 들어온 채점 요청을 최대 N 개 / 최대 T ms 동안 모아서
+  `calculate_clip_scores` 한 번(배치 forward)으로 처리
+- 호출 측은 `await clip_batcher.score(png, prompt)` 로 자기 점수만 돌려받음
+- 디코딩할 수 없는 이미지는 그 호출만 실패 (같은 배치의 다른 요청은 정상 채점)
+- 배치 forward 는 clip_pool 에서 실행 → 이벤트 루프는 막히지 않음
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Sequence
+
+from app.config.settings import settings
+from app.libs import metrics
+from app.libs.executors import BoundedExecutor, clip_pool
+from app.utils.CLIPScore import calculate_clip_score, calculate_clip_scores
+
+logger = logging.getLogger(__name__)
+
+# 항목별 점수 – 해당 항목만 실패하면 그 자리에 예외 객체
+ScoreBatchFn = Callable[[Sequence[tuple[Any, str]]], list[float | Exception]]
+
+
+class ClipBatchScorer:
+    """N 개 또는 T ms 중 먼저 도달하는 조건으로 배치를 flush"""
+
+    def __init__(
+        self,
+        score_batch: ScoreBatchFn,
+        *,
+        max_batch: int,
+        max_wait_ms: float,
+        pool: BoundedExecutor,
+        name: str = "clip.batcher",
+    ) -> None:
+        self._score_batch = score_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._pool = pool
+        self._pending: list[tuple[tuple[Any, str], asyncio.Future[float]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()  # 실행 중 배치 task 참조 유지 (GC 방지)
+
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+        self.batch_latency = metrics.TimingStats()
+
+        metrics.register(name, self.snapshot)
+
+    async def score(self, png_bytes: Any, prompt: str) -> float:
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future[float] = loop.create_future()
+        self._pending.append(((png_bytes, prompt), fut))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[tuple[Any, str], asyncio.Future[float]]]) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            scores = await self._pool.run(self._score_batch, [item for item, _ in batch])
+        except Exception as e:  # forward 자체 실패 → 배치 내 모든 호출자에게 전파
+            logger.exception("CLIP 배치 채점 실패 (size=%d)", len(batch))
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            self.batches += 1
+            self.items += len(batch)
+            self.max_seen_batch = max(self.max_seen_batch, len(batch))
+            self.batch_latency.observe((loop.time() - started) * 1000)
+
+        for (_, fut), score in zip(batch, scores):
+            if fut.done():  # 호출자가 취소했으면 건너뜀
+                continue
+            if isinstance(score, Exception):
+                logger.warning("CLIP 채점 실패 – 이미지 디코딩 불가: %s", score)
+                fut.set_exception(score)
+            else:
+                fut.set_result(score)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_seen_batch": self.max_seen_batch,
+            "batch_latency": self.batch_latency.snapshot(),
+        }
+
+
+clip_batcher = ClipBatchScorer(
+    calculate_clip_scores,
+    max_batch=settings.CLIP_BATCH_MAX_SIZE,
+    max_wait_ms=settings.CLIP_BATCH_MAX_WAIT_MS,
+    pool=clip_pool,
+)
+
+
+async def score_clip(png_bytes: Any, prompt: str) -> float:
+    """
+    설정에 따라 사이드카 / 배칭 / 단건 경로로 채점
+    png_bytes : PNG bytes · memoryview 또는 디코딩된 PIL 이미지 (사이드카는 PNG 만 전송 가능)
+    """
+    if settings.CLIP_SCORER == "sidecar":
+        from app.utils.clip_client import sidecar_client
+
+        return await sidecar_client.score(png_bytes, prompt)
+    if settings.CLIP_BATCH_ENABLED:
+        return await clip_batcher.score(png_bytes, prompt)
+    return await clip_pool.run(calculate_clip_score, png_bytes, prompt)
@@ -0,0 +1,114 @@
+# app/utils/clip_client.py
+"""
+CLIP 사이드카 클라이언트 (API 워커 측)
+──────────────────────────────
+- CLIP_SCORER=sidecar 이면 워커는 모델을 올리지 않고 Unix 소켓으로 채점 요청만 보냄
+  → 워커 수가 늘어도 워커별 RSS 는 그대로, 모델은 사이드카 프로세스에 1 벌만 존재
+- 프레임 : [header 길이 u32][payload 길이 u32][header JSON][payload 바이트]
+- 연결은 재사용 (최대 CLIP_SIDECAR_CONNECTIONS 개)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import struct
+import time
+from typing import Any
+
+from app.config.settings import settings
+from app.libs import metrics
+
+logger = logging.getLogger(__name__)
+
+_FRAME_HEAD = struct.Struct(">II")
+
+
+def write_frame(writer: asyncio.StreamWriter, header: dict[str, Any], payload: bytes | memoryview = b"") -> None:
+    head = json.dumps(header).encode("utf-8")
+    writer.write(_FRAME_HEAD.pack(len(head), len(payload)))
+    writer.write(head)
+    if payload:
+        writer.write(payload)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[dict[str, Any], bytes]:
+    head_len, payload_len = _FRAME_HEAD.unpack(await reader.readexactly(_FRAME_HEAD.size))
+    header = json.loads(await reader.readexactly(head_len))
+    payload = await reader.readexactly(payload_len) if payload_len else b""
+    return header, payload
+
+
+class SidecarClipClient:
+    def __init__(self, socket_path: str, max_connections: int, timeout: float) -> None:
+        self.socket_path = socket_path
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._sem: asyncio.Semaphore | None = None
+        self._sem_loop: asyncio.AbstractEventLoop | None = None
+        self.errors = 0
+        self.latency = metrics.TimingStats()
+
+        metrics.register("clip.sidecar", self.snapshot)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_connections)
+            self._sem_loop = loop
+            self._idle.clear()  # 다른 루프에서 연 연결은 재사용 불가
+        return self._sem
+
+    async def _request(self, header: dict[str, Any], payload: bytes | memoryview = b"") -> dict[str, Any]:
+        started = time.perf_counter()
+        async with self._semaphore():
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            try:
+                write_frame(writer, header, payload)
+                await writer.drain()
+                response, _ = await asyncio.wait_for(read_frame(reader), self.timeout)
+            except BaseException:
+                # 응답 도중 끊긴 연결은 프레임 경계가 깨졌을 수 있으므로 버림
+                self.errors += 1
+                writer.close()
+                raise
+            self._idle.append((reader, writer))
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        return response
+
+    async def score(self, png_bytes: bytes | memoryview, prompt: str) -> float:
+        response = await self._request({"op": "score", "prompt": prompt}, png_bytes)
+        if "error" in response:
+            raise RuntimeError(f"CLIP 사이드카 채점 실패: {response['error']}")
+        return response["score"]
+
+    async def ping(self) -> dict[str, Any]:
+        """사이드카 모델 상태 조회 – 연결 불가면 state=unreachable"""
+        try:
+            return await self._request({"op": "ping"})
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            return {"ready": False, "state": "unreachable", "error": str(e)}
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "socket": self.socket_path,
+            "idle_connections": len(self._idle),
+            "errors": self.errors,
+            "latency": self.latency.snapshot(),
+        }
+
+
+sidecar_client = SidecarClipClient(
+    settings.CLIP_SIDECAR_SOCKET,
+    max_connections=settings.CLIP_SIDECAR_CONNECTIONS,
+    timeout=settings.CLIP_SIDECAR_TIMEOUT,
+)
@@ -0,0 +1,88 @@
+# app/utils/clip_server.py
+"""
+CLIP 채점 사이드카 서버
+──────────────────────────────
+- 노드당 1 프로세스로 띄우고, API 워커들은 CLIP_SCORER=sidecar 로 Unix 소켓 접속
+- 모델(+텍스트 feature 캐시)은 이 프로세스에만 1 벌 존재
+- 모든 워커의 요청이 한 곳으로 모이므로 clip_batcher 의 동적 배칭 효과가 커짐
+
+실행)
+    python -m app.utils.clip_server
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from app.config.settings import settings
+from app.libs.executors import clip_pool
+from app.utils.CLIPScore import clip_loader
+from app.utils.clip_batcher import clip_batcher
+from app.utils.clip_client import read_frame, write_frame
+
+logger = logging.getLogger(__name__)
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                header, payload = await read_frame(reader)
+            except (asyncio.IncompleteReadError, ConnectionResetError):
+                break  # 클라이언트가 연결을 닫음
+
+            if header.get("op") == "ping":
+                reply = {"ready": clip_loader.ready, **clip_loader.status()}
+            else:
+                try:
+                    reply = {"score": await clip_batcher.score(payload, header["prompt"])}
+                except Exception as e:  # 채점 실패는 해당 요청에만 전달, 연결은 유지
+                    logger.exception("사이드카 채점 실패")
+                    reply = {"error": str(e)}
+            try:
+                write_frame(writer, reply)
+                await writer.drain()
+            except (ConnectionResetError, BrokenPipeError):
+                break  # 응답 전에 클라이언트가 끊음 (타임아웃 등) – 조용히 닫음
+    finally:
+        writer.close()
+
+
+async def _warm_text_cache() -> None:
+    # 텍스트 캐시 워밍업은 DB 프롬프트 조합이 필요 → API 와 같은 방식으로 reflection
+    from pgvector.sqlalchemy import Vector
+    from sqlalchemy.dialects.postgresql.base import ischema_names
+
+    from app.db.automap import init_automap
+    from app.db.session import engine
+    from app.services.image_service import warm_clip_text_cache
+
+    ischema_names["vector"] = Vector
+    await init_automap(engine)
+    await warm_clip_text_cache()
+
+
+async def serve(socket_path: str) -> None:
+    path = Path(socket_path)
+    path.unlink(missing_ok=True)  # 이전 프로세스가 남긴 소켓 파일 정리
+
+    server = await asyncio.start_unix_server(_handle, path=str(path))
+    os.chmod(path, 0o660)
+    logger.info("CLIP 사이드카 대기 중 – %s", path)
+
+    await clip_pool.run(clip_loader.warmup)
+    if settings.CLIP_TEXT_CACHE_WARMUP:
+        await _warm_text_cache()
+
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)-7s | %(name)s:%(lineno)d - %(message)s",
+    )
+    asyncio.run(serve(settings.CLIP_SIDECAR_SOCKET))
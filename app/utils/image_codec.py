@@ -0,0 +1,65 @@
+# app/utils/image_codec.py
+"""
+파생 이미지 인코딩 (rendition_pool 프로세스에서 실행)
+──────────────────────────────
+- spawn 된 워커가 import 하는 모듈 → PIL 외 의존성 없이 가볍게 유지
+- 입력은 디코딩이 끝난 RGB 원시 바이트 (PNG 재디코딩 없음)
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+import logging
+import time
+
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif", "png": "image/png"}
+
+
+def avif_supported() -> bool:
+    """Pillow 내장 AVIF(11.2+) 또는 pillow-avif-plugin 사용 가능 여부"""
+    try:
+        if features.check("avif"):
+            return True
+    except ValueError:  # 알 수 없는 feature (구버전 Pillow)
+        pass
+    try:
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def encode_rendition(
+    mode: str,
+    size: tuple[int, int],
+    raw: bytes,
+    fmt: str,
+    quality: int,
+    max_side: int | None = None,
+) -> tuple[bytes, int, int, float]:
+    """
+    RGB 원시 바이트 → (인코딩 결과, 너비, 높이, 소요 ms)
+    max_side 가 있으면 긴 변을 그 크기로 축소 (확대는 하지 않음)
+    """
+    started = time.perf_counter()
+    img = Image.frombuffer(mode, size, raw, "raw", mode, 0, 1)
+    if max_side and max(img.size) > max_side:
+        img = img.copy()
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    if fmt == "webp":
+        img.save(out, format="WEBP", quality=quality, method=4)
+    elif fmt == "avif":
+        if not avif_supported():
+            raise RuntimeError("AVIF 인코더가 없습니다 (Pillow 11.2+ 또는 pillow-avif-plugin)")
+        with contextlib.suppress(ImportError):
+            import pillow_avif  # noqa: F401  (플러그인 등록)
+        img.save(out, format="AVIF", quality=quality)
+    else:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    return out.getvalue(), img.width, img.height, (time.perf_counter() - started) * 1000
@@ -0,0 +1,78 @@
+# benchmarks/bench_automap_startup.py
+"""
+기동 시 Automap 준비 시간 비교 (모드마다 새 프로세스 – 매번 콜드 스타트)
+
+- legacy   : 기존 방식 AutomapBase.prepare(reflect=True) – DB 전체 reflection
+- scoped   : AUTOMAP_TABLES 범위 reflection, 스냅샷 사용 안 함
+- cold     : 스냅샷 파일 삭제 후 기동 (지문 + 범위 reflection + 스냅샷 저장)
+- snapshot : 스냅샷이 있는 상태로 기동 (지문 쿼리 1 회 + 스냅샷 로드)
+  → Postgres 필요, 접속 정보는 settings 와 동일
+
+실행 예)
+    python -m benchmarks.bench_automap_startup --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = ("legacy", "scoped", "cold", "snapshot")
+
+
+async def _run(mode: str) -> dict:
+    from app.db import automap
+    from app.db.session import engine
+
+    started = time.perf_counter()
+    if mode == "legacy":
+        automap._register_vector_type()
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                automap.AutomapBase.prepare,
+                reflect=True,
+                classname_for_table=lambda base, tbl_name, tbl_obj: automap.snake_to_camel(tbl_name),
+            )
+        stats = {"source": "legacy", "tables": sorted(automap.AutomapBase.metadata.tables)}
+    else:
+        if mode == "cold":
+            automap.SNAPSHOT_PATH.unlink(missing_ok=True)
+        stats = await automap.init_automap(engine, use_snapshot=mode != "scoped")
+    stats["wall_ms"] = (time.perf_counter() - started) * 1000
+    await engine.dispose()
+    return stats
+
+
+def _child(mode: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_automap_startup", "--child", mode],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", choices=MODES)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_run(args.child))))
+        return
+
+    for mode in MODES:
+        runs = [_child(mode) for _ in range(args.repeat)]
+        wall = [r["wall_ms"] for r in runs]
+        print(
+            f"{mode:<9} tables {len(runs[-1]['tables']):4d} | "
+            f"median {statistics.median(wall):8.1f} ms | min {min(wall):8.1f} ms | source {runs[-1]['source']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
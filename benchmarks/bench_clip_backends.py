@@ -0,0 +1,130 @@
+# benchmarks/bench_clip_backends.py
+"""
+CLIP 추론 백엔드 비교 (eager fp32 기준)
+- 단건 지연(p50/p99), 배치 처리량, fp32 eager 대비 점수 오차(drift)를 출력
+- 고정된 이미지/프롬프트 세트를 사용 → 실행마다 같은 입력
+
+실행 예)
+    python -m benchmarks.bench_clip_backends
+    python -m benchmarks.bench_clip_backends --threads 4 --batch 8 --image-dir ./samples
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+
+import torch
+from PIL import Image, ImageDraw
+
+from app.config.settings import settings
+from app.utils.CLIPScore import INFERENCE_BACKENDS, ClipModelLoader
+
+PROMPTS = [
+    "A bright minimalist living room with a grey fabric sofa",
+    "Cozy bedroom with warm wood furniture and soft lighting",
+    "Modern studio apartment with a compact dining table",
+    "Scandinavian style room with white walls and plants",
+    "Small kitchen with navy cabinets and brass handles",
+    "Home office with a large desk facing the window",
+]
+
+
+def _fixed_images(n: int, image_dir: str | None) -> list[Image.Image]:
+    if image_dir:
+        paths = sorted(p for p in Path(image_dir).iterdir() if p.suffix.lower() in {".png", ".jpg", ".jpeg", ".webp"})
+        return [Image.open(p).convert("RGB") for p in paths[:n]]
+
+    images = []
+    for seed in range(n):
+        rnd = random.Random(seed)
+        img = Image.new("RGB", (768, 512), tuple(rnd.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(12):
+            x0, y0 = rnd.randrange(700), rnd.randrange(450)
+            draw.rectangle(
+                (x0, y0, x0 + rnd.randrange(20, 200), y0 + rnd.randrange(20, 200)),
+                fill=tuple(rnd.randrange(256) for _ in range(3)),
+            )
+        images.append(img)
+    return images
+
+
+def _scores(clip: ClipModelLoader, image_tensor: torch.Tensor, prompts: list[str]) -> list[float]:
+    with clip.grad_context():
+        img = clip.encode_image(image_tensor.to(clip.device))
+        txt = clip.encode_text(clip.tokenizer(prompts).to(clip.device))
+        img = img / img.norm(dim=-1, keepdim=True)
+        txt = txt / txt.norm(dim=-1, keepdim=True)
+        return (img * txt).sum(dim=-1).tolist()
+
+
+def _bench(clip: ClipModelLoader, tensors: torch.Tensor, prompts: list[str], batch: int, repeat: int) -> dict:
+    # 단건 지연
+    single: list[float] = []
+    for _ in range(repeat):
+        for i in range(len(prompts)):
+            t = time.perf_counter()
+            _scores(clip, tensors[i : i + 1], prompts[i : i + 1])
+            single.append((time.perf_counter() - t) * 1000)
+    single.sort()
+
+    # 배치 처리량
+    items = 0
+    t = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(prompts), batch):
+            _scores(clip, tensors[i : i + batch], prompts[i : i + batch])
+            items += len(prompts[i : i + batch])
+    elapsed = time.perf_counter() - t
+
+    return {
+        "p50_ms": statistics.median(single),
+        "p99_ms": single[int(0.99 * (len(single) - 1))],
+        "throughput": items / elapsed,
+        "scores": _scores(clip, tensors, prompts),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--image-dir", default=None)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--no-inference-mode", action="store_true")
+    parser.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS))
+    args = parser.parse_args()
+
+    images = _fixed_images(args.images, args.image_dir)
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(len(images))]
+
+    baseline: list[float] | None = None
+    print(f"{'backend':<12} | {'load ms':>8} | {'p50 ms':>8} | {'p99 ms':>8} | {'items/s':>8} | {'drift mean':>10} | {'drift max':>9}")
+    for backend in ["eager"] + [b for b in args.backends if b != "eager"]:
+        clip = ClipModelLoader(
+            settings.CLIP_MODEL_NAME,
+            settings.CLIP_PRETRAINED,
+            settings.CLIP_WEIGHTS_PATH,
+            backend=backend,
+            inference_mode=not args.no_inference_mode,
+            num_threads=args.threads,
+        ).load()
+        tensors = torch.stack([clip.preprocess(img) for img in images])
+        _scores(clip, tensors[:2], prompts[:2])  # 워밍업
+
+        result = _bench(clip, tensors, prompts, args.batch, args.repeat)
+        if baseline is None:
+            baseline = result["scores"]
+        drift = [abs(a - b) for a, b in zip(result["scores"], baseline)]
+        print(
+            f"{backend:<12} | {clip.load_ms:8.0f} | {result['p50_ms']:8.1f} | {result['p99_ms']:8.1f} | "
+            f"{result['throughput']:8.2f} | {statistics.mean(drift):10.5f} | {max(drift):9.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
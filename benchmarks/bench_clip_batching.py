@@ -0,0 +1,89 @@
+# benchmarks/bench_clip_batching.py
+"""
+CLIP 채점: batch=1 vs 동적 배칭 비교 (CPU 기준 처리량 · p50 · p99)
+
+실행 예)
+    python -m benchmarks.bench_clip_batching --requests 64 --concurrency 16
+    python -m benchmarks.bench_clip_batching --max-batch 16 --max-wait-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from app.libs.executors import BoundedExecutor
+from app.utils.CLIPScore import calculate_clip_scores
+from app.utils.clip_batcher import ClipBatchScorer
+
+PROMPTS = [
+    "A bright minimalist living room with a grey fabric sofa",
+    "Cozy bedroom with warm wood furniture and soft lighting",
+    "Modern studio apartment with a compact dining table",
+    "Scandinavian style room with white walls and plants",
+]
+
+
+def _make_png(seed: int, size: tuple[int, int] = (512, 342)) -> bytes:
+    rnd = random.Random(seed)
+    img = Image.new("RGB", size, (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+async def _run(scorer: ClipBatchScorer, items: list[tuple[bytes, str]], concurrency: int) -> tuple[float, list[float]]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(png: bytes, prompt: str) -> None:
+        async with sem:
+            t = time.perf_counter()
+            await scorer.score(png, prompt)
+            latencies.append((time.perf_counter() - t) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(png, prompt) for png, prompt in items))
+    return time.perf_counter() - started, latencies
+
+
+def _report(label: str, elapsed: float, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[int(0.99 * (len(ordered) - 1))]
+    print(
+        f"{label:<18} | {len(latencies) / elapsed:8.2f} req/s | "
+        f"p50 {statistics.median(ordered):8.1f} ms | p99 {p99:8.1f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    items = [(_make_png(i), PROMPTS[i % len(PROMPTS)]) for i in range(args.requests)]
+    calculate_clip_scores(items[:1])  # 워밍업 (모델 로딩 · 첫 forward 제외)
+
+    pool = BoundedExecutor("bench", args.workers)
+    baseline = ClipBatchScorer(calculate_clip_scores, max_batch=1, max_wait_ms=0, pool=pool, name="bench.b1")
+    batched = ClipBatchScorer(
+        calculate_clip_scores, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, pool=pool, name="bench.dyn"
+    )
+
+    _report("batch=1", *await _run(baseline, items, args.concurrency))
+    _report(f"dynamic(N={args.max_batch})", *await _run(batched, items, args.concurrency))
+    print(f"avg batch size (dynamic): {batched.snapshot()['avg_batch']}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
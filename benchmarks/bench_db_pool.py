@@ -0,0 +1,98 @@
+# benchmarks/bench_db_pool.py
+"""
+DB 커넥션 풀 크기 · statement 캐시 점검 (/images 동시 처리량 기준)
+
+1) 풀 포화 : 동시 요청 C 개가 각각 짧은 조회 1 회 후 --hold 초 동안 DB 밖 작업(이미지 생성 대용)
+   - held     : 작업 동안 세션(커넥션)을 계속 쥐고 있음 (변경 전 /images 방식)
+   - released : 조회 직후 세션을 닫아 커넥션 반환 (현재 build_image_chain 방식)
+   → 동시 수별 checkout 대기 p50/p99, 타임아웃 수, 최대 사용 커넥션 (DB_POOL_* 설정 그대로 사용)
+2) statement 캐시 : 같은 파라미터 쿼리를 N 회 – asyncpg/방언 캐시 켬 vs 끔(0) 의 평균 지연
+   → Postgres 필요, 접속 정보는 settings 와 동일
+
+실행 예)
+    python -m benchmarks.bench_db_pool --concurrency 5 10 20 40 --hold 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config.settings import settings
+from app.db.session import AsyncSessionLocal, engine_telemetry
+from app.libs import metrics
+
+QUERY = text("SELECT relname FROM pg_class WHERE oid = CAST(:oid AS oid)")
+
+
+async def _request(hold: float, release: bool, in_use: list[int]) -> None:
+    telemetry = engine_telemetry["primary"]
+    async with AsyncSessionLocal() as db:
+        await db.execute(QUERY, {"oid": 1259})
+        in_use.append(telemetry.pool.checkedout())
+        if release:
+            await db.close()
+        await asyncio.sleep(hold)
+
+
+async def _saturation(levels: list[int], hold: float) -> None:
+    telemetry = engine_telemetry["primary"]
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    print(f"pool size {settings.DB_POOL_SIZE} + overflow {settings.DB_MAX_OVERFLOW} = {capacity}, hold {hold}s")
+    for mode in ("held", "released"):
+        for c in levels:
+            telemetry.checkout_wait = metrics.TimingStats()
+            telemetry.checkout_timeouts = 0
+            in_use: list[int] = []
+            t = time.perf_counter()
+            results = await asyncio.gather(
+                *(_request(hold, mode == "released", in_use) for _ in range(c)), return_exceptions=True
+            )
+            elapsed = time.perf_counter() - t
+            wait = telemetry.checkout_wait.snapshot()
+            errors = sum(isinstance(r, Exception) for r in results)
+            print(
+                f"  {mode:<8} C={c:<4} wall {elapsed:6.2f}s | checkout p50 {wait['p50_ms']:8.2f} ms "
+                f"p99 {wait['p99_ms']:8.2f} ms | max in_use {max(in_use, default=0):3d} | "
+                f"timeouts {telemetry.checkout_timeouts} | errors {errors}"
+            )
+
+
+async def _statement_cache(n: int) -> None:
+    print(f"\nstatement cache – 같은 쿼리 {n} 회")
+    for label, size in (("cache on", None), ("cache off", 0)):
+        asyncpg_size = settings.DB_STATEMENT_CACHE_SIZE if size is None else size
+        dialect_size = settings.DB_PREPARED_STATEMENT_CACHE_SIZE if size is None else size
+        url = make_url(settings.database_url_async).update_query_dict(
+            {"prepared_statement_cache_size": str(dialect_size)}
+        )
+        bench_engine = create_async_engine(url, pool_size=1, connect_args={"statement_cache_size": asyncpg_size})
+        latencies = []
+        async with bench_engine.connect() as conn:
+            await conn.execute(QUERY, {"oid": 1259})  # 연결 · 첫 prepare 는 제외
+            for i in range(n):
+                t = time.perf_counter()
+                await conn.execute(QUERY, {"oid": 1259 + i % 10})
+                latencies.append((time.perf_counter() - t) * 1000)
+        await bench_engine.dispose()
+        print(f"  {label:<9} avg {statistics.fmean(latencies):7.3f} ms | p50 {statistics.median(latencies):7.3f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--hold", type=float, default=0.5, help="요청당 DB 밖 작업 시간(초)")
+    parser.add_argument("--statements", type=int, default=2000)
+    args = parser.parse_args()
+
+    await _saturation(args.concurrency, args.hold)
+    await _statement_cache(args.statements)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+# benchmarks/bench_image_payload.py
+"""
+이미지 페이로드 경로의 요청당 메모리 피크 비교 (before / after)
+
+- before : 응답 전체 읽기 → res.json() → b64decode → bytes 를 업로드 · BytesIO+PIL 디코딩
+- after  : 응답 스트리밍 → b64_json 값만 조각 디코딩(ImageBuffer) → 같은 memoryview 를 업로드 · PIL 이 공유
+- url    : response_format=url → 이미지 URL 스트리밍 다운로드(ImageBuffer) → 위와 동일
+
+OpenAI 응답은 httpx.MockTransport 로 64 KiB 조각씩 흘려보냄 (네트워크 영향 제거).
+응답 본문은 부모 프로세스가 임시 파일로 만들어 두고 조각 단위로 읽음 → 측정 프로세스에 본문 사본이 남지 않음.
+업로드는 botocore 처럼 본문을 8 KiB 씩 읽으며 MD5 를 계산하는 것으로 대체.
+ru_maxrss 는 프로세스 최고치라 모드마다 별도 프로세스에서 측정.
+
+실행 예)
+    python -m benchmarks.bench_image_payload
+    python -m benchmarks.bench_image_payload --width 1536 --height 1024 --requests 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+from PIL import Image
+
+from app.libs.image_payload import as_reader, decode_b64_json_stream, read_stream
+
+MODES = ("before", "after", "url")
+CHUNK = 64 * 1024
+IMAGE_URL = "https://images.example/generated.png"
+
+
+def _png(width: int, height: int) -> bytes:
+    rnd = random.Random(0)
+    img = Image.frombytes("RGB", (width, height), rnd.randbytes(width * height * 3))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", compress_level=1)
+    return buf.getvalue()
+
+
+def _write_fixtures(data_dir: Path, width: int, height: int) -> int:
+    png = _png(width, height)
+    (data_dir / "image.png").write_bytes(png)
+    (data_dir / "b64.json").write_bytes(
+        json.dumps({"created": 0, "data": [{"b64_json": base64.b64encode(png).decode("ascii")}]}).encode()
+    )
+    (data_dir / "url.json").write_bytes(json.dumps({"created": 0, "data": [{"url": IMAGE_URL}]}).encode())
+    return len(png)
+
+
+def _transport(data_dir: Path) -> httpx.MockTransport:
+    async def _chunks(path: Path) -> AsyncIterator[bytes]:
+        with path.open("rb") as f:
+            while chunk := f.read(CHUNK):
+                yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url == httpx.URL(IMAGE_URL):
+            path = data_dir / "image.png"
+        elif json.loads(request.content).get("response_format") == "url":
+            path = data_dir / "url.json"
+        else:
+            path = data_dir / "b64.json"
+        return httpx.Response(200, headers={"content-length": str(path.stat().st_size)}, content=_chunks(path))
+
+    return httpx.MockTransport(handler)
+
+
+def _upload(body) -> str:
+    """botocore put_object 흉내 – 8 KiB 씩 읽으며 MD5"""
+    md5 = hashlib.md5()
+    reader = body if hasattr(body, "read") else io.BytesIO(body)
+    while chunk := reader.read(8192):
+        md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _decode(body) -> tuple[int, int]:
+    return Image.open(body).convert("RGB").size
+
+
+async def _before(client: httpx.AsyncClient) -> None:
+    res = await client.post("https://api.openai.test/v1/images/generations", json={"prompt": "p"})
+    png = base64.b64decode(res.json()["data"][0]["b64_json"])
+    _upload(png)
+    _decode(io.BytesIO(png))
+
+
+async def _after(client: httpx.AsyncClient) -> None:
+    req = client.build_request("POST", "https://api.openai.test/v1/images/generations", json={"prompt": "p"})
+    res = await client.send(req, stream=True)
+    try:
+        view = await decode_b64_json_stream(res.aiter_bytes(), int(res.headers["content-length"]))
+    finally:
+        await res.aclose()
+    _upload(as_reader(view))
+    _decode(as_reader(view))
+
+
+async def _url(client: httpx.AsyncClient) -> None:
+    res = await client.post(
+        "https://api.openai.test/v1/images/generations", json={"prompt": "p", "response_format": "url"}
+    )
+    async with client.stream("GET", res.json()["data"][0]["url"]) as img:
+        view = await read_stream(img.aiter_bytes(), int(img.headers["content-length"]))
+    _upload(as_reader(view))
+    _decode(as_reader(view))
+
+
+async def _run_mode(mode: str, data_dir: Path, requests: int) -> dict:
+    fn = {"before": _before, "after": _after, "url": _url}[mode]
+    Image.init()  # PIL 플러그인 선적재 – 첫 요청의 지연 import 가 피크에 섞이지 않도록
+    async with httpx.AsyncClient(transport=_transport(data_dir)) as client:
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        tracemalloc.start()
+        py_peaks = []
+        t = time.perf_counter()
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            await fn(client)
+            _, peak = tracemalloc.get_traced_memory()
+            py_peaks.append(peak - start)
+        elapsed = time.perf_counter() - t
+        tracemalloc.stop()
+
+        peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "mode": mode,
+        "py_peak_mb": max(py_peaks) / 2**20,
+        "rss_growth_mb": (peak_kb - baseline_kb) / 1024,  # 주의: tracemalloc 자체 오버헤드 포함
+        "ms_per_req": elapsed / requests * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=1536)
+    parser.add_argument("--height", type=int, default=1024)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--mode", choices=MODES, help="(내부용) 한 모드만 측정하고 JSON 출력")
+    parser.add_argument("--data-dir", help="(내부용) 응답 본문 파일 위치")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(asyncio.run(_run_mode(args.mode, Path(args.data_dir), args.requests))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        png_size = _write_fixtures(Path(tmp), args.width, args.height)
+        print(f"PNG {args.width}x{args.height} = {png_size / 2**20:.2f} MB, {args.requests} requests/mode\n")
+        print(f"{'mode':<8} | {'py peak MB/req':>14} | {'RSS growth MB':>13} | {'ms/req':>7}")
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_image_payload", "--mode", mode,
+                 "--data-dir", tmp, "--requests", str(args.requests)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{r['mode']:<8} | {r['py_peak_mb']:14.2f} | {r['rss_growth_mb']:13.2f} | {r['ms_per_req']:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# benchmarks/bench_lexical_retrieval.py
+"""
+참고 문서 검색 – BM25(Kiwi) · 벡터(FAISS) · hybrid 의 지연 / recall@k / 임베딩 호출 수 비교
+
+- 코퍼스 : --source 문서를 split_chunks 로 나눈 청크 (기본 VECTOR_DOC_PATH)
+           또는 --synthetic N : 인테리어 문장을 조합한 한국어 청크 N 개
+- 질의   : 청크에서 어절 span 을 잘라 만든 문장 → 정답은 그 청크 (recall@k = 정답이 top-k 에 있는 비율)
+- bm25       : lexical_index (CSR 역색인 .npz) – 빌드 시간 · 파일 크기 · 조회 지연
+- rank_bm25  : 같은 토큰으로 BM25Okapi.get_scores (전체 문서 점수 계산, 참고용)
+- vector     : 질의 임베딩 + FAISS IndexFlatL2 (--embedder hash 면 네트워크 없음, openai 면 실제 API)
+- hybrid     : BM25 신뢰도가 낮을 때만 임베딩 → RRF 병합 (DOC_HYBRID_* 설정 사용)
+
+실행 예)
+    python -m benchmarks.bench_lexical_retrieval --synthetic 2000 --queries 300
+    python -m benchmarks.bench_lexical_retrieval --source app/vector_store/my_docs.txt --embedder openai
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.config.settings import settings
+from app.libs.embeddings import build_embedder
+from app.libs.lexical_index import LexicalIndex, tokenize, tokenize_many
+from app.libs.vector_indexer import split_chunks
+from app.libs.vector_store import TXT_SOURCE
+from app.services.doc_retrieval import rrf_merge
+
+ROOMS = ["거실", "침실", "주방", "욕실", "현관", "드레스룸", "서재", "아이방", "베란다", "다이닝룸"]
+STYLES = ["미니멀", "북유럽", "모던", "빈티지", "내추럴", "인더스트리얼", "클래식", "재팬디", "미드센추리"]
+MATERIALS = ["원목", "대리석", "라탄", "패브릭", "가죽", "스테인리스", "테라조", "린넨", "황동", "콘크리트"]
+FURNITURE = ["소파", "식탁", "침대", "책상", "수납장", "선반", "러그", "커튼", "조명", "거울", "옷장", "벤치"]
+COLORS = ["화이트", "베이지", "그레이", "네이비", "올리브", "테라코타", "차콜", "아이보리", "우드톤"]
+
+
+def _synthetic_chunks(n: int, rng: random.Random) -> list[str]:
+    chunks = []
+    for _ in range(n):
+        sentences = [
+            f"{rng.choice(STYLES)} 스타일 {rng.choice(ROOMS)}에는 {rng.choice(MATERIALS)} 소재의 "
+            f"{rng.choice(FURNITURE)}를 {rng.choice(COLORS)} 색으로 배치하면 좋습니다."
+            for _ in range(rng.randint(3, 6))
+        ]
+        chunks.append(" ".join(sentences))
+    return chunks
+
+
+def _make_queries(chunks: list[str], n: int, rng: random.Random) -> list[tuple[str, int]]:
+    queries = []
+    for _ in range(n):
+        target = rng.randrange(len(chunks))
+        words = chunks[target].split()
+        span = min(len(words), rng.randint(4, 8))
+        start = rng.randrange(len(words) - span + 1)
+        queries.append((" ".join(words[start:start + span]), target))
+    return queries
+
+
+def _report(label: str, latencies: list[float], recall: float, extra: str = "") -> None:
+    p50 = statistics.median(latencies)
+    p99 = sorted(latencies)[int(0.99 * (len(latencies) - 1))]
+    print(f"{label:<12} recall {recall:6.3f} | p50 {p50:9.3f} ms | p99 {p99:9.3f} ms {extra}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", type=Path, default=TXT_SOURCE)
+    parser.add_argument("--synthetic", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--embedder", choices=("openai", "hash"), default="hash")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    chunks = _synthetic_chunks(args.synthetic, rng) if args.synthetic else split_chunks(
+        args.source.read_text(encoding="utf-8")
+    )
+    queries = _make_queries(chunks, args.queries, rng)
+    ids = [str(i) for i in range(len(chunks))]
+    k = args.k
+    print(f"chunks={len(chunks)} queries={len(queries)} k={k} embedder={args.embedder}\n")
+
+    # ── BM25 (lexical_index) ──
+    tokenize("워밍업")  # Kiwi 모델 로딩은 측정에서 제외
+    t = time.perf_counter()
+    index = LexicalIndex.build(ids, chunks)
+    build_ms = (time.perf_counter() - t) * 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bm25_index.npz"
+        index.save(path)
+        size_kb = path.stat().st_size / 1024
+        t = time.perf_counter()
+        index = LexicalIndex.load(path)
+        load_ms = (time.perf_counter() - t) * 1000
+    print(f"bm25 build {build_ms:.0f} ms | file {size_kb:.1f} KB | load {load_ms:.1f} ms")
+
+    latencies, found = [], 0
+    for query, target in queries:
+        t = time.perf_counter()
+        hits = index.search(query, k)
+        latencies.append((time.perf_counter() - t) * 1000)
+        found += any(int(h.doc_id) == target for h in hits)
+    _report("bm25", latencies, found / len(queries), "(tokenize 포함, 임베딩 0 회)")
+
+    # ── rank_bm25 (같은 토큰, 전체 문서 점수 계산) ──
+    from rank_bm25 import BM25Okapi
+
+    bm25 = BM25Okapi(tokenize_many(chunks))
+    latencies, found = [], 0
+    for query, target in queries:
+        t = time.perf_counter()
+        scores = bm25.get_scores(tokenize(query))
+        top = np.argsort(-scores)[:k]
+        latencies.append((time.perf_counter() - t) * 1000)
+        found += target in top
+    _report("rank_bm25", latencies, found / len(queries))
+
+    # ── 벡터 (FAISS flat) ──
+    import faiss
+
+    embedder = build_embedder(args.embedder)
+    t = time.perf_counter()
+    matrix = np.asarray(embedder.embed_documents(chunks), dtype=np.float32)
+    print(f"\nembed corpus {(time.perf_counter() - t) * 1000:.0f} ms")
+    flat = faiss.IndexFlatL2(matrix.shape[1])
+    flat.add(matrix)
+
+    def vector_search(query: str) -> list[int]:
+        vec = np.asarray([embedder.embed_query(query)], dtype=np.float32)
+        return flat.search(vec, k)[1][0].tolist()
+
+    latencies, found = [], 0
+    for query, target in queries:
+        t = time.perf_counter()
+        top = vector_search(query)
+        latencies.append((time.perf_counter() - t) * 1000)
+        found += target in top
+    _report("vector", latencies, found / len(queries), f"(임베딩 {len(queries)} 회)")
+
+    # ── hybrid (신뢰도 낮을 때만 임베딩) ──
+    latencies, found, embed_calls = [], 0, 0
+    for query, target in queries:
+        t = time.perf_counter()
+        hits = index.search(query, k)
+        confident = bool(hits) and (
+            hits[0].score >= settings.DOC_HYBRID_MIN_SCORE and hits[0].coverage >= settings.DOC_HYBRID_MIN_COVERAGE
+        )
+        if confident:
+            top = [int(h.doc_id) for h in hits]
+        else:
+            embed_calls += 1
+            dense = [str(d) for d in vector_search(query)]
+            top = [int(d) for d, _ in rrf_merge([[h.doc_id for h in hits], dense], k, settings.DOC_HYBRID_RRF_K)]
+        latencies.append((time.perf_counter() - t) * 1000)
+        found += target in top
+    _report("hybrid", latencies, found / len(queries), f"(임베딩 {embed_calls} 회 / {len(queries)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/bench_pgvector.py
+"""
+pgvector ANN vs 로컬 FAISS – recall@k · 지연 비교 (코퍼스 크기별)
+
+- 코퍼스 : 정규화된 랜덤 벡터 N 개 (정규화 → cosine 과 L2 순위가 같음)
+- 정답   : numpy 전수 계산 top-k
+- FAISS  : 벡터 스토어와 같은 IndexFlatL2 (전수 탐색)
+- pgvector : 임시 테이블 bench_embedding_chunks 에 COPY 적재 후
+             hnsw (ef_search 여러 값) / ivfflat (probes 여러 값) 로 단건 · 배치 조회
+  → Postgres(pgvector 확장)가 필요, 접속 정보는 settings 와 동일
+
+실행 예)
+    python -m benchmarks.bench_pgvector --sizes 1000 10000 50000 --dim 256 --queries 100
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from app.db.session import AsyncSessionLocal
+from app.services.vector_retrieval import PgVectorRetriever
+
+TABLE = "bench_embedding_chunks"
+
+
+def _recall(found: list[list[int]], truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t.tolist())) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def _row(label: str, recall: float, latencies_ms: list[float], batch_ms: float | None = None) -> None:
+    p50 = statistics.median(latencies_ms)
+    p99 = sorted(latencies_ms)[int(0.99 * (len(latencies_ms) - 1))]
+    batch = f" | batch {batch_ms:8.1f} ms" if batch_ms is not None else ""
+    print(f"  {label:<24} recall {recall:6.3f} | p50 {p50:8.3f} ms | p99 {p99:8.3f} ms{batch}")
+
+
+def _faiss(corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int) -> None:
+    import faiss
+
+    index = faiss.IndexFlatL2(corpus.shape[1])
+    index.add(corpus)
+    found, latencies = [], []
+    for q in queries:
+        t = time.perf_counter()
+        _, ids = index.search(q[None, :], k)
+        latencies.append((time.perf_counter() - t) * 1000)
+        found.append(ids[0].tolist())
+    _row("faiss flat", _recall(found, truth), latencies)
+
+
+async def _pgvector(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    ef_values: list[int],
+    probe_values: list[int],
+) -> None:
+    dim = corpus.shape[1]
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await session.execute(text(
+            f"CREATE TABLE {TABLE} (id serial PRIMARY KEY, content text NOT NULL, embedding vector({dim}) NOT NULL)"
+        ))
+        await session.commit()
+
+        retriever = PgVectorRetriever(TABLE, dim=dim, index_type="hnsw", distance="cosine")
+        t = time.perf_counter()
+        await retriever.ingest(session, [str(i) for i in range(len(corpus))], corpus.tolist())
+        print(f"  COPY {len(corpus)} rows         {(time.perf_counter() - t) * 1000:8.1f} ms")
+
+        for index_type, knob, values in (("hnsw", "ef_search", ef_values), ("ivfflat", "probes", probe_values)):
+            retriever = PgVectorRetriever(TABLE, dim=dim, index_type=index_type, distance="cosine")
+            t = time.perf_counter()
+            await retriever.ensure_index(session, rebuild=True)
+            print(f"  build {index_type:<8}             {(time.perf_counter() - t) * 1000:8.1f} ms")
+
+            for value in values:
+                tune = {knob: value}
+                found, latencies = [], []
+                for q in queries:
+                    t = time.perf_counter()
+                    hits = await retriever.search(session, q, k, **tune)
+                    latencies.append((time.perf_counter() - t) * 1000)
+                    found.append([int(h.content) for h in hits])
+                await session.commit()
+
+                t = time.perf_counter()
+                batched = await retriever.search_many(session, queries.tolist(), k, **tune)
+                batch_ms = (time.perf_counter() - t) * 1000
+                await session.commit()
+                batch_recall = _recall([[int(h.content) for h in hs] for hs in batched], truth)
+
+                _row(f"pg {index_type} {knob}={value}", _recall(found, truth), latencies, batch_ms)
+                print(f"  {'':<24} batch recall {batch_recall:6.3f} ({len(queries)} queries, 1 round trip)")
+
+        await session.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 40, 100])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 10, 30])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        corpus = rng.standard_normal((n, args.dim), dtype=np.float32)
+        corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+        queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        truth = np.argsort(-(queries @ corpus.T), axis=1)[:, :args.k]
+
+        print(f"\nN={n} dim={args.dim} k={args.k} queries={args.queries}")
+        _faiss(corpus, queries, truth, args.k)
+        await _pgvector(corpus, queries, truth, args.k, args.ef_search, args.probes)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+# benchmarks/bench_prompt_compose.py
+"""
+프롬프트 합성 · 이미지 체인 구성 오버헤드 micro-benchmark (before / after)
+
+- compose  : 요청마다 PromptTemplate.from_template + PROMPT_TMPL.format (before)
+             vs 컴파일·메모이즈된 compose_prompt (after)
+- chain    : 요청마다 RunnableLambda | RunnableLambda 구성 후 ainvoke (before)
+             vs 단계별 직접 await (after)
+  (이미지 생성·업로드는 no-op 으로 대체 → 순수 오버헤드만 측정)
+
+실행 예)
+    python -m benchmarks.bench_prompt_compose --n 20000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from langchain.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from app.models.enums import Equilibrium
+from app.services.prompt_service import compose_prompt
+
+FP_PROMPT = "A {input} one-room apartment, wide-angle interior photo, natural daylight, {{realistic}}"
+TAG_PROMPT = "Minimal Scandinavian mood with light oak wood and white walls"
+FURNITURE = ["a grey fabric sofa", "a round dining table", "a floor lamp"]
+
+LEGACY_TMPL = PromptTemplate(
+    input_variables=["floor_plan_prompt", "tag_prompt", "furniture_prompt"],
+    template="{floor_plan_prompt}\n{tag_prompt}\n{furniture_prompt}",
+)
+
+
+def legacy_compose(equilibrium: Equilibrium) -> str:
+    template = PromptTemplate.from_template(FP_PROMPT)
+    fp = template.format(input=equilibrium.description)
+    return LEGACY_TMPL.format(floor_plan_prompt=fp, tag_prompt=TAG_PROMPT, furniture_prompt="\n".join(FURNITURE))
+
+
+def fast_compose(equilibrium: Equilibrium) -> str:
+    return compose_prompt(FP_PROMPT, equilibrium, TAG_PROMPT, FURNITURE)
+
+
+async def _fake_generate(prompt: str) -> bytes:
+    return b"png"
+
+
+async def _fake_post_process(img: bytes, prompt: str) -> dict:
+    return {"imageLink": "s3://fake", "pullPrompt": prompt}
+
+
+async def legacy_chain(prompt: str) -> dict:
+    async def _post(img: bytes) -> dict:
+        return await _fake_post_process(img, prompt)
+
+    chain = RunnableLambda(_fake_generate) | RunnableLambda(_post)
+    return await chain.ainvoke(prompt)
+
+
+async def fast_chain(prompt: str) -> dict:
+    img = await _fake_generate(prompt)
+    return await _fake_post_process(img, prompt)
+
+
+def _timeit(label: str, fn, n: int) -> float:
+    equilibria = list(Equilibrium)
+    t = time.perf_counter()
+    for i in range(n):
+        fn(equilibria[i % len(equilibria)])
+    us = (time.perf_counter() - t) / n * 1e6
+    print(f"{label:<22} {us:10.2f} µs/op")
+    return us
+
+
+async def _atimeit(label: str, fn, n: int) -> float:
+    t = time.perf_counter()
+    for _ in range(n):
+        await fn("prompt")
+    us = (time.perf_counter() - t) / n * 1e6
+    print(f"{label:<22} {us:10.2f} µs/op")
+    return us
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--chain-n", type=int, default=2000)
+    args = parser.parse_args()
+
+    assert legacy_compose(Equilibrium.UNDER_5) == fast_compose(Equilibrium.UNDER_5), "합성 결과 불일치"
+
+    before = _timeit("compose (before)", legacy_compose, args.n)
+    after = _timeit("compose (after)", fast_compose, args.n)
+    print(f"{'':<22} x{before / after:.1f} faster\n")
+
+    before = await _atimeit("chain (before)", legacy_chain, args.chain_n)
+    after = await _atimeit("chain (after)", fast_chain, args.chain_n)
+    print(f"{'':<22} x{before / after:.1f} faster")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+# benchmarks/bench_vector_store.py
+"""
+FAISS 벡터 스토어 로드 비용 · 메모리 비교
+
+1) 호출당 비용 : 기존 get_vectorstore (매번 임베딩 객체 생성 + FAISS.load_local) vs 매니저 get()
+2) 로드 1 회    : mmap 끔/켬 로드 시간, 로드 전후 RSS
+3) 워커 N 개    : 프로세스 N 개가 같은 인덱스를 로드했을 때 프로세스별 RSS / PSS 합계
+                  (PSS 는 공유 페이지를 나눠 센 값 → mmap 이면 합계가 거의 1 벌로 수렴, Linux 전용)
+
+기본은 app/vector_store/faiss_index. --synthetic N 이면 N 개 랜덤 벡터 인덱스를 임시로 만들어 측정.
+
+실행 예)
+    python -m benchmarks.bench_vector_store
+    python -m benchmarks.bench_vector_store --synthetic 200000 --dim 1536 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from app.libs import metrics
+from app.libs.vector_store import VECTORSTORE_PATH, VectorStoreManager
+
+
+def _synthetic_index(path: Path, n: int, dim: int) -> None:
+    import faiss
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexFlatL2(dim)
+    for start in range(0, n, 50_000):
+        index.add(rng.standard_normal((min(50_000, n - start), dim), dtype=np.float32))
+    ids = [str(i) for i in range(n)]
+    docstore = InMemoryDocstore({i: Document(page_content=f"doc {i}") for i in ids})
+    FAISS(FakeEmbeddings(size=dim), index, docstore, dict(enumerate(ids))).save_local(str(path))
+
+
+def _manager(path: Path, mmap: bool, dim: int) -> VectorStoreManager:
+    manager = VectorStoreManager(path, mmap=mmap, poll_interval=3600)
+    manager._embeddings = FakeEmbeddings(size=dim)  # 네트워크 없이 측정
+    return manager
+
+
+def _smaps_rollup() -> dict[str, float]:
+    """Rss / Pss (MB) – /proc/self/smaps_rollup"""
+    out: dict[str, float] = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    out[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        out["Rss"] = metrics.current_rss_mb()
+    return out
+
+
+def _worker(path: str, mmap: bool, dim: int, barrier, queue) -> None:
+    manager = _manager(Path(path), mmap, dim)
+    store = manager.get()
+    store.similarity_search_by_vector([0.0] * dim, k=4)  # 인덱스 페이지 접근
+    barrier.wait()  # 모든 워커가 로드를 마친 시점에 측정
+    queue.put(_smaps_rollup())
+    barrier.wait()
+
+
+def _per_call(path: Path, dim: int, repeat: int) -> None:
+    legacy = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        FAISS.load_local(str(path), FakeEmbeddings(size=dim), allow_dangerous_deserialization=True)
+        legacy.append((time.perf_counter() - t) * 1000)
+
+    manager = _manager(path, True, dim)
+    manager.get()
+    cached = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        manager.get()
+        cached.append((time.perf_counter() - t) * 1000)
+    print(f"per-call  legacy load_local : {statistics.median(legacy):10.3f} ms")
+    print(f"per-call  manager.get()     : {statistics.median(cached):10.5f} ms\n")
+
+
+def _single_load(path: Path, dim: int) -> None:
+    for mmap in (False, True):
+        manager = _manager(path, mmap, dim)
+        manager.get()
+        snap = manager.snapshot()
+        print(
+            f"load mmap={str(mmap):<5} (actual={str(snap['mmap']):<5}) : {snap['load']['max_ms']:9.1f} ms, "
+            f"RSS {snap['rss_before_load_mb']:.1f} → {snap['rss_after_load_mb']:.1f} MB"
+        )
+    print()
+
+
+def _multi_worker(path: Path, dim: int, workers: int) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    for mmap in (False, True):
+        barrier, queue = ctx.Barrier(workers), ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(str(path), mmap, dim, barrier, queue)) for _ in range(workers)]
+        for p in procs:
+            p.start()
+        stats = [queue.get() for _ in procs]
+        for p in procs:
+            p.join()
+        rss = sum(s.get("Rss", 0) for s in stats)
+        pss = sum(s.get("Pss", 0) for s in stats)
+        print(f"{workers} workers mmap={str(mmap):<5} : RSS sum {rss:8.1f} MB | PSS sum {pss:8.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=0, help="랜덤 벡터 N 개로 임시 인덱스 생성")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = VECTORSTORE_PATH
+        if args.synthetic:
+            path = Path(tmp) / "faiss_index"
+            _synthetic_index(path, args.synthetic, args.dim)
+        print(f"index: {path} ({sum(f.stat().st_size for f in path.iterdir()) / 2**20:.1f} MB)\n")
+
+        _per_call(path, args.dim, args.repeat)
+        _single_load(path, args.dim)
+        _multi_worker(path, args.dim, args.workers)
+
+
+if __name__ == "__main__":
+    main()
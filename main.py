@@ -4,24 +4,36 @@ from __future__ import annotations
 ########################################################################
 #  Houme API – FastAPI 엔트리 포인트 (Clean Version)
 #  - pgvector 타입 매핑 + Automap reflection
+#  - lifespan 에서 공유 리소스(OpenAI HTTP 클라이언트) 생성/정리
 #  - 라우터 모듈(app.api.*) 일괄 등록
 #  - 기본 로깅 / CORS 예시 포함
 ########################################################################
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from fastapi import Depends, FastAPI
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import select
 from sqlalchemy.dialects.postgresql.base import ischema_names
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from pgvector.sqlalchemy import Vector
 
-from app.db.session import engine, get_db
+from app.config.settings import settings
+from app.db.session import dispose_engines, engine
 from app.db.automap import AutomapBase, init_automap
+from app.libs.openai_client import close_openai_client, init_openai_client
+from app.libs.executors import shutdown_pools
+from app.libs.s3 import s3_uploader
+from app.libs.vector_store import vector_store_manager
+from app.services.image_cache import image_result_cache
+from app.services.image_jobs import image_jobs
+from app.services.image_service import warm_up_clip
+from app.services.prompt_catalog import catalog_listener, prompt_catalog
+from app.utils.clip_client import sidecar_client
 from app.api.routers import image_router
-from app.api import prompt
+from app.api import ops, prompt, users
 
 # ──────────────────────────
 # 0) 로깅 기본 설정
@@ -34,17 +46,74 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # ──────────────────────────
-# 1) FastAPI 인스턴스
+# 1) Lifespan : pgvector + Automap + 공유 클라이언트
+# ──────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # PostgreSQL에서 vector 타입을 SQLAlchemy가 인식할 수 있도록 등록
+    ischema_names["vector"] = Vector
+
+    # 서비스가 쓰는 테이블만 ORM 모델로 자동 매핑 (스키마가 그대로면 로컬 스냅샷 사용)
+    automap = await init_automap(engine)
+    logger.info(
+        "Automap ready (%s, %.0f ms) – tables: %s",
+        automap["source"], automap["total_ms"], list(AutomapBase.classes.keys()),
+    )
+    print("[DEBUG] 자동 매핑된 클래스:", list(AutomapBase.classes.keys()))
+
+    # 프롬프트 카탈로그(도면·태그·가구) 선적재 + 변경 알림 구독
+    if settings.PROMPT_CATALOG_ENABLED:
+        await prompt_catalog.ensure_fresh()
+        if settings.PROMPT_CATALOG_LISTEN:
+            catalog_listener.start()
+
+    # OpenAI 이미지 API 용 공유 커넥션 풀 (요청마다 새 클라이언트 생성 X)
+    await init_openai_client()
+
+    # POST /images/jobs 워커 풀 (대기열이 가득 차면 429)
+    await image_jobs.start()
+
+    # /images 결과 캐시 – postgres 백엔드면 만료 행 주기 삭제
+    await image_result_cache.start()
+
+    # FAISS 벡터 스토어 – 프로세스당 1 회 로드(mmap) + 파일 변경 시 교체 (인덱스 생성은 하지 않음)
+    await vector_store_manager.start(watch=settings.VECTOR_STORE_WATCH)
+
+    # CLIP 모델 로딩 · 텍스트 feature 캐시 워밍업 – 트래픽 수신을 막지 않도록 백그라운드로
+    #   (준비 상태는 GET /ready 로 확인)
+    warmup_task = (
+        asyncio.create_task(warm_up_clip())
+        if settings.CLIP_WARMUP_ON_STARTUP or settings.CLIP_TEXT_CACHE_WARMUP
+        else None
+    )
+    try:
+        yield
+    finally:
+        if warmup_task is not None:
+            warmup_task.cancel()
+        await image_jobs.stop()
+        await image_result_cache.stop()
+        await vector_store_manager.stop()
+        await catalog_listener.stop()
+        await close_openai_client()
+        await sidecar_client.close()
+        shutdown_pools()
+        s3_uploader.close()
+        await dispose_engines()
+
+# ──────────────────────────
+# 2) FastAPI 인스턴스
 # ──────────────────────────
 app = FastAPI(
     title="Houme API",
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # ──────────────────────────
-# 2) (선택) CORS – 프론트엔드와 통신 시 필요
+# 3) (선택) CORS – 프론트엔드와 통신 시 필요
 # ──────────────────────────
 app.add_middleware(
     CORSMiddleware,
@@ -54,40 +123,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ──────────────────────────
-# 3) Startup : pgvector + Automap
-# ──────────────────────────
-@app.on_event("startup")
-async def on_startup() -> None:
-    # PostgreSQL에서 vector 타입을 SQLAlchemy가 인식할 수 있도록 등록
-    ischema_names["vector"] = Vector
-
-    # DB에 있는 테이블들을 SQLAlchemy ORM 모델로 자동 매핑
-    await init_automap(engine)
-    logger.info("Automap reflection complete – tables: %s", list(AutomapBase.classes.keys()))
-    print("[DEBUG] 자동 매핑된 클래스:", list(AutomapBase.classes.keys()))
-
 # ──────────────────────────
 # 4) API 라우터 등록
 # ──────────────────────────
-app.include_router(image_router.router)  # POST /images
+app.include_router(image_router.router)  # POST /images, /images/jobs
 app.include_router(prompt.router)
-
-# ──────────────────────────
-# 5) 데모 엔드포인트 (users)
-# ──────────────────────────
-@app.get("/users", tags=["User"], summary="전체 사용자 조회")
-async def get_users(db: AsyncSession = Depends(get_db)):  # 비동기 세션을 가져오는 의존성 주입
-    """users 테이블 전체 행을 반환"""
-    User = AutomapBase.classes.users
-    rows = (await db.execute(select(User))).scalars().all()
-    return [dict(r.__dict__) for r in rows]  # __dict__로 JSON 응답 포맷 변환
-
-
-@app.get("/user-ids", tags=["User"], summary="사용자 PK 목록")
-async def list_user_ids(db: AsyncSession = Depends(get_db)):
-    """users PK(id) 컬럼만 리스트로 반환"""
-    User = AutomapBase.classes.users
-    res = await db.execute(select(User.id))
-    return [row.id for row in res]
-
+app.include_router(ops.router)           # GET /metrics, /ready
+app.include_router(users.router)         # GET /users, /user-ids (+ /export NDJSON)
@@ -0,0 +1,41 @@
+# scripts/build_vector_index.py
+"""
+벡터 인덱스 증분 갱신 (CLI)
+──────────────────────────────
+- VECTOR_DOC_PATH 문서를 청크로 나눠 바뀐 청크만 임베딩하고 app/vector_store/faiss_index 를 제자리에서 갱신
+- 같은 청크로 BM25 인덱스(faiss_index 옆 bm25_index.npz)도 다시 만듦
+- 실행 중인 서버는 VECTOR_STORE_WATCH 변경 감지로 새 버전을 로드
+- --embedder hash : OpenAI 호출 없이 결정적 로컬 임베더 사용 (조회 측도 VECTOR_EMBEDDER=hash 여야 함)
+
+실행 예)
+    python -m scripts.build_vector_index
+    python -m scripts.build_vector_index --embedder hash --path /tmp/faiss_index
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from app.config.settings import settings
+from app.libs.embeddings import build_embedder
+from app.libs.vector_indexer import sync_vector_index
+from app.libs.vector_store import TXT_SOURCE, VECTORSTORE_PATH
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", type=Path, default=TXT_SOURCE)
+    parser.add_argument("--path", type=Path, default=VECTORSTORE_PATH)
+    parser.add_argument("--embedder", choices=("openai", "hash"), default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    lexical_path = args.path.parent / Path(settings.LEXICAL_INDEX_PATH).name  # faiss_index 옆
+    report = sync_vector_index(args.path, args.source, build_embedder(args.embedder), lexical_path)
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
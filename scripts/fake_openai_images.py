@@ -0,0 +1,108 @@
+# scripts/fake_openai_images.py
+"""
+OpenAI /v1/images/generations 로컬 가짜 서버 (개발·부하 테스트용)
+──────────────────────────────
+- stream=false : {"data": [{"b64_json": ...}]} 를 --delay 초 뒤 반환
+- stream=true  : partial_images 개의 image_generation.partial_image 이벤트를 --delay 간격으로 보낸 뒤
+                 image_generation.completed 이벤트로 완성본 전송 (OpenAI 스트리밍 형식과 동일)
+- 이미지는 프롬프트 해시로 색을 정한 단색+도형 PNG → 같은 프롬프트면 같은 이미지
+
+실행 예)
+    python -m scripts.fake_openai_images --port 8089 --delay 0.5
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 uvicorn main:app
+    curl -N -X POST localhost:8000/images/stream -H 'Content-Type: application/json' -d @req.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+from typing import AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from PIL import Image, ImageDraw, ImageFilter
+
+app = FastAPI(title="fake-openai-images")
+DELAY = 0.5
+
+
+def _parse_size(size: str) -> tuple[int, int]:
+    try:
+        w, h = (int(v) for v in size.split("x"))
+        return w, h
+    except ValueError:
+        return 1024, 1024
+
+
+def _render(prompt: str, size: str, blur: float = 0.0) -> str:
+    """프롬프트로 결정되는 PNG → base64 (blur 가 클수록 흐릿한 중간 이미지)"""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    w, h = _parse_size(size)
+    img = Image.new("RGB", (w, h), tuple(digest[:3]))
+    draw = ImageDraw.Draw(img)
+    for i in range(3, 27, 4):
+        x0, y0 = digest[i] * w // 256, digest[i + 1] * h // 256
+        draw.rectangle((x0, y0, x0 + w // 4, y0 + h // 4), fill=tuple(digest[i + 1 : i + 4]))
+    if blur:
+        img = img.filter(ImageFilter.GaussianBlur(blur))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream(prompt: str, size: str, partial_images: int) -> AsyncIterator[str]:
+    for index in range(partial_images):
+        await asyncio.sleep(DELAY)
+        blur = 24.0 / (index + 1)
+        yield _sse(
+            "image_generation.partial_image",
+            {
+                "type": "image_generation.partial_image",
+                "partial_image_index": index,
+                "b64_json": await asyncio.to_thread(_render, prompt, size, blur),
+            },
+        )
+    await asyncio.sleep(DELAY)
+    yield _sse(
+        "image_generation.completed",
+        {
+            "type": "image_generation.completed",
+            "b64_json": await asyncio.to_thread(_render, prompt, size),
+            "usage": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
+        },
+    )
+
+
+@app.post("/v1/images/generations")
+async def generations(request: Request):
+    body = await request.json()
+    prompt = body.get("prompt", "")
+    size = body.get("size", "1024x1024")
+
+    if body.get("stream"):
+        partial_images = max(0, min(int(body.get("partial_images", 0)), 3))
+        return StreamingResponse(_stream(prompt, size, partial_images), media_type="text/event-stream")
+
+    await asyncio.sleep(DELAY)
+    b64 = await asyncio.to_thread(_render, prompt, size)
+    return JSONResponse({"created": 0, "data": [{"b64_json": b64}]})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=0.5, help="이벤트(또는 응답) 사이 지연(초)")
+    args = parser.parse_args()
+
+    DELAY = args.delay
+    uvicorn.run(app, host=args.host, port=args.port)